@@ -0,0 +1,110 @@
+"""
+Catalog memory report: original dict-based loader vs ProductCatalog.
+
+    python -m benchmarks.bench_catalog_memory
+
+Writes synthetic products.json files, loads each with both loaders and
+reports the memory still held by the loaded catalog (tracemalloc,
+includes NumPy columns).
+"""
+import gc
+import json
+import os
+import tempfile
+import tracemalloc
+
+from benchmarks.catalogs import catalog_records
+from benchmarks.harness import print_table
+from common.services.product_loader import load_products
+
+
+SIZES = [12, 1_000, 10_000, 100_000]
+
+
+class LegacyProduct:
+    """
+    The original Product: per-instance __dict__ plus two nested dicts.
+    """
+
+    def __init__(
+        self, id, name, category,
+        unit_weight=None, price_per_unit=None, price_per_gram=None,
+        vision_profile=None, shape_profile=None
+    ):
+        self.id = id
+        self.name = name
+        self.category = category
+        self.unit_weight = unit_weight
+        self.price_per_unit = price_per_unit
+        self.price_per_gram = price_per_gram
+        self.vision_profile = vision_profile or {}
+        self.shape_profile = shape_profile or {}
+
+
+def legacy_load_products(path):
+    with open(path, "r") as f:
+        data = json.load(f)
+
+    products = {}
+    for p in data:
+        product = LegacyProduct(
+            id=p["id"],
+            name=p["name"],
+            category=p["category"],
+            unit_weight=p.get("unit_weight"),
+            price_per_unit=p.get("price_per_unit"),
+            price_per_gram=p.get("price_per_gram"),
+            vision_profile=p.get("vision_profile"),
+            shape_profile=p.get("shape_profile")
+        )
+        products[product.id] = product
+
+    return products
+
+
+def retained_bytes(loader, path):
+    gc.collect()
+    tracemalloc.start()
+
+    catalog = loader(path)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+
+    tracemalloc.stop()
+    del catalog
+
+    return current, peak
+
+
+def main():
+    rows = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            path = os.path.join(tmp, f"products_{size}.json")
+
+            with open(path, "w") as f:
+                json.dump(catalog_records(size), f)
+
+            old, old_peak = retained_bytes(legacy_load_products, path)
+            new, new_peak = retained_bytes(load_products, path)
+
+            rows.append([
+                f"{size:,}",
+                f"{old / 1024:,.0f} KiB",
+                f"{new / 1024:,.0f} KiB",
+                f"{old / size:,.0f} B",
+                f"{new / size:,.0f} B",
+                f"{(1 - new / old) * 100:.0f}%",
+                f"{old_peak / 1024:,.0f} / {new_peak / 1024:,.0f} KiB"
+            ])
+
+    print_table(
+        ["SKUs", "legacy", "catalog", "legacy/SKU", "catalog/SKU",
+         "saved", "load peak (legacy / catalog)"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Color analysis benchmark: original histogram path vs color_engine.
+
+    python -m benchmarks.bench_color
+
+Both sides start from the same 384x216 HSV center crops, so the
+numbers cover only the color step (no capture, no shape features).
+"""
+import cv2
+import numpy as np
+
+from benchmarks.frames import center_crop, frame_set
+from benchmarks.harness import format_time, measure, print_table
+from common.services.color_engine import (
+    analyze_colors,
+    classify_color,
+    compute_confidence,
+    dominant_colors
+)
+
+
+def legacy_colors(hsv):
+    """
+    The original camera_real color step: mask copy, hue histogram,
+    two medians, classify_color() on the top two bins.
+    """
+
+    mask = (hsv[:, :, 1] > 30) & (hsv[:, :, 2] > 70)
+    filtered_pixels = hsv[mask]
+
+    if len(filtered_pixels) < 80:
+        return None, 0.0
+
+    hues = filtered_pixels[:, 0]
+
+    hist, bins = np.histogram(hues, bins=18, range=(0, 180))
+    top_bins = hist.argsort()[-2:][::-1]
+
+    s_val = np.median(filtered_pixels[:, 1])
+    v_val = np.median(filtered_pixels[:, 2])
+
+    detected_colors = []
+
+    for b in top_bins:
+        h_val = (bins[b] + bins[b + 1]) / 2
+        color = classify_color(h_val, s_val, v_val)
+
+        if color and color not in detected_colors:
+            detected_colors.append(color)
+
+    return detected_colors, compute_confidence(s_val, v_val)
+
+
+def engine_colors(hsv):
+    result = analyze_colors(hsv)
+
+    if not result["fractions"]:
+        return None, 0.0
+
+    return dominant_colors(result["fractions"]), result["confidence"]
+
+
+def main():
+    crops = [
+        cv2.cvtColor(np.ascontiguousarray(center_crop(f)), cv2.COLOR_BGR2HSV)
+        for f in frame_set()
+    ]
+
+    print(f"Crop size: {crops[0].shape[1]}x{crops[0].shape[0]}, "
+          f"{len(crops)} frames\n")
+
+    def run_legacy():
+        for hsv in crops:
+            legacy_colors(hsv)
+
+    def run_engine():
+        for hsv in crops:
+            engine_colors(hsv)
+
+    legacy = measure(run_legacy)
+    engine = measure(run_engine)
+
+    n = len(crops)
+    print_table(
+        ["path", "best / frame", "median / frame"],
+        [
+            ["legacy histogram", format_time(legacy["best"] / n),
+             format_time(legacy["median"] / n)],
+            ["color_engine", format_time(engine["best"] / n),
+             format_time(engine["median"] / n)],
+        ]
+    )
+    print(f"\nSpeed-up: {legacy['best'] / engine['best']:.2f}x\n")
+
+    # ---- agreement ----
+    same_first = 0
+    same_conf = 0
+
+    for hsv in crops:
+        old_colors, old_conf = legacy_colors(hsv)
+        new_colors, new_conf = engine_colors(hsv)
+
+        if old_colors and new_colors and old_colors[0] == new_colors[0]:
+            same_first += 1
+        if old_conf == new_conf:
+            same_conf += 1
+
+    print(f"Same dominant color: {same_first}/{n}")
+    print(f"Same confidence:     {same_conf}/{n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Cart journal: hot-path cost, group commit and crash replay time.
+
+    python -m benchmarks.bench_journal [events]
+
+Records `events` cart events back to back (the commit thread's view)
+and reports the per-record cost against APPEND_BUDGET and how many
+records each fsync carried. Then rebuilds a cart from journals of
+growing length, with and without a snapshot covering most of them.
+"""
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.catalogs import synthetic_products
+from benchmarks.harness import format_time, print_table
+from common.models.cart import Cart
+from common.services.cart_journal import APPEND_BUDGET, CartJournal
+
+
+REPLAY_SIZES = [1_000, 10_000, 100_000]
+
+
+def fill(journal, cart, products, events):
+    """
+    Adds (and every fourth event removes) units, recording each event.
+    Returns the per-record times.
+    """
+    times = []
+
+    for i in range(events):
+        product = products[(i * 7919) % len(products)]
+
+        if i % 4 == 3 and product.id in cart.items:
+            cart.remove(product.id, -product.unit_weight)
+        else:
+            cart.add(product, product.unit_weight)
+
+        start = time.perf_counter()
+        journal.record(cart, "ADD")
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def hot_path(products, events):
+    directory = tempfile.mkdtemp()
+
+    try:
+        journal = CartJournal(directory)
+        cart = Cart()
+        journal.restore(cart, {})
+
+        times = fill(journal, cart, products, events)
+        journal.close()
+
+        times.sort()
+        stats = journal.stats()
+
+        print_table(
+            ["records", "p50", "p99", "max", "over budget", "fsyncs", "records/fsync"],
+            [[
+                f"{events:,}",
+                format_time(statistics.median(times)),
+                format_time(times[int(len(times) * 0.99)]),
+                format_time(times[-1]),
+                f"{stats['over_budget']} (> {format_time(APPEND_BUDGET).strip()})",
+                stats["commits"],
+                f"{events / stats['commits']:.0f}"
+            ]]
+        )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def replay(products, events, snapshot_every):
+    directory = tempfile.mkdtemp()
+
+    try:
+        journal = CartJournal(directory, snapshot_every=snapshot_every)
+        cart = Cart()
+        journal.restore(cart, {})
+        fill(journal, cart, products, events)
+        journal.close()
+
+        catalog = {p.id: p for p in products}
+
+        start = time.perf_counter()
+        recovered = CartJournal(directory)
+        restored = Cart()
+        recovered.restore(restored, catalog)
+        elapsed = time.perf_counter() - start
+
+        recovered.close()
+        assert restored.total() == cart.total()
+
+        return elapsed, len(restored.items)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    products = [p for p in synthetic_products(5_000).values() if p.unit_weight]
+
+    print("Hot path (record on the commit thread):")
+    hot_path(products, events)
+
+    print("\nRestart (read journal + rebuild cart):")
+    rows = []
+
+    for size in REPLAY_SIZES:
+        # snapshot_every larger than the run: the whole log is replayed
+        log_only, lines = replay(products, size, size + 1)
+        snapshotted, _ = replay(products, size, max(1, size // 10))
+        rows.append([
+            f"{size:,}", f"{lines:,}", format_time(log_only), format_time(snapshotted)
+        ])
+
+    print_table(["events", "cart lines", "log only", "snapshot + tail"], rows)
+
+
+if __name__ == "__main__":
+    main()
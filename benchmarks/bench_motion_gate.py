@@ -0,0 +1,170 @@
+"""
+Motion-gated frame selection vs analyzing the first frame after the
+scale settles.
+
+    python -m benchmarks.bench_motion_gate [events]
+
+Every scripted event is a 30 fps clip: the empty scene, then the
+product dropping in with the shopper's (orange-ish) hand over it, then
+the product at rest. Sensor noise changes every frame. The scale
+settles at a random frame between the middle of the drop and shortly
+after the product came to rest, so the first frame after it is
+sometimes still the hand and sometimes already the product.
+
+    first frame   analyze the first frame after the scale settled; if
+                  the colors are wrong, re-capture the next frame
+    motion gate   MotionGate.select() from the trigger, same re-capture
+
+Reports analyses per event (until the product's color is seen),
+first-try accuracy, frames compared by the gate and its cost per frame.
+"""
+import contextlib
+import io
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.frames import FRAME_SHAPE, PRODUCT_COLORS
+from benchmarks.harness import format_time, print_table
+from benchmarks.suite import scratch_dir
+from common.services.camera_real import analyze_frame_detailed
+from common.services.motion_gate import MotionGate
+
+
+FPS = 30
+HAND_COLOR = (90, 130, 200)      # BGR, lands in the orange hue band
+PRODUCTS = [c for c in PRODUCT_COLORS if c not in ("orange", "white")]
+
+BEFORE = 3       # empty-scene frames before the trigger
+MOVING = 5       # product dropping, hand in view
+SETTLE_AT = (2, MOVING + 2)   # frame range after the trigger the scale settles in
+STILL = 8        # product at rest
+
+
+class ClipStream:
+    """
+    Replays (timestamp, frame) pairs like a CameraStream whose ring
+    buffer holds the whole clip.
+    """
+
+    def __init__(self, frames):
+        self._frames = frames
+
+    def frames_since(self, ts):
+        return [item for item in self._frames if item[0] > ts]
+
+    def frame_after(self, ts, timeout=1.0):
+        for item in self._frames:
+            if item[0] > ts:
+                return item
+        return None, None
+
+
+def build_clip(color, seed):
+    rng = np.random.default_rng(seed)
+    h, w, _ = FRAME_SHAPE
+
+    scene = rng.integers(20, 60, size=FRAME_SHAPE, dtype=np.uint8)
+    box_h, box_w = h // 8, w // 10
+    y_rest, x0 = h // 2 - box_h // 2, w // 2 - box_w // 2
+
+    def frame(product_y=None, hand_x=None):
+        f = scene.copy()
+
+        if product_y is not None:
+            f[product_y:product_y + box_h, x0:x0 + box_w] = PRODUCT_COLORS[color]
+
+        if hand_x is not None:
+            f[y_rest - box_h // 2:y_rest + box_h, hand_x:hand_x + box_w * 2] = HAND_COLOR
+
+        noise = rng.integers(-4, 5, size=FRAME_SHAPE)
+        return np.clip(f.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+    frames = [frame() for _ in range(BEFORE)]
+    trigger = len(frames)
+
+    for i in range(MOVING):
+        drop = (MOVING - 1 - i) * box_h // 3
+        frames.append(frame(y_rest - drop, x0 - box_w // 2 + i * box_w // 2))
+
+    frames += [frame(y_rest) for _ in range(STILL)]
+
+    stamped = [(i / FPS, f) for i, f in enumerate(frames)]
+    trigger_ts = (trigger - 0.5) / FPS
+    settled_ts = (trigger + rng.integers(*SETTLE_AT, endpoint=True)) / FPS
+
+    return stamped, trigger_ts, settled_ts
+
+
+def analyses_until_correct(stream, frame, color, after):
+    """
+    Analyzes `frame`, then re-captures later frames until the product's
+    color is detected. Returns (analyses, first try correct).
+    """
+
+    analyses = 0
+    ts = after
+
+    while frame is not None:
+        analyses += 1
+        colors = analyze_frame_detailed(frame)["colors"] or []
+
+        if colors and colors[0] == color:
+            return analyses, analyses == 1
+
+        ts, frame = stream.frame_after(ts)
+
+    return analyses, False
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+
+    clips = [build_clip(PRODUCTS[i % len(PRODUCTS)], seed=i) for i in range(events)]
+    gate = MotionGate()
+
+    first = {"analyses": 0, "correct": 0}
+    gated = {"analyses": 0, "correct": 0}
+    gate_time = 0.0
+
+    with scratch_dir(), contextlib.redirect_stdout(io.StringIO()):
+        for i, (frames, trigger_ts, settled_ts) in enumerate(clips):
+            color = PRODUCTS[i % len(PRODUCTS)]
+            stream = ClipStream(frames)
+
+            ts, frame = stream.frame_after(settled_ts)
+            analyses, correct = analyses_until_correct(stream, frame, color, ts)
+            first["analyses"] += analyses
+            first["correct"] += correct
+
+            start = time.perf_counter()
+            background = gate.background(stream, trigger_ts)
+            frame = gate.select(stream, background, trigger_ts)
+            gate_time += time.perf_counter() - start
+
+            ts = next(t for t, f in frames if f is frame)
+            analyses, correct = analyses_until_correct(stream, frame, color, ts)
+            gated["analyses"] += analyses
+            gated["correct"] += correct
+
+    stats = gate.stats()
+
+    print_table(
+        ["selection", "analyses / event", "first try correct"],
+        [
+            ["first frame", f"{first['analyses'] / events:.2f}", f"{first['correct']}/{events}"],
+            ["motion gate", f"{gated['analyses'] / events:.2f}", f"{gated['correct']}/{events}"],
+        ]
+    )
+
+    print(
+        f"\nGate: {stats['frames_per_event']:.1f} frames compared per event, "
+        f"{format_time(gate_time / max(1, stats['frames'] + events))} per frame; "
+        f"gated {stats['gated']}, unchanged {stats['unchanged']}, fallbacks {stats['fallbacks']}, "
+        f"no background {stats['no_background']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
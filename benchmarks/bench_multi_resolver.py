@@ -0,0 +1,74 @@
+"""
+Multi-item resolution: how often and how fast.
+
+    python -m benchmarks.bench_multi_resolver [max_skus]
+
+Each query is 2-3 random catalog products put in at once. Reports how
+often some combination explains the weight, how often the items
+actually picked are among the returned combinations, how often the
+search hit its time budget, and the per-event time.
+
+On big synthetic catalogs many combinations fit any weight within
+±5 g, so "picked items found" drops: weight plus color narrows the
+candidates, it cannot identify the exact items on its own.
+"""
+import contextlib
+import io
+import sys
+import time
+
+from benchmarks.catalogs import multi_item_queries, synthetic_products
+from benchmarks.harness import format_time, print_table
+from common.services.product_index import ProductIndex
+from common.services.product_resolver import resolve_products_by_weight_multi
+from common.services.weight_combinations import TIME_BUDGET
+
+
+SIZES = [100, 1_000, 5_000, 10_000]
+QUERIES = 100
+
+
+def main():
+    max_skus = int(sys.argv[1]) if len(sys.argv) > 1 else SIZES[-1]
+    rows = []
+
+    for size in [s for s in SIZES if s <= max_skus]:
+        products = synthetic_products(size)
+        index = ProductIndex(products)
+        queries = multi_item_queries(products, QUERIES)
+
+        hits = explained = 0
+        timings = []
+        log = io.StringIO()
+
+        for categories, weight, colors, picked in queries:
+            with contextlib.redirect_stdout(log):
+                start = time.perf_counter()
+                combos = resolve_products_by_weight_multi(index, categories, weight, colors)
+                timings.append(time.perf_counter() - start)
+
+            explained += bool(combos)
+            wanted = sorted(p.id for p in picked)
+            hits += any(sorted(p.id for p in combo) == wanted for combo in combos)
+
+        timings.sort()
+        budget_hits = log.getvalue().count("budget")
+
+        rows.append([
+            f"{size:,}",
+            f"{explained / QUERIES:.0%}",
+            f"{hits / QUERIES:.0%}",
+            f"{budget_hits}",
+            format_time(timings[len(timings) // 2]),
+            format_time(timings[-1])
+        ])
+
+    print_table(
+        ["SKUs", "explained", "picked items found", "hit budget", "median", "max"],
+        rows
+    )
+    print(f"\nTime budget per event: {TIME_BUDGET * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Headless pipeline throughput.
+
+    python -m benchmarks.bench_pipeline [events] [max_carts]
+
+Runs the full pipeline (stabilization on synthetic load-cell traces,
+vision on synthetic frames, resolve, ML, cart commit) without Tk and
+reports raw events per second, for one cart and for several carts
+sharing one catalog and model in the same process.
+
+Needs a trained model (python ml/train.py).
+"""
+import contextlib
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.frames import synthetic_frame
+from benchmarks.harness import print_table
+from common.models.cart import Cart
+from common.services.pipeline import Pipeline
+from common.services.product_index import ProductIndex
+from common.services.product_loader import load_products
+from inputs.simulation.weight_provider_sim import WeightProvider
+from ml.model import ProductMLModel
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (weight delta, frame color) pairs that resolve against data/products.json
+SCRIPT = [
+    (125, "orange"),   # Santoor Soap
+    (250, "orange"),   # Maaza
+    (100, "yellow"),   # Lays
+    (-125, "orange"),
+    (75, "blue"),      # Ujala
+    (-100, "yellow"),
+]
+
+
+class ReplayCamera:
+    """
+    Camera stand-in: returns pre-rendered frames in order.
+    """
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.i = 0
+
+    def frame_after(self, ts, timeout=None):
+        frame = self.frames[self.i % len(self.frames)]
+        self.i += 1
+        return ts, frame
+
+
+def make_pipeline(model, index, n_events):
+    script = [SCRIPT[i % len(SCRIPT)] for i in range(n_events)]
+
+    weights = [w for w, _ in script]
+
+    # Every removal in SCRIPT matches a single cart line by weight, so
+    # only the adds reach the camera
+    frames = [
+        synthetic_frame(color, seed=i)
+        for i, (w, color) in enumerate(script) if w > 0
+    ]
+
+    return Pipeline(
+        weight_provider=WeightProvider(demo_weights=weights, realtime=False),
+        camera=ReplayCamera(frames),
+        ml_model=model,
+        catalog=index,
+        cart=Cart()
+    )
+
+
+def run_carts(n_carts, n_events, model, index):
+    pipelines = [make_pipeline(model, index, n_events) for _ in range(n_carts)]
+    results = [None] * n_carts
+
+    def worker(i):
+        results[i] = pipelines[i].run_headless()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_carts)]
+
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    events = sum(r["events"] for r in results)
+    return events, elapsed, results
+
+
+def main():
+    n_events = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    max_carts = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    model = ProductMLModel(model_path=os.path.join(ROOT, "ml", "knn_model.pkl"))
+    model.load()
+    index = ProductIndex(load_products(os.path.join(ROOT, "data", "products.json")))
+
+    rows = []
+    outcomes = None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+
+        try:
+            for n_carts in sorted({1, 2, max_carts}):
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    events, elapsed, results = run_carts(n_carts, n_events, model, index)
+
+                outcomes = results[0]["outcomes"]
+                rows.append([
+                    n_carts,
+                    events,
+                    f"{elapsed:.2f} s",
+                    f"{events / elapsed:.1f}",
+                    f"{elapsed / events * 1000:.2f} ms"
+                ])
+        finally:
+            os.chdir(cwd)
+
+    print_table(["carts", "events", "wall time", "events/s", "per event"], rows)
+    print(f"\nOutcomes (first cart): {outcomes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Resolver benchmark: original linear scan vs ProductIndex.
+
+    python -m benchmarks.bench_resolver [max_skus]
+
+Checks that both return the same candidates (same order) for every
+query, then reports per-query time from 10 to 100k SKUs.
+"""
+import sys
+import time
+
+from benchmarks.catalogs import random_queries, synthetic_products
+from benchmarks.harness import format_time, measure, print_table
+from common.services.product_index import ProductIndex
+
+
+SIZES = [10, 100, 1_000, 10_000, 100_000]
+TOLERANCE = 5
+
+
+def legacy_resolve(products, candidate_categories, weight_delta, detected_colors):
+    """
+    The original two-pass scan from product_resolver (without the
+    fallback print). Products without unit_weight are skipped in the
+    fallback too — the original raised TypeError on them.
+    """
+
+    target = abs(weight_delta)
+    candidates = []
+
+    for product in products.values():
+        if product.category not in candidate_categories:
+            continue
+        if product.unit_weight is None:
+            continue
+
+        palette = product.vision_profile.get("dominant_colors", [])
+
+        if not any(c in palette for c in detected_colors):
+            continue
+
+        diff = abs(product.unit_weight - target)
+        if diff <= TOLERANCE:
+            candidates.append((product, diff))
+
+    if not candidates:
+        for product in products.values():
+            if product.category not in candidate_categories:
+                continue
+            if product.unit_weight is None:
+                continue
+
+            diff = abs(product.unit_weight - target)
+            if diff <= TOLERANCE:
+                candidates.append((product, diff))
+
+    candidates.sort(key=lambda x: x[1])
+
+    return [c[0] for c in candidates]
+
+
+def main():
+    max_skus = int(sys.argv[1]) if len(sys.argv) > 1 else SIZES[-1]
+    queries = random_queries(200)
+    rows = []
+
+    for size in [s for s in SIZES if s <= max_skus]:
+        products = synthetic_products(size)
+
+        start = time.perf_counter()
+        index = ProductIndex(products)
+        build = time.perf_counter() - start
+
+        for categories, weight, colors in queries:
+            expected = legacy_resolve(products, categories, weight, colors)
+            got, _ = index.lookup(categories, abs(weight), TOLERANCE, colors)
+            assert [p.id for p in got] == [p.id for p in expected], (size, weight)
+
+        # Fewer timed queries on big catalogs keeps the scan side bearable
+        timed = queries if size < 10_000 else queries[:20]
+
+        def run_legacy():
+            for q in timed:
+                legacy_resolve(products, *q)
+
+        def run_index():
+            for categories, weight, colors in timed:
+                index.lookup(categories, abs(weight), TOLERANCE, colors)
+
+        repeat = 3 if size >= 10_000 else 5
+        legacy = measure(run_legacy, repeat=repeat)["best"] / len(timed)
+        indexed = measure(run_index, repeat=repeat)["best"] / len(timed)
+
+        rows.append([
+            f"{size:,}",
+            format_time(legacy),
+            format_time(indexed),
+            f"{legacy / indexed:8.1f}x",
+            format_time(build)
+        ])
+
+    print("All queries returned identical candidates.\n")
+    print_table(
+        ["SKUs", "scan / query", "index / query", "speed-up", "index build"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
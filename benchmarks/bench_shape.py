@@ -0,0 +1,126 @@
+"""
+Shape stage accuracy vs speed across pyramid levels.
+
+    python -m benchmarks.bench_shape [frames]
+
+Runs extract_shape_features() on synthetic center crops (product boxes
+of 30-90 % of the crop, half of them with an accent stripe) at pyramid
+levels 0-3.
+
+Errors are p95 over the frame set, against two references:
+
+    vs level 0   the original full-resolution path
+    vs truth     the painted product box (bbox area as object area)
+
+The background of the synthetic frames is heavy per-pixel noise, which
+glues extra edges to the product at full resolution; downscaling
+averages it out, so the higher levels land closer to the truth than
+level 0 does. Boxes that reach the crop edge leave an open contour with
+almost no area at every level; they set the "area vs truth" column.
+"""
+import sys
+
+import cv2
+import numpy as np
+
+from benchmarks.frames import PRODUCT_COLORS, center_crop, synthetic_frame
+from benchmarks.harness import format_time, measure, print_table
+from common.services.camera_real import SHAPE_LEVEL, extract_shape_features
+
+
+LEVELS = [0, 1, 2, 3]
+
+
+def frame_set(n):
+    """
+    Returns [(crop, truth)], truth = (aspect, area_ratio, bbox).
+    """
+
+    names = list(PRODUCT_COLORS)
+    frames = []
+
+    for i in range(n):
+        color = names[i % len(names)]
+        accent = names[(i + 3) % len(names)] if i % 2 else None
+        scale = 0.3 + 0.6 * ((i * 7) % 10) / 10
+
+        crop = np.ascontiguousarray(
+            center_crop(synthetic_frame(color, seed=i, box_scale=scale, accent=accent))
+        )
+        frames.append((crop, truth(crop, color, accent)))
+
+    return frames
+
+
+def truth(crop, color, accent=None):
+    pixels = crop.astype(np.int16)
+    painted = np.abs(pixels - PRODUCT_COLORS[color]).max(axis=2) <= 13
+
+    if accent:
+        painted |= (pixels == PRODUCT_COLORS[accent]).all(axis=2)
+
+    x, y, w, h = cv2.boundingRect(painted.view(np.uint8))
+    return w / h, w * h / (crop.shape[0] * crop.shape[1]), (x, y, w, h)
+
+
+def errors(results, references):
+    """
+    p95 of: relative aspect error, absolute area ratio error, largest
+    bbox edge offset (px). A missed shape counts as error 1 / 1 / 999.
+    """
+
+    aspect, area, bbox = [], [], []
+
+    for got, ref in zip(results, references):
+        if got[0] is None or ref[0] is None:
+            aspect.append(1.0)
+            area.append(1.0)
+            bbox.append(999)
+            continue
+
+        aspect.append(abs(got[0] - ref[0]) / ref[0])
+        area.append(abs(got[1] - ref[1]))
+        bbox.append(max(abs(a - b) for a, b in zip(got[2], ref[2])))
+
+    return (
+        f"{np.percentile(aspect, 95) * 100:.1f} %",
+        f"{np.percentile(area, 95):.3f}",
+        f"{np.percentile(bbox, 95):.0f} px"
+    )
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    frames = frame_set(n)
+    truths = [t for _, t in frames]
+
+    full = [extract_shape_features(crop, level=0) for crop, _ in frames]
+    rows = []
+
+    for level in LEVELS:
+        def run():
+            return [extract_shape_features(crop, level) for crop, _ in frames]
+
+        results = run()
+        timing = measure(run, repeat=5)["best"] / len(frames)
+
+        rows.append([
+            f"{level}{' *' if level == SHAPE_LEVEL else ''}",
+            format_time(timing),
+            *errors(results, full),
+            *errors(results, truths)
+        ])
+
+    print(f"{n} crops of {frames[0][0].shape[1]}x{frames[0][0].shape[0]}, p95 errors (* = default)\n")
+    print_table(
+        [
+            "level", "time / crop",
+            "aspect vs L0", "area vs L0", "bbox vs L0",
+            "aspect vs truth", "area vs truth", "bbox vs truth"
+        ],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Per-process cost of the catalog + KNN model: private load vs shared
+attach.
+
+    python -m benchmarks.bench_shared_catalog [max_skus]
+
+For each catalog size a KNN model is trained on synthetic rows and the
+pair is published once (SharedCatalogPublisher). Then two fresh worker
+processes each get ready to resolve and run the same 200 queries:
+
+    load     load_products() + ProductIndex + joblib model (as main.py)
+    attach   SharedCatalog + SharedProductIndex + SharedMLModel
+
+and report their time to ready (imports included) and private memory
+(RssAnon, Linux). Shared pages are paid once per host, not per cart.
+Both workers must return the same candidate ids and model prediction
+for every query. Finally the publisher republishes and an attached
+worker's switch to the new generation is timed.
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.harness import format_time, print_table
+
+
+SIZES = [1_000, 10_000, 100_000]
+QUERIES = 200
+ROWS_PER_SKU = 4
+
+
+def private_memory():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def worker(mode, products_path, model_path, shared_dir):
+    """
+    Runs in a subprocess; prints a JSON result line.
+    """
+    start = time.perf_counter()
+
+    from benchmarks.catalogs import random_queries
+    from common.services.product_resolver import resolve_product_by_weight
+    from ml.utils import extract_ml_features
+
+    if mode == "load":
+        from common.services.product_index import ProductIndex
+        from common.services.product_loader import load_products
+        from ml.model import ProductMLModel
+
+        index = ProductIndex(load_products(products_path))
+        model = ProductMLModel(model_path)
+        model.load()
+    else:
+        from common.services.shared_catalog import (
+            SharedCatalog, SharedMLModel, SharedProductIndex
+        )
+
+        catalog = SharedCatalog(shared_dir)
+        index = SharedProductIndex(catalog)
+        model = SharedMLModel(catalog)
+
+    ready = time.perf_counter() - start
+    answers = []
+
+    for categories, weight, colors in random_queries(QUERIES):
+        candidates = resolve_product_by_weight(index, categories, weight, colors)
+        label, confidence = model.predict(
+            extract_ml_features(abs(weight), 1.0, 0.2, colors[0] if colors else None)
+        )
+        answers.append([[p.id for p in candidates], str(label), float(confidence)])
+
+    print(json.dumps({"ready": ready, "memory": private_memory(), "answers": answers}))
+
+
+def run_worker(mode, *paths):
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_shared_catalog", "--worker", mode, *paths],
+        capture_output=True, text=True, check=True
+    ).stdout
+
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def train_model(records, path):
+    import joblib
+    import numpy as np
+    from sklearn.neighbors import KNeighborsClassifier
+
+    rng = np.random.default_rng(0)
+    unit = [r for r in records if r.get("unit_weight")]
+    rows = []
+    labels = []
+
+    for r in unit:
+        for _ in range(ROWS_PER_SKU):
+            low, high = r["shape_profile"]["aspect_ratio"]
+            rows.append([
+                r["unit_weight"] + rng.normal(0, 2),
+                rng.uniform(low, high),
+                r["shape_profile"]["min_area_ratio"] + rng.uniform(0, 0.2),
+                rng.integers(0, 9)
+            ])
+            labels.append(r["id"])
+
+    model = KNeighborsClassifier(n_neighbors=3).fit(np.array(rows), labels)
+    joblib.dump(model, path)
+
+
+def main():
+    from benchmarks.catalogs import catalog_records
+    from common.services.shared_catalog import SHARED_DIR, SharedCatalog, SharedCatalogPublisher
+    from ml.model import ProductMLModel
+
+    max_skus = int(sys.argv[1]) if len(sys.argv) > 1 else SIZES[-1]
+    rows = []
+    switches = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in [s for s in SIZES if s <= max_skus]:
+            records = catalog_records(size)
+
+            products_path = os.path.join(tmp, f"products_{size}.json")
+            model_path = os.path.join(tmp, f"knn_{size}.pkl")
+            shared_dir = os.path.join(os.path.dirname(SHARED_DIR), f"smartcart-bench-{size}")
+
+            with open(products_path, "w") as f:
+                json.dump(records, f)
+
+            train_model(records, model_path)
+
+            ml_model = ProductMLModel(model_path)
+            ml_model.load()
+
+            publisher = SharedCatalogPublisher(shared_dir)
+
+            try:
+                start = time.perf_counter()
+                publisher.publish(records, ml_model)
+                publish = time.perf_counter() - start
+
+                load = run_worker("load", products_path, model_path, shared_dir)
+                attach = run_worker("attach", products_path, model_path, shared_dir)
+
+                assert load["answers"] == attach["answers"], f"{size:,} SKUs: attach differs from load"
+
+                rows.append([
+                    f"{size:,}",
+                    format_time(load["ready"]), format_time(attach["ready"]),
+                    f"{(load['memory'] or 0) / 2**20:.1f} MB",
+                    f"{(attach['memory'] or 0) / 2**20:.1f} MB"
+                ])
+
+                catalog = SharedCatalog(shared_dir)
+                publisher.publish(records, ml_model)
+
+                start = time.perf_counter()
+                catalog.current()
+                switch = time.perf_counter() - start
+
+                switches.append([f"{size:,}", format_time(publish), format_time(switch)])
+            finally:
+                publisher.close(remove=True)
+                shutil.rmtree(shared_dir, ignore_errors=True)
+
+    print_table(
+        ["SKUs", "load: ready", "attach: ready", "load: private", "attach: private"],
+        rows
+    )
+    print()
+    print_table(["SKUs", "publish", "worker switch"], switches)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--worker"]:
+        worker(*sys.argv[2:6])
+    else:
+        main()
@@ -0,0 +1,88 @@
+"""
+Cart table refresh: full redraw vs diff-based update, and view switches.
+
+    python -m benchmarks.bench_ui_refresh [max_rows]
+
+Fills the cart, then times one event (one more unit of an item already
+in the cart) followed by SmartCartUI.refresh(). "full" forgets the
+rendered version before each refresh, which forces the old
+delete-everything-and-reinsert path; "diff" touches only the changed
+row. Then times one round cart → bill → payment → exit → cart of the
+cached screens. Needs a display (Tk), so these are not part of
+benchmarks.suite.
+"""
+import sys
+import tkinter as tk
+
+from benchmarks.catalogs import synthetic_products
+from benchmarks.harness import format_time, measure, print_table
+from common.models.cart import Cart
+
+
+SIZES = [10, 100, 1_000, 5_000]
+
+
+def filled_ui(size):
+    from common.ui.smart_cart_ui import SmartCartUI
+
+    products = [p for p in synthetic_products(size * 2).values() if p.unit_weight][:size]
+    cart = Cart()
+
+    for p in products:
+        cart.add(p, p.unit_weight)
+
+    ui = SmartCartUI(cart)
+    ui.withdraw()
+    ui.update_idletasks()
+
+    return ui, cart, products[len(products) // 2]
+
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else SIZES[-1]
+    rows = []
+
+    for size in [s for s in SIZES if s <= max_rows]:
+        try:
+            ui, cart, product = filled_ui(size)
+        except tk.TclError as e:
+            print(f"Skipped: no display ({e})")
+            return
+
+        def event(full):
+            cart.add(product, product.unit_weight)
+            if full:
+                ui._rendered_version = None
+            ui.refresh()
+            ui.update_idletasks()
+
+        full = measure(event, True, repeat=3, min_time=0.1)["best"]
+        diff = measure(event, False, repeat=3, min_time=0.1)["best"]
+
+        assert len(ui.tree.get_children()) == len(cart.items)
+        ui.destroy()
+
+        rows.append([
+            f"{size:,}", format_time(full), format_time(diff), f"{full / diff:.0f}x"
+        ])
+
+    print_table(["rows", "full redraw", "diff update", "speedup"], rows)
+
+    ui, _, _ = filled_ui(100)
+
+    def switch_views():
+        for show in (
+            ui.show_final_bill, ui.show_payment_view,
+            ui.show_exit_verification, ui.show_cart_view
+        ):
+            show()
+            ui.update_idletasks()
+
+    switch = measure(switch_views, repeat=3, min_time=0.1)["best"]
+    ui.destroy()
+
+    print(f"\nView switch round (100 rows): {format_time(switch).strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Vision throughput: in-thread analysis vs a VisionPool of 1..N worker
+processes.
+
+    python -m benchmarks.bench_vision_pool [max_workers] [--frames 200]
+
+Each run pushes the same synthetic 1280x720 frames through
+analyze_frame_detailed() — in the calling thread, in 4 threads, and
+through pools of increasing size with every slot kept busy (several
+cameras feeding one host) — and reports frames/s and the speed-up
+over one thread. "latency" is one frame's submit -> result round trip
+on an idle pool.
+
+Scaling stops at the number of cores (os.cpu_count() here).
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.frames import frame_set
+from benchmarks.harness import format_time, print_table
+from benchmarks.suite import scratch_dir
+from common.services.camera_real import analyze_frame_detailed
+from common.services.vision_pool import VisionPool
+
+
+THREADS = 4
+
+
+def run_thread(frames):
+    start = time.perf_counter()
+
+    for frame in frames:
+        analyze_frame_detailed(frame)
+
+    return time.perf_counter() - start
+
+
+def run_threads(frames, threads=THREADS):
+    with ThreadPoolExecutor(threads) as executor:
+        start = time.perf_counter()
+        list(executor.map(analyze_frame_detailed, frames))
+        return time.perf_counter() - start
+
+
+def run_pool(frames, workers):
+    pool = VisionPool(workers, quiet=True).start()
+
+    try:
+        # Idle round trip
+        pool.analyze(frames[0])
+        start = time.perf_counter()
+        pool.analyze(frames[1])
+        latency = time.perf_counter() - start
+
+        start = time.perf_counter()
+        futures = [pool.submit(frame) for frame in frames]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+    finally:
+        pool.close()
+
+    return elapsed, latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vision pool throughput")
+    parser.add_argument("max_workers", nargs="?", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    base = frame_set(14)
+    frames = [base[i % len(base)] for i in range(args.frames)]
+
+    rows = []
+
+    # The analysis prints per frame; silenced for the whole run (not per
+    # thread: redirect_stdout is process-wide)
+    with scratch_dir(), contextlib.redirect_stdout(io.StringIO()):
+        single = run_thread(frames)
+        rows.append(["in-thread", f"{len(frames) / single:,.1f}", "1.00x", "-"])
+
+        elapsed = run_threads(frames)
+        rows.append([
+            f"{THREADS} threads", f"{len(frames) / elapsed:,.1f}",
+            f"{single / elapsed:.2f}x", "-"
+        ])
+
+        for workers in range(1, args.max_workers + 1):
+            elapsed, latency = run_pool(frames, workers)
+            rows.append([
+                f"pool x{workers}", f"{len(frames) / elapsed:,.1f}",
+                f"{single / elapsed:.2f}x", format_time(latency)
+            ])
+
+    print(f"{len(frames)} frames, {os.cpu_count()} CPU(s)\n")
+    print_table(["analysis", "frames/s", "speed-up", "latency"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Synthetic product catalogs for benchmarks.
+
+Records follow the data/products.json schema, so they can go through
+the normal loader as well as be turned into Product objects directly.
+"""
+import random
+
+from common.models.product import Product
+from common.services.vision_mapper import COLOR_TO_CATEGORY
+
+
+CATEGORIES = sorted({c for cats in COLOR_TO_CATEGORY.values() for c in cats})
+COLORS = list(COLOR_TO_CATEGORY)
+FORMS = ["box", "bottle", "packet", "pouch", "pen", "book"]
+
+
+def catalog_records(n, seed=0, loose_ratio=0.02):
+    """
+    Returns n product records (dicts). About `loose_ratio` of them are
+    priced by weight (no unit_weight).
+    """
+
+    rng = random.Random(seed)
+    records = []
+
+    for i in range(n):
+        low = round(rng.uniform(0.3, 3.0), 2)
+
+        record = {
+            "id": f"S{i:06d}",
+            "name": f"Synthetic Product {i}",
+            "category": rng.choice(CATEGORIES),
+            "vision_profile": {
+                "dominant_colors": rng.sample(COLORS, rng.randint(1, 3))
+            },
+            "shape_profile": {
+                "form": rng.choice(FORMS),
+                "aspect_ratio": [low, round(low + rng.uniform(0.3, 3.0), 2)],
+                "min_area_ratio": round(rng.uniform(0.03, 0.15), 2)
+            }
+        }
+
+        if rng.random() < loose_ratio:
+            record["price_per_gram"] = round(rng.uniform(0.05, 2.0), 3)
+        else:
+            record["unit_weight"] = rng.randint(5, 2000)
+            record["price_per_unit"] = rng.randint(5, 500)
+
+        records.append(record)
+
+    return records
+
+
+def synthetic_products(n, seed=0):
+    """
+    Same records as catalog_records(), as a {id: Product} dict.
+    """
+
+    products = {}
+
+    for p in catalog_records(n, seed):
+        products[p["id"]] = Product(
+            id=p["id"],
+            name=p["name"],
+            category=p["category"],
+            unit_weight=p.get("unit_weight"),
+            price_per_unit=p.get("price_per_unit"),
+            price_per_gram=p.get("price_per_gram"),
+            vision_profile=p.get("vision_profile"),
+            shape_profile=p.get("shape_profile")
+        )
+
+    return products
+
+
+def random_queries(n, seed=1):
+    """
+    Returns n (candidate_categories, weight_delta, detected_colors)
+    tuples shaped like the pipeline's resolver calls.
+    """
+
+    rng = random.Random(seed)
+    queries = []
+
+    for _ in range(n):
+        colors = rng.sample(COLORS, rng.randint(1, 2))
+        categories = sorted({c for color in colors for c in COLOR_TO_CATEGORY[color]})
+        weight = rng.randint(5, 2000) * rng.choice([1, -1])
+        queries.append((categories, weight, colors))
+
+    return queries
+
+
+def multi_item_queries(products, n, seed=2, max_items=3):
+    """
+    Returns n (candidate_categories, weight_delta, detected_colors,
+    picked) tuples for events where 2..max_items random unit products
+    went in at once; weight_delta is their total weight.
+    """
+
+    rng = random.Random(seed)
+    pool = [p for p in products.values() if p.unit_weight is not None]
+    queries = []
+
+    for _ in range(n):
+        picked = rng.sample(pool, rng.randint(2, max_items))
+        colors = sorted({p.dominant_colors[0] for p in picked if p.dominant_colors})
+        categories = sorted({c for color in colors for c in COLOR_TO_CATEGORY[color]})
+        weight = sum(p.unit_weight for p in picked)
+        queries.append((categories, weight, colors, picked))
+
+    return queries
@@ -0,0 +1,83 @@
+"""
+Deterministic synthetic camera frames for benchmarks.
+
+Each frame is a 1280x720 BGR image with a textured, dim background and
+a colored "product" rectangle near the center, roughly what the cart
+camera sees when an item is held in front of it.
+"""
+import numpy as np
+
+
+FRAME_SHAPE = (720, 1280, 3)
+
+# BGR values picked to land inside each classify_color() hue band
+PRODUCT_COLORS = {
+    "orange": (0, 128, 255),
+    "yellow": (20, 230, 210),
+    "green": (40, 190, 40),
+    "blue": (210, 90, 20),
+    "red": (30, 30, 220),
+    "purple": (160, 40, 130),
+    "white": (235, 235, 235),
+}
+
+
+def synthetic_frame(color="orange", seed=0, box_scale=0.5, accent=None):
+    """
+    Builds one frame.
+
+    box_scale: product size relative to the center crop (0-1)
+    accent:    optional second color painted as a stripe on the product
+    """
+
+    rng = np.random.default_rng(seed)
+
+    frame = rng.integers(20, 60, size=FRAME_SHAPE, dtype=np.uint8)
+
+    h, w, _ = FRAME_SHAPE
+    crop_h, crop_w = int(h * 0.3), int(w * 0.3)
+
+    box_h = int(crop_h * box_scale)
+    box_w = int(crop_w * box_scale * (0.6 + rng.random() * 0.8))
+    box_w = min(box_w, crop_w)
+
+    y0 = h // 2 - box_h // 2 + int(rng.integers(-10, 10))
+    x0 = w // 2 - box_w // 2 + int(rng.integers(-10, 10))
+
+    product = np.array(PRODUCT_COLORS[color], dtype=np.int16)
+    noise = rng.integers(-12, 12, size=(box_h, box_w, 3))
+
+    frame[y0:y0 + box_h, x0:x0 + box_w] = np.clip(
+        product + noise, 0, 255
+    ).astype(np.uint8)
+
+    if accent:
+        stripe = max(1, box_h // 4)
+        frame[y0:y0 + stripe, x0:x0 + box_w] = PRODUCT_COLORS[accent]
+
+    return frame
+
+
+def frame_set(n=14, seed=0):
+    """
+    Returns n frames cycling through the product colors, every other
+    one with an accent stripe.
+    """
+
+    names = list(PRODUCT_COLORS)
+    frames = []
+
+    for i in range(n):
+        color = names[i % len(names)]
+        accent = names[(i + 3) % len(names)] if i % 2 else None
+        frames.append(synthetic_frame(color, seed=seed + i, accent=accent))
+
+    return frames
+
+
+def center_crop(frame):
+    h, w, _ = frame.shape
+    return frame[
+        int(h * 0.35):int(h * 0.65),
+        int(w * 0.35):int(w * 0.65)
+    ]
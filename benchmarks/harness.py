@@ -0,0 +1,69 @@
+"""
+Tiny timing helpers shared by the benchmark scripts.
+
+Run benchmarks from the project root, e.g.:
+    python -m benchmarks.bench_color
+"""
+import statistics
+import time
+
+
+def measure(fn, *args, repeat=5, number=None, min_time=0.2):
+    """
+    Times fn(*args).
+
+    number: calls per repeat; auto-calibrated so one repeat takes at
+            least `min_time` seconds when not given.
+
+    Returns dict with per-call seconds: best, median, number, repeat
+    """
+
+    if number is None:
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                fn(*args)
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time or number >= 1_000_000:
+                break
+            number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn(*args)
+        timings.append((time.perf_counter() - start) / number)
+
+    return {
+        "best": min(timings),
+        "median": statistics.median(timings),
+        "number": number,
+        "repeat": repeat
+    }
+
+
+def format_time(seconds):
+    if seconds < 1e-6:
+        return f"{seconds * 1e9:8.1f} ns"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:8.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds:8.2f} s "
+
+
+def print_table(headers, rows):
+    widths = [
+        max(len(str(h)), *(len(str(r[i])) for r in rows))
+        for i, h in enumerate(headers)
+    ]
+
+    line = "  ".join(str(h).ljust(w) for h, w in zip(headers, widths))
+    print(line)
+    print("-" * len(line))
+
+    for r in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(r, widths)))
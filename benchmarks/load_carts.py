@@ -0,0 +1,202 @@
+"""
+Load generator for the cart server: N simulated carts at once.
+
+    python -m benchmarks.load_carts [carts] [--events 20] [--interval 0]
+    python -m benchmarks.load_carts 500 --connect 127.0.0.1:8765
+
+Without --connect a server is started in a subprocess
+(python main.py --serve) on a free port and stopped afterwards.
+
+Each cart connects, then sends `--events` events built from catalog
+products (weight, palette colors, an aspect / area ratio inside the
+product's shape profile): mostly additions, every fourth event takes
+back an item it added. A cart waits for each result before its next
+event, plus `--interval` seconds of "shopper time" (0 = flat out).
+
+Reports throughput, per-event round-trip latency, outcomes and the
+server's resident memory (Linux).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from benchmarks.harness import format_time, print_table
+from common.services.cart_protocol import encode, parse_address
+from common.services.product_loader import load_products
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_START_TIMEOUT = 30.0
+
+
+def features_for(product, rng):
+    low, high = product.aspect_ratio or (0.5, 2.0)
+
+    return {
+        "colors": list(product.dominant_colors[:2]),
+        "confidence": round(rng.uniform(0.5, 1.0), 3),
+        "aspect_ratio": round(rng.uniform(low, high), 3),
+        "area_ratio": round((product.min_area_ratio or 0.05) + rng.uniform(0.0, 0.2), 3)
+    }
+
+
+async def run_cart(address, cart_id, products, events, interval, latencies, outcomes):
+    kind, target = parse_address(address)
+
+    if kind == "unix":
+        reader, writer = await asyncio.open_unix_connection(target)
+    else:
+        reader, writer = await asyncio.open_connection(*target)
+
+    rng = random.Random(cart_id)
+    added = []
+
+    writer.write(encode({"type": "hello", "cart": cart_id}))
+    writer.write(encode({"type": "reset"}))
+    await writer.drain()
+
+    async def reply(request_id):
+        while True:
+            message = json.loads(await reader.readline())
+            if message.get("id") == request_id and message["type"] in ("result", "error"):
+                return message
+
+    for i in range(events):
+        if i % 4 == 3 and added:
+            product = added.pop(rng.randrange(len(added)))
+            weight_delta = -product.unit_weight
+        else:
+            product = rng.choice(products)
+            weight_delta = product.unit_weight
+
+        message = {"type": "event", "id": i + 1, "weight_delta": weight_delta}
+        message.update(features_for(product, rng))
+
+        start = time.perf_counter()
+        writer.write(encode(message))
+        await writer.drain()
+        result = await reply(i + 1)
+        latencies.append(time.perf_counter() - start)
+
+        outcome = result.get("outcome") or result["type"].upper()
+        outcomes[outcome] += 1
+
+        if outcome == "ADD" and weight_delta > 0:
+            added.append(product)
+
+        if interval:
+            await asyncio.sleep(interval * rng.uniform(0.5, 1.5))
+
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_load(address, carts, events, interval):
+    products = [p for p in load_products().values() if p.unit_weight]
+    latencies = []
+    outcomes = Counter()
+
+    start = time.perf_counter()
+
+    await asyncio.gather(*(
+        run_cart(address, f"load-{n}", products, events, interval, latencies, outcomes)
+        for n in range(carts)
+    ))
+
+    return time.perf_counter() - start, latencies, outcomes
+
+
+def free_address():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"127.0.0.1:{sock.getsockname()[1]}"
+
+
+def start_server(address):
+    server = subprocess.Popen(
+        [sys.executable, "main.py", "--serve", address],
+        cwd=ROOT, stdout=subprocess.DEVNULL
+    )
+
+    kind, target = parse_address(address)
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+
+    while time.monotonic() < deadline:
+        try:
+            if kind == "unix":
+                with socket.socket(socket.AF_UNIX) as sock:
+                    sock.connect(target)
+            else:
+                socket.create_connection(target, timeout=0.5).close()
+            return server
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError("cart server exited during start-up")
+            time.sleep(0.1)
+
+    server.kill()
+    raise RuntimeError("cart server did not start")
+
+
+def resident_memory(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate many carts against one cart server")
+    parser.add_argument("carts", nargs="?", type=int, default=100)
+    parser.add_argument("--events", type=int, default=20, help="events per cart")
+    parser.add_argument("--interval", type=float, default=0.0, help="mean s between a cart's events")
+    parser.add_argument("--connect", metavar="ADDRESS", help="use a running server")
+    args = parser.parse_args(argv)
+
+    address = args.connect or free_address()
+    server = None if args.connect else start_server(address)
+
+    try:
+        elapsed, latencies, outcomes = asyncio.run(
+            run_load(address, args.carts, args.events, args.interval)
+        )
+        rss = resident_memory(server.pid) if server else None
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    latencies.sort()
+    total = len(latencies)
+
+    print_table(
+        ["carts", "events", "elapsed", "events/s", "p50", "p99", "max"],
+        [[
+            f"{args.carts:,}", f"{total:,}", f"{elapsed:.2f} s",
+            f"{total / elapsed:,.0f}",
+            format_time(statistics.median(latencies)),
+            format_time(latencies[int(total * 0.99)]),
+            format_time(latencies[-1])
+        ]]
+    )
+
+    print("\nOutcomes:", dict(outcomes))
+
+    if rss is not None:
+        print(f"Server resident memory: {rss / 2**20:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Cold-start profiler.
+
+    python -m benchmarks.startup                  # import + init breakdown
+    python -m benchmarks.startup --budget-ms 1500 # exit 1 when over budget
+
+Imports: each boot module is imported in a fresh interpreter with
+`python -X importtime`, so the numbers are cold (nothing cached in
+sys.modules). The table lists the slowest modules pulled in.
+
+Init: times each step main.run_ui() needs (window, model, catalog +
+index, weight provider, first camera frame) one after another, then
+the same steps through main.start_warmup(), which runs them in
+parallel — that row should be close to the slowest single step, not
+the sum. Steps that need something missing here (a display, a trained
+model, a camera) are reported as skipped.
+
+The budget check uses time-to-window: the cold `import main` plus
+building the UI, i.e. what the shopper waits for before the screen
+appears.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.harness import format_time, print_table
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BOOT_MODULES = [
+    "main",
+    "common.ui.smart_cart_ui",
+    "common.services.pipeline",
+    "common.services.camera_stream",
+    "common.services.camera_real",
+    "common.services.product_loader",
+    "ml.model",
+]
+
+HEAVY_MODULES = ("numpy", "cv2", "sklearn", "joblib", "PIL", "qrcode")
+TOP_MODULES = 12
+
+
+# ---------------- IMPORTS ----------------
+def import_times(module):
+    """
+    Imports `module` in a fresh interpreter.
+    Returns (total_seconds, [(cumulative_seconds, self_seconds, name)]).
+    """
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    rows = []
+
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us) / 1e6, int(self_us) / 1e6, name.rstrip()))
+
+    total = rows[-1][0] if rows else 0.0
+    return total, rows
+
+
+# ---------------- INIT ----------------
+def timed(label, fn, results):
+    start = time.perf_counter()
+
+    try:
+        value = fn()
+    except Exception as e:
+        results.append((label, None, f"skipped ({type(e).__name__}: {e})"))
+        return None
+
+    results.append((label, time.perf_counter() - start, ""))
+    return value
+
+
+def init_times():
+    """
+    Times each startup step in this process, then the parallel warm-up.
+    """
+
+    results = []
+
+    timed("import main", lambda: __import__("main"), results)
+
+    def build_ui():
+        from common.models.cart import Cart
+        from common.ui.smart_cart_ui import SmartCartUI
+
+        ui = SmartCartUI(Cart())
+        ui.update()
+        return ui
+
+    ui = timed("SmartCartUI() + first draw", build_ui, results)
+
+    def load_model():
+        from ml.model import ProductMLModel
+
+        model = ProductMLModel(model_path=os.path.join(ROOT, "ml", "knn_model.pkl"))
+        model.load()
+        return model
+
+    timed("ProductMLModel.load()", load_model, results)
+
+    def load_catalog():
+        from common.services.product_index import ProductIndex
+        from common.services.product_loader import load_products
+
+        return ProductIndex(load_products(os.path.join(ROOT, "data", "products.json")))
+
+    timed("load_products() + ProductIndex", load_catalog, results)
+
+    def weight_provider():
+        from inputs.simulation.weight_provider_sim import WeightProvider
+        return WeightProvider()
+
+    timed("WeightProvider() (simulation)", weight_provider, results)
+
+    def first_frame():
+        from common.services.camera_stream import CameraStream
+
+        stream = CameraStream().start()
+        try:
+            _, frame = stream.latest(timeout=5.0)
+            if frame is None:
+                raise RuntimeError("no frame within 5 s")
+        finally:
+            stream.stop()
+
+    timed("CameraStream first frame", first_frame, results)
+
+    def parallel_warmup():
+        import tempfile
+
+        import main
+
+        # Never the real data/journal: shutdown discards the journal,
+        # and a crashed cart's journal must survive profiling
+        with tempfile.TemporaryDirectory() as journal_dir:
+            warmup = main.start_warmup("simulation", journal_dir=journal_dir)
+            warmup.wait_all()
+            main.shutdown_backend(warmup)
+
+        failed = [name for name, state in warmup.status().items() if state == "failed"]
+        if failed:
+            raise RuntimeError(f"failed: {', '.join(failed)}")
+
+    timed("start_warmup() (all in parallel)", parallel_warmup, results)
+
+    if ui is not None:
+        ui.destroy()
+
+    return results
+
+
+# ---------------- REPORT ----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--top", type=int, default=TOP_MODULES)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+
+    print("Cold imports (fresh interpreter each):\n")
+    rows = []
+    main_rows = []
+    main_total = 0.0
+
+    for module in BOOT_MODULES:
+        try:
+            total, detail = import_times(module)
+        except RuntimeError as e:
+            rows.append([module, "-", f"failed: {e}"])
+            continue
+
+        loaded = {name.strip() for _, _, name in detail}
+        heavy = [name for name in HEAVY_MODULES if name in loaded]
+        rows.append([module, format_time(total), ", ".join(heavy) or "-"])
+
+        if module == "main":
+            main_total, main_rows = total, detail
+
+    print_table(["module", "cold import", "heavy deps pulled in"], rows)
+
+    if main_rows:
+        print(f"\nSlowest modules under `import main` (top {args.top}):\n")
+        slowest = sorted(main_rows, key=lambda r: r[1], reverse=True)[:args.top]
+        print_table(
+            ["module", "self", "cumulative"],
+            [[name.strip(), format_time(own), format_time(cum)] for cum, own, name in slowest]
+        )
+
+    print("\nStartup steps (this process):\n")
+    steps = init_times()
+    print_table(
+        ["step", "time", "note"],
+        [[label, format_time(t) if t is not None else "-", note] for label, t, note in steps]
+    )
+
+    ui_time = steps[1][1]
+    to_window = main_total + (ui_time or 0.0)
+
+    print(f"\nTime to window: {to_window * 1000:.0f} ms"
+          + (" (no display: import only)" if ui_time is None else ""))
+
+    budget = args.budget_ms
+    if budget is None:
+        return 0
+
+    if to_window * 1000 > budget:
+        print(f"❌ Over the {budget:.0f} ms cold-start budget")
+        return 1
+
+    print(f"✅ Within the {budget:.0f} ms cold-start budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,458 @@
+"""
+Hot-path microbenchmark suite with stored baselines.
+
+    python -m benchmarks.suite                   # run + regression report
+    python -m benchmarks.suite --save-baseline   # store current numbers
+    python -m benchmarks.suite -k cart           # only matching cases
+
+Every case reports the best per-call time over several repeats, timed
+with the garbage collector off (as timeit does). The
+report compares it with benchmarks/baselines.json and flags cases that
+got slower than --threshold (default 25 %), or than the case's own
+threshold when it is higher. The exit status is 1 when anything
+regressed, so the suite can gate a release.
+
+Baselines are machine-specific: save them on the cart hardware (or
+the CI box) you compare against. The file records the environment it
+was taken on, and the report warns when it differs.
+
+Cases that need something missing here (a trained model) are
+reported as skipped rather than failing. Saving keeps their old
+baseline (if any) and lists them. The Tk screens need a display and
+are timed by benchmarks/bench_ui_refresh.py instead.
+
+Sub-millisecond pure-Python cases move by up to ~40 % between runs of
+unchanged code on a shared or throttled CPU, so they carry a threshold
+of their own.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+
+from benchmarks.harness import format_time, measure, print_table
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baselines.json")
+
+DEFAULT_THRESHOLD = 0.25
+
+CASES = []
+THRESHOLDS = {}      # case name -> its own regression threshold
+
+
+class Skip(Exception):
+    pass
+
+
+def case(name, threshold=None):
+    """
+    Registers a case. The decorated function does the setup and returns
+    the zero-argument callable to time.
+
+    threshold: regression threshold for a case that varies more between
+    runs than --threshold allows.
+    """
+    def register(setup):
+        CASES.append((name, setup))
+        if threshold is not None:
+            THRESHOLDS[name] = threshold
+        return setup
+    return register
+
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Silences the pipeline's debug prints while timing.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+@contextlib.contextmanager
+def scratch_dir():
+    """
+    Runs in a temporary directory (a CaptureArchive writes
+    last_capture.jpg to the working directory).
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            os.chdir(cwd)
+
+
+# Cases of well under a millisecond of pure Python
+JITTERY = 0.5
+
+
+# ---------------- VISION ----------------
+@case("vision.classify_color", threshold=JITTERY)
+def bench_classify_color():
+    from common.services.color_engine import classify_color
+
+    samples = [(h, s, v) for h in range(0, 180, 7) for s, v in ((20, 200), (120, 140), (200, 30))]
+
+    def run():
+        for h, s, v in samples:
+            classify_color(h, s, v)
+
+    run.calls = len(samples)
+    return run
+
+
+class _FixedStream:
+    def __init__(self, frames):
+        self.frames = frames
+        self.i = 0
+
+    def latest(self, timeout=None):
+        frame = self.frames[self.i % len(self.frames)]
+        self.i += 1
+        return 0.0, frame
+
+
+@case("vision.capture_and_detect", threshold=0.6)
+def bench_capture_and_detect():
+    from benchmarks.frames import frame_set
+    from common.services.camera_real import capture_and_detect
+
+    stream = _FixedStream(frame_set(8))
+
+    def run():
+        with scratch_dir(), quiet():
+            for _ in range(len(stream.frames)):
+                capture_and_detect(stream=stream)
+
+    run.calls = len(stream.frames)
+    return run
+
+
+# Each submit wakes the writer thread, which competes for the GIL
+@case("vision.archive.submit", threshold=1.5)
+def bench_archive_submit():
+    from benchmarks.frames import center_crop, frame_set
+    from common.services.capture_archive import CaptureArchive
+
+    crops = [center_crop(f) for f in frame_set(8)]
+    tmp = tempfile.TemporaryDirectory()
+    archive = CaptureArchive(
+        directory=tmp.name, latest_path=os.path.join(tmp.name, "last_capture.jpg")
+    ).start()
+
+    def run():
+        for i, crop in enumerate(crops):
+            archive.submit(crop, i)
+
+    def teardown():
+        archive.close()
+        tmp.cleanup()
+
+    run.calls = len(crops)
+    run.teardown = teardown
+    return run
+
+
+@case("vision.extract_shape_features")
+def bench_extract_shape_features():
+    import numpy as np
+    from benchmarks.frames import center_crop, frame_set
+    from common.services.camera_real import extract_shape_features
+
+    crops = [np.ascontiguousarray(center_crop(f)) for f in frame_set(8)]
+
+    def run():
+        for crop in crops:
+            extract_shape_features(crop)
+
+    run.calls = len(crops)
+    return run
+
+
+# ---------------- RESOLVER ----------------
+def _resolver_case(size):
+    def setup():
+        from benchmarks.catalogs import random_queries, synthetic_products
+        from common.services.product_index import ProductIndex
+        from common.services.product_resolver import resolve_product_by_weight
+
+        index = ProductIndex(synthetic_products(size))
+        queries = random_queries(50)
+
+        def run():
+            with quiet():
+                for categories, weight, colors in queries:
+                    resolve_product_by_weight(index, categories, weight, colors)
+
+        run.calls = len(queries)
+        return run
+
+    return setup
+
+
+for _size in (100, 10_000, 100_000):
+    case(
+        f"resolver.resolve_product_by_weight[{_size:,}]",
+        threshold=JITTERY if _size < 100_000 else None
+    )(_resolver_case(_size))
+
+
+def _multi_resolver_case(size):
+    def setup():
+        from benchmarks.catalogs import multi_item_queries, synthetic_products
+        from common.services.product_index import ProductIndex
+        from common.services.product_resolver import resolve_products_by_weight_multi
+
+        products = synthetic_products(size)
+        index = ProductIndex(products)
+        queries = multi_item_queries(products, 20)
+
+        def run():
+            with quiet():
+                for categories, weight, colors, _ in queries:
+                    resolve_products_by_weight_multi(index, categories, weight, colors)
+
+        run.calls = len(queries)
+        return run
+
+    return setup
+
+
+for _size in (1_000, 10_000):
+    case(f"resolver.multi_item[{_size:,}]")(_multi_resolver_case(_size))
+
+
+# ---------------- ML ----------------
+@case("ml.predict", threshold=JITTERY)
+def bench_ml_predict():
+    from ml.model import ProductMLModel
+
+    path = os.path.join(ROOT, "ml", "knn_model.pkl")
+    if not os.path.exists(path):
+        raise Skip("ml/knn_model.pkl missing (run python ml/train.py)")
+
+    model = ProductMLModel(model_path=path)
+    model.load()
+
+    features = {"weight": 125, "aspect_ratio": 1.1, "area_ratio": 0.8, "color_code": 1}
+
+    return lambda: model.predict(features)
+
+
+# ---------------- CART ----------------
+CART_SIZE = 2_000
+
+
+def _filled_cart(size=CART_SIZE):
+    from benchmarks.catalogs import synthetic_products
+    from common.models.cart import Cart
+
+    products = [p for p in synthetic_products(size).values() if p.unit_weight]
+    cart = Cart()
+
+    for p in products:
+        cart.add(p, p.unit_weight)
+
+    return cart, products
+
+
+@case(f"cart.add[{CART_SIZE:,} items]", threshold=JITTERY)
+def bench_cart_add():
+    cart, products = _filled_cart()
+    product = products[len(products) // 2]
+
+    return lambda: cart.add(product, product.unit_weight)
+
+
+@case(f"cart.remove_by_weight+add[{CART_SIZE:,} items]", threshold=JITTERY)
+def bench_cart_remove():
+    cart, products = _filled_cart()
+    product = products[len(products) // 2]
+
+    # One extra unit so the line survives the remove
+    cart.add(product, product.unit_weight)
+
+    def run():
+        with quiet():
+            cart.remove_by_weight(-product.unit_weight)
+        cart.add(product, product.unit_weight)
+
+    return run
+
+
+@case(f"cart.total[{CART_SIZE:,} items]", threshold=JITTERY)
+def bench_cart_total():
+    cart, _ = _filled_cart()
+    return cart.total
+
+
+@case(f"journal.record+add[{CART_SIZE:,} items]", threshold=0.6)
+def bench_journal_record():
+    import shutil
+    from common.services.cart_journal import CartJournal
+
+    cart, products = _filled_cart()
+    product = products[len(products) // 2]
+
+    directory = tempfile.mkdtemp()
+    journal = CartJournal(directory)
+    journal.restore(cart, {})
+
+    def run():
+        cart.add(product, product.unit_weight)
+        journal.record(cart, "ADD")
+
+    def teardown():
+        journal.close(discard=True)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    run.teardown = teardown
+    return run
+
+
+# ---------------- RUNNER ----------------
+def environment():
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count()
+    }
+
+
+def run_cases(pattern=None, repeat=5):
+    results = {}
+    skipped = {}
+
+    for name, setup in CASES:
+        if pattern and pattern not in name:
+            continue
+
+        try:
+            fn = setup()
+        except Skip as e:
+            skipped[name] = str(e)
+            continue
+
+        # Like timeit: earlier cases' garbage and collector pauses
+        # out of the timing
+        gc.collect()
+        gc.disable()
+        try:
+            stats = measure(fn, repeat=repeat)
+        finally:
+            gc.enable()
+        calls = getattr(fn, "calls", 1)
+
+        if hasattr(fn, "teardown"):
+            fn.teardown()
+
+        results[name] = stats["best"] / calls
+        print(f"  {name:<48} {format_time(results[name])}", file=sys.stderr)
+
+    return results, skipped
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    baseline = load_baseline(path) or {"results": {}}
+    baseline["environment"] = environment()
+    baseline["results"].update(results)
+
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def report(results, skipped, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Prints the comparison table. Returns the names of regressed cases.
+    """
+
+    base = (baseline or {}).get("results", {})
+    rows = []
+    regressions = []
+
+    for name, seconds in results.items():
+        old = base.get(name)
+
+        if old is None:
+            rows.append([name, format_time(seconds), "-", "-", "new"])
+            continue
+
+        change = seconds / old - 1
+        limit = max(threshold, THRESHOLDS.get(name, 0.0))
+
+        if change > limit:
+            status = "REGRESSION"
+            regressions.append(name)
+        elif change < -limit:
+            status = "faster"
+        else:
+            status = "ok"
+
+        rows.append([
+            name, format_time(seconds), format_time(old),
+            f"{change * 100:+.0f}%", status
+        ])
+
+    print()
+    print_table(["case", "now / call", "baseline", "change", "status"], rows)
+
+    for name, reason in skipped.items():
+        missing = "" if name in base else " (no baseline)"
+        print(f"skipped  {name}: {reason}{missing}")
+
+    if baseline and baseline.get("environment") != environment():
+        print("\n⚠️ Baseline was recorded on a different environment:")
+        print(f"   {baseline.get('environment')}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) above {threshold:.0%}")
+    else:
+        print(f"\n✅ No regressions above {threshold:.0%}")
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-k", dest="pattern", help="only cases containing this text")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results, skipped = run_cases(args.pattern, args.repeat)
+
+    if args.save_baseline:
+        save_baseline(results)
+        print(f"Baseline saved to {os.path.relpath(BASELINE_PATH, ROOT)}")
+
+        for name, reason in skipped.items():
+            print(f"⚠️ Not recorded: {name} — {reason}")
+
+        return 0
+
+    regressions = report(results, skipped, load_baseline(), args.threshold)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,69 +1,333 @@
-from common.models.cart_item import CartItem
-
-class Cart:
-    def __init__(self):
-        self.items = {}
-
-    def add(self, product, weight):
-        if product.id not in self.items:
-            self.items[product.id] = CartItem(product)
-
-        item = self.items[product.id]
-
-        if product.price_per_unit is not None:
-            item.quantity += 1
-        else:
-            item.weight += weight
-
-        item.update_subtotal()
-
-    def remove_by_weight(self, weight_delta):
-        if not self.items:
-            return
-
-        target_weight = abs(weight_delta)
-        closest_item = None
-        min_diff = float("inf")
-
-        for item in self.items.values():
-            if item.product.unit_weight is not None:
-                diff = abs(item.product.unit_weight - target_weight)
-                if diff < min_diff:
-                    min_diff = diff
-                    closest_item = item
-
-        if closest_item:
-            closest_item.quantity -= 1
-
-            if closest_item.quantity <= 0:
-                del self.items[closest_item.product.id]
-            else:
-                closest_item.update_subtotal()
-        return closest_item.product.name
-
-    def total(self):
-        return sum(item.subtotal for item in self.items.values())
-    def print_receipt(self):
-        print("\n------ CART SUMMARY ------")
-        if not self.items:
-            print("Cart is empty")
-        else:
-            for item in self.items.values():
-                if item.product.price_per_unit is not None:
-                    print(
-                        f"{item.product.name} | Qty: {item.quantity} | "
-                        f"Subtotal: ₹{item.subtotal}"
-                    )
-                else:
-                    print(
-                        f"{item.product.name} | Weight: {item.weight}g | "
-                        f"Subtotal: ₹{item.subtotal:.2f}"
-                    )
-        print("--------------------------")
-        print(f"TOTAL: ₹{self.total():.2f}")
-        print("--------------------------\n")
-    def reset(self):
-        """
-        Clears the cart for a new session.
-        """
-        self.items.clear()
+import logging
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+
+from common.models.cart_item import CartItem
+
+
+CHANGE_LOG_SIZE = 512   # per-item changes kept for changes_since()
+REMOVE_TOLERANCE = 5    # grams, same as the resolver's WEIGHT_TOLERANCE
+
+log = logging.getLogger(__name__)
+
+
+class Cart:
+    """
+    Shopping cart.
+
+    total(), item_count and weight_total are kept up to date on every
+    add / remove, so reading them is O(1) however large the basket.
+
+    Every mutation bumps `version` and logs the product IDs it touched.
+    A consumer remembers the version it last rendered and asks
+    changes_since(version) for what to redraw.
+
+    Unit-priced lines are also kept in a list sorted by unit weight, so
+    matching a removed weight is a bisect rather than a scan. Loose
+    (by-weight) lines are kept apart and can give up part of their
+    weight. removal_candidates() may be called from other threads.
+    """
+
+    def __init__(self):
+        self.items = {}
+
+        self._total = 0.0
+        self.item_count = 0       # units, plus one per loose (by-weight) line
+        self.weight_total = 0.0   # grams
+
+        self.version = 0
+        self._changes = deque(maxlen=CHANGE_LOG_SIZE)
+        self._log_floor = 0       # oldest version changes_since() can answer
+
+        # Weight index: parallel sorted lists over unit lines
+        self._weights = []
+        self._weight_ids = []
+        self._loose = {}          # product_id -> CartItem
+        self._lock = threading.Lock()
+
+    # ---------------- BOOKKEEPING ----------------
+    @staticmethod
+    def _line_count(item):
+        if item.product.price_per_unit is not None:
+            return item.quantity
+        return 1 if item.weight else 0
+
+    @staticmethod
+    def _line_weight(item):
+        if item.product.price_per_unit is not None:
+            return item.quantity * (item.product.unit_weight or 0)
+        return item.weight
+
+    def _index_add(self, item):
+        product = item.product
+
+        if product.price_per_unit is None:
+            self._loose[product.id] = item
+        elif product.unit_weight is not None:
+            i = bisect_right(self._weights, product.unit_weight)
+            self._weights.insert(i, product.unit_weight)
+            self._weight_ids.insert(i, product.id)
+
+    def _index_remove(self, item):
+        product = item.product
+
+        if product.price_per_unit is None:
+            self._loose.pop(product.id, None)
+            return
+
+        if product.unit_weight is None:
+            return
+
+        i = bisect_left(self._weights, product.unit_weight)
+        while self._weight_ids[i] != product.id:
+            i += 1
+
+        del self._weights[i]
+        del self._weight_ids[i]
+
+    def _log(self, product_id):
+        self.version += 1
+
+        if len(self._changes) == self._changes.maxlen:
+            self._log_floor = self._changes[0][0]
+
+        self._changes.append((self.version, product_id))
+
+    def changes_since(self, version):
+        """
+        Product IDs added, updated or removed after `version`.
+
+        Returns a set (empty when nothing changed), or None when the log
+        no longer reaches back that far (or the cart was reset): the
+        caller should then redraw everything.
+        """
+
+        if version == self.version:
+            return set()
+
+        if version < self._log_floor or version > self.version:
+            return None
+
+        changed = set()
+
+        for v, product_id in reversed(self._changes):
+            if v <= version:
+                break
+            changed.add(product_id)
+
+        return changed
+
+    # ---------------- MUTATIONS ----------------
+    def add(self, product, weight):
+        item = self.items.get(product.id)
+
+        if item is None:
+            item = CartItem(product)
+            with self._lock:
+                self.items[product.id] = item
+                self._index_add(item)
+
+        old_subtotal = item.subtotal
+
+        if product.price_per_unit is not None:
+            item.quantity += 1
+            self.item_count += 1
+            self.weight_total += product.unit_weight or 0
+        else:
+            if not item.weight:
+                self.item_count += 1
+            item.weight += weight
+            self.weight_total += weight
+
+        item.update_subtotal()
+        self._total += item.subtotal - old_subtotal
+        self._log(product.id)
+
+    def removal_candidates(self, weight_delta, tolerance=REMOVE_TOLERANCE):
+        """
+        Cart lines a removal of |weight_delta| grams could come from,
+        best first: unit lines whose unit weight is within `tolerance`
+        (nearest first), then loose lines holding at least that much.
+
+        More than one candidate means the weight alone is ambiguous.
+        """
+
+        target = abs(weight_delta)
+
+        with self._lock:
+            lo = bisect_left(self._weights, target - tolerance)
+            hi = bisect_right(self._weights, target + tolerance)
+
+            window = sorted(
+                range(lo, hi), key=lambda i: abs(self._weights[i] - target)
+            )
+            candidates = [self.items[self._weight_ids[i]] for i in window]
+
+            loose = [
+                item for item in self._loose.values()
+                if item.weight + tolerance >= target
+            ]
+
+        loose.sort(key=lambda item: abs(item.weight - target))
+
+        return candidates + loose
+
+    def unit_lines(self, max_weight=None):
+        """
+        Snapshot of the unit lines as (unit_weight, product, quantity),
+        sorted by weight, optionally only those up to `max_weight`.
+        """
+
+        with self._lock:
+            hi = len(self._weights) if max_weight is None else bisect_right(self._weights, max_weight)
+
+            lines = []
+
+            for i in range(hi):
+                item = self.items[self._weight_ids[i]]
+                lines.append((self._weights[i], item.product, item.quantity))
+
+            return lines
+
+    def remove(self, product_id, weight_delta, tolerance=REMOVE_TOLERANCE):
+        """
+        Takes one unit of `product_id` out of the cart, or |weight_delta|
+        grams for a loose line (the line goes when what is left is
+        within `tolerance`). Returns the product name, None if absent.
+        """
+
+        item = self.items.get(product_id)
+
+        if item is None:
+            return None
+
+        old_subtotal = item.subtotal
+        old_count = self._line_count(item)
+        old_weight = self._line_weight(item)
+
+        if item.product.price_per_unit is not None:
+            item.quantity -= 1
+            gone = item.quantity <= 0
+        else:
+            item.weight -= abs(weight_delta)
+            gone = item.weight <= tolerance
+
+        if gone:
+            with self._lock:
+                del self.items[product_id]
+                self._index_remove(item)
+            item.quantity = 0
+            item.weight = 0
+
+        item.update_subtotal()
+
+        self._total += item.subtotal - old_subtotal
+        self.item_count += self._line_count(item) - old_count
+        self.weight_total += self._line_weight(item) - old_weight
+
+        # Re-anchor when empty so float drift cannot accumulate
+        if not self.items:
+            self._total = 0.0
+            self.weight_total = 0.0
+
+        self._log(product_id)
+        return item.product.name
+
+    def remove_by_weight(self, weight_delta, tolerance=REMOVE_TOLERANCE):
+        """
+        Removes the best match for |weight_delta| grams.
+        Returns the product name, or None when nothing matches.
+        """
+
+        candidates = self.removal_candidates(weight_delta, tolerance)
+
+        if not candidates:
+            log.info(f"⚠️ No cart item matches {abs(weight_delta)} g")
+            return None
+
+        if len(candidates) > 1:
+            log.info(f"⚠️ Ambiguous removal: {[c.product.name for c in candidates]}")
+
+        return self.remove(candidates[0].product.id, weight_delta, tolerance)
+
+    def set_line(self, product, quantity=0, weight=0):
+        """
+        Sets a line to an absolute state (journal replay). A line with
+        no quantity and no weight is dropped.
+        """
+
+        item = self.items.get(product.id)
+
+        if item is None:
+            if not quantity and not weight:
+                return
+            item = CartItem(product)
+            with self._lock:
+                self.items[product.id] = item
+                self._index_add(item)
+
+        old_subtotal = item.subtotal
+        old_count = self._line_count(item)
+        old_weight = self._line_weight(item)
+
+        item.quantity = quantity
+        item.weight = weight
+
+        if not quantity and not weight:
+            with self._lock:
+                del self.items[product.id]
+                self._index_remove(item)
+
+        item.update_subtotal()
+
+        self._total += item.subtotal - old_subtotal
+        self.item_count += self._line_count(item) - old_count
+        self.weight_total += self._line_weight(item) - old_weight
+
+        if not self.items:
+            self._total = 0.0
+            self.weight_total = 0.0
+
+        self._log(product.id)
+
+    def total(self):
+        return self._total
+
+    def print_receipt(self):
+        print("\n------ CART SUMMARY ------")
+        if not self.items:
+            print("Cart is empty")
+        else:
+            for item in self.items.values():
+                if item.product.price_per_unit is not None:
+                    print(
+                        f"{item.product.name} | Qty: {item.quantity} | "
+                        f"Subtotal: ₹{item.subtotal}"
+                    )
+                else:
+                    print(
+                        f"{item.product.name} | Weight: {item.weight}g | "
+                        f"Subtotal: ₹{item.subtotal:.2f}"
+                    )
+        print("--------------------------")
+        print(f"TOTAL: ₹{self.total():.2f}")
+        print("--------------------------\n")
+
+    def reset(self):
+        """
+        Clears the cart for a new session.
+        """
+        with self._lock:
+            self.items.clear()
+            self._weights.clear()
+            self._weight_ids.clear()
+            self._loose.clear()
+
+        self._total = 0.0
+        self.item_count = 0
+        self.weight_total = 0.0
+
+        self.version += 1
+        self._changes.clear()
+        self._log_floor = self.version
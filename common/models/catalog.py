@@ -0,0 +1,107 @@
+"""
+Columnar product catalog.
+
+ProductCatalog behaves like the {id: Product} dict the rest of the
+system already uses (lookup, iteration, .values(), len), and also keeps
+the numeric fields as NumPy columns aligned with catalog order:
+
+    unit_weight     float64  (NaN for products priced by weight)
+    price_per_unit  float64  (NaN when missing)
+    price_per_gram  float64  (NaN when missing)
+    ar_min, ar_max  float32  (aspect-ratio bounds, NaN when missing)
+    min_area_ratio  float32  (NaN when missing)
+    category_code   int16    (index into .categories)
+    color_mask      uint32   (palette bitmask, see .color_bits)
+
+Columns are for scoring and filtering only; billing keeps reading the
+Product attributes. They are what the shared-memory catalog publishes
+(shared_catalog.py), whose index answers weight windows straight from
+them. In-process lookups go through ProductIndex.
+"""
+from collections.abc import Mapping
+
+import numpy as np
+
+from common.models.product import Product
+from common.services.vision_mapper import COLOR_BITS, colors_to_mask
+
+
+_MAX_COLOR_BITS = 32
+
+
+class ProductCatalog(Mapping):
+
+    def __init__(self, products):
+        """
+        products: iterable of Product, in catalog order.
+        """
+
+        self._products = list(products)
+        self._by_id = {p.id: i for i, p in enumerate(self._products)}
+
+        self.color_bits = dict(COLOR_BITS)
+        self.categories = []
+        category_codes = {}
+
+        n = len(self._products)
+
+        self.unit_weight = np.full(n, np.nan)
+        self.price_per_unit = np.full(n, np.nan)
+        self.price_per_gram = np.full(n, np.nan)
+        self.ar_min = np.full(n, np.nan, dtype=np.float32)
+        self.ar_max = np.full(n, np.nan, dtype=np.float32)
+        self.min_area_ratio = np.full(n, np.nan, dtype=np.float32)
+        self.category_code = np.zeros(n, dtype=np.int16)
+        self.color_mask = np.zeros(n, dtype=np.uint32)
+
+        for i, p in enumerate(self._products):
+
+            if p.unit_weight is not None:
+                self.unit_weight[i] = p.unit_weight
+            if p.price_per_unit is not None:
+                self.price_per_unit[i] = p.price_per_unit
+            if p.price_per_gram is not None:
+                self.price_per_gram[i] = p.price_per_gram
+            if p.aspect_ratio is not None:
+                self.ar_min[i], self.ar_max[i] = p.aspect_ratio
+            if p.min_area_ratio is not None:
+                self.min_area_ratio[i] = p.min_area_ratio
+
+            code = category_codes.get(p.category)
+            if code is None:
+                code = category_codes[p.category] = len(self.categories)
+                self.categories.append(p.category)
+            self.category_code[i] = code
+
+            self.color_mask[i] = colors_to_mask(
+                p.dominant_colors, self.color_bits, grow=True, max_bits=_MAX_COLOR_BITS
+            )
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Builds a catalog from products.json-style dicts.
+        """
+        return cls(Product.from_record(p) for p in records)
+
+    # ---------------- MAPPING (dict compatibility) ----------------
+    def __getitem__(self, product_id):
+        return self._products[self._by_id[product_id]]
+
+    def __iter__(self):
+        return (p.id for p in self._products)
+
+    def __len__(self):
+        return len(self._products)
+
+    def __contains__(self, product_id):
+        return product_id in self._by_id
+
+    def values(self):
+        return list(self._products)
+
+    def product_at(self, i):
+        return self._products[i]
+
+    def position(self, product_id):
+        return self._by_id[product_id]
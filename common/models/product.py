@@ -1,14 +1,106 @@
-class Product:
-    def __init__(
-        self, id, name, category,
-        unit_weight=None, price_per_unit=None, price_per_gram=None,
-        vision_profile=None, shape_profile=None
-    ):
-        self.id = id
-        self.name = name
-        self.category = category
-        self.unit_weight = unit_weight
-        self.price_per_unit = price_per_unit
-        self.price_per_gram = price_per_gram
-        self.vision_profile = vision_profile or {}
-        self.shape_profile = shape_profile or {}
+from sys import intern
+
+
+class Product:
+    """
+    One catalog SKU.
+
+    Uses __slots__ and keeps the vision / shape profiles as flat fields
+    instead of two nested dicts per product. `vision_profile` and
+    `shape_profile` are still available as read-only dict views.
+    """
+
+    __slots__ = (
+        "id", "name", "category",
+        "unit_weight", "price_per_unit", "price_per_gram",
+        "dominant_colors", "form", "aspect_ratio", "min_area_ratio",
+        "_profile_extra"
+    )
+
+    def __init__(
+        self, id, name, category,
+        unit_weight=None, price_per_unit=None, price_per_gram=None,
+        vision_profile=None, shape_profile=None
+    ):
+        self.id = id
+        self.name = name
+        # Categories, colors and forms repeat across the whole catalog;
+        # interning keeps one string object per distinct value.
+        self.category = intern(category) if isinstance(category, str) else category
+        self.unit_weight = unit_weight
+        self.price_per_unit = price_per_unit
+        self.price_per_gram = price_per_gram
+
+        vision_profile = vision_profile or {}
+        shape_profile = shape_profile or {}
+
+        self.dominant_colors = tuple(
+            intern(c) for c in vision_profile.get("dominant_colors", ())
+        )
+
+        form = shape_profile.get("form")
+        self.form = intern(form) if isinstance(form, str) else form
+
+        ar = shape_profile.get("aspect_ratio")
+        self.aspect_ratio = tuple(ar) if ar is not None else None
+        self.min_area_ratio = shape_profile.get("min_area_ratio")
+
+        # Keys outside the standard schema are kept, but only paid for
+        # by the products that have them.
+        extra_vision = {
+            k: v for k, v in vision_profile.items() if k != "dominant_colors"
+        }
+        extra_shape = {
+            k: v for k, v in shape_profile.items()
+            if k not in ("form", "aspect_ratio", "min_area_ratio")
+        }
+        self._profile_extra = (
+            (extra_vision, extra_shape) if extra_vision or extra_shape else None
+        )
+
+    @classmethod
+    def from_record(cls, record):
+        """
+        Builds a Product from one data/products.json record.
+        """
+        return cls(
+            id=record["id"],
+            name=record["name"],
+            category=record["category"],
+            unit_weight=record.get("unit_weight"),
+            price_per_unit=record.get("price_per_unit"),
+            price_per_gram=record.get("price_per_gram"),
+            vision_profile=record.get("vision_profile"),
+            shape_profile=record.get("shape_profile")
+        )
+
+    @property
+    def vision_profile(self):
+        profile = {}
+
+        if self.dominant_colors:
+            profile["dominant_colors"] = list(self.dominant_colors)
+
+        if self._profile_extra:
+            profile.update(self._profile_extra[0])
+
+        return profile
+
+    @property
+    def shape_profile(self):
+        profile = {}
+
+        if self.form is not None:
+            profile["form"] = self.form
+        if self.aspect_ratio is not None:
+            profile["aspect_ratio"] = list(self.aspect_ratio)
+        if self.min_area_ratio is not None:
+            profile["min_area_ratio"] = self.min_area_ratio
+
+        if self._profile_extra:
+            profile.update(self._profile_extra[1])
+
+        return profile
+
+    def __repr__(self):
+        return f"Product({self.id!r}, {self.name!r})"
@@ -1,155 +1,227 @@
-import cv2
-import numpy as np
-import time
-
-
-def capture_and_detect():
-    """
-    Captures an image from webcam and extracts the top 2 dominant colors.
-
-    Returns:
-    detected_colors, confidence, aspect_ratio, area_ratio, cropped_frame
-    """
-
-    cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-    if not cap.isOpened():
-        print("❌ Camera not accessible")
-        return None, 0.0, None, None, None
-    
-    # set resolution
-
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-
-    
-    # Camera warm-up
-    for _ in range(10):
-        cap.read()
-    ret, frame = cap.read()
-    cap.release()
-
-    if not ret:
-        print("❌ Failed to capture image")
-        return None, 0.0, None, None, None
-
-    h, w, _ = frame.shape
-
-    # ---- CENTER CROP (reduce background noise) ----
-    crop = frame[
-        int(h * 0.35):int(h * 0.65),
-        int(w * 0.35):int(w * 0.65)
-    ]
-
-    cv2.imwrite("last_capture.jpg", crop)
-    print("📷 Image captured and cropped")
-
-    # ---- HSV CONVERSION ----
-    hsv = cv2.cvtColor(crop, cv2.COLOR_BGR2HSV)
-
-    # ---- FILTER PIXELS ----
-    mask = (hsv[:, :, 1] > 30) & (hsv[:, :, 2] > 70)
-    filtered_pixels = hsv[mask]
-
-    if len(filtered_pixels) < 80:
-        return None, 0.0, None, None, crop
-
-    # -----------------------------
-    # DOMINANT COLOR CLUSTERS
-    # -----------------------------
-    hues = filtered_pixels[:, 0]
-
-    hist, bins = np.histogram(hues, bins=18, range=(0, 180))
-
-    # pick top 2 bins
-    top_bins = hist.argsort()[-2:][::-1]
-
-    detected_colors = []
-
-    s_val = np.median(filtered_pixels[:, 1])
-    v_val = np.median(filtered_pixels[:, 2])
-
-    for b in top_bins:
-
-        h_val = (bins[b] + bins[b + 1]) / 2
-
-        color = classify_color(h_val, s_val, v_val)
-
-        if color and color not in detected_colors:
-            detected_colors.append(color)
-
-    confidence = compute_confidence(s_val, v_val)
-
-    aspect_ratio, area_ratio, bbox = extract_shape_features(crop)
-    
-    print(f"🎨 Detected dominant colors: {detected_colors}")
-
-    return detected_colors, confidence, aspect_ratio, area_ratio, crop
-
-
-def classify_color(h, s, v):
-    """
-    Coarse HSV color classification.
-    """
-
-    if v < 50:
-        return "black"
-
-    if s < 35 and v > 160:
-        return "white"
-
-    if h < 10 or h > 170:
-        return "red"
-    elif 10 <= h < 30:
-        return "orange"
-    elif 30 <= h < 50:
-        return "yellow"
-    elif 50 <= h < 85:
-        return "green"
-    elif 85 <= h < 140:
-        return "blue"
-    elif 140 <= h < 170:
-        return "purple"
-
-    return None
-
-
-def extract_shape_features(crop):
-    """
-    Extract shape features using edge detection.
-    Returns:
-    aspect_ratio, area_ratio, bbox
-    """
-
-    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
-
-    edges = cv2.Canny(gray, 50, 150)
-
-    contours, _ = cv2.findContours(
-        edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
-    )
-
-    if not contours:
-        return None, None, None
-
-    largest = max(contours, key=cv2.contourArea)
-
-    x, y, w, h = cv2.boundingRect(largest)
-
-    crop_area = crop.shape[0] * crop.shape[1]
-    object_area = cv2.contourArea(largest)
-
-    aspect_ratio = w / h if h != 0 else 0
-    area_ratio = object_area / crop_area
-
-    bbox = (x, y, w, h)
-
-    return aspect_ratio, area_ratio, bbox
-
-def compute_confidence(s, v):
-    """
-    Confidence estimation.
-    """
-
-    confidence = ((s / 255) * 0.6 + (v / 255) * 0.4) + 0.2
-
-    return round(min(confidence, 1.0), 2)
\ No newline at end of file
+# cv2 / NumPy are imported on first use so that importing this module
+# (and the pipeline) stays cheap at boot.
+
+
+# ---------------- SHAPE STAGE ----------------
+# Edges are found on this pyramid level of the crop: 0 = full resolution
+# (the original path), each level halves width and height.
+# python -m benchmarks.bench_shape has the accuracy / speed table.
+#
+# Level 1 is ~2.6x faster than level 0 and closer to the real box, since
+# full resolution glues background noise to the contour (p95 vs the
+# painted boxes: 2.2 % aspect / 3 px at level 1, 12 % / 22 px at level
+# 0). But it does not reproduce level 0 (p95 differences of 14 % in
+# aspect ratio, 0.04 in area ratio, 21 px in the bbox), and the shipped
+# ml/knn_model.pkl was trained on level-0 features. Opt in only together
+# with a model retrained on level-1 features.
+SHAPE_LEVEL = 0
+
+
+def grab_frame():
+    """
+    Opens the webcam, warms it up and grabs a single frame.
+
+    This is the slow, one-shot path (device setup on every call). Use a
+    CameraStream from camera_stream.py to keep the device open instead.
+    """
+    import cv2
+
+    cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+    if not cap.isOpened():
+        print("❌ Camera not accessible")
+        return None
+    
+    # set resolution
+
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+
+    
+    # Camera warm-up
+    for _ in range(10):
+        cap.read()
+    ret, frame = cap.read()
+    cap.release()
+
+    if not ret:
+        print("❌ Failed to capture image")
+        return None
+
+    return frame
+
+
+def capture_and_detect(stream=None, after=None, timeout=1.0, archive=None):
+    """
+    Captures an image from webcam and extracts the top 2 dominant colors.
+
+    stream: optional running CameraStream. When given, no device setup
+            happens — the freshest frame is used, or the first frame
+            captured after the `after` timestamp (time.monotonic()).
+    archive: optional CaptureArchive the crop is handed to. Without
+             one nothing is written: last_capture.jpg is only saved
+             through an archive (main.py opens one at startup).
+
+    Returns:
+    detected_colors, confidence, aspect_ratio, area_ratio, cropped_frame
+    """
+
+    if stream is None:
+        frame = grab_frame()
+
+    elif after is None:
+        _, frame = stream.latest(timeout=timeout)
+
+    else:
+        _, frame = stream.frame_after(after, timeout=timeout)
+
+    if frame is None:
+        if stream is not None:
+            print("❌ No frame available from camera stream")
+        return None, 0.0, None, None, None
+
+    result = analyze_frame(frame)
+
+    if archive is not None:
+        archive.submit(result[4])
+
+    return result
+
+
+def analyze_frame(frame):
+    """
+    Runs the color + shape analysis on a full camera frame.
+
+    Returns:
+    detected_colors, confidence, aspect_ratio, area_ratio, cropped_frame
+    """
+
+    result = analyze_frame_detailed(frame)
+
+    return (
+        result["colors"],
+        result["confidence"],
+        result["aspect_ratio"],
+        result["area_ratio"],
+        result["crop"]
+    )
+
+
+def analyze_frame_detailed(frame):
+    """
+    Same analysis as analyze_frame(), returned as a dict that also
+    carries the full color distribution.
+
+    Keys:
+    colors, fractions, confidence, aspect_ratio, area_ratio, bbox, crop
+    """
+    import cv2
+
+    from common.services.color_engine import (
+        MIN_PIXELS, analyze_colors, dominant_colors
+    )
+
+    # ---- CENTER CROP (reduce background noise) ----
+    crop = center_crop(frame)
+
+    # Saving the crop is the caller's job (CaptureArchive, off this thread)
+    print("📷 Image captured and cropped")
+
+    # ---- HSV CONVERSION ----
+    hsv = cv2.cvtColor(crop, cv2.COLOR_BGR2HSV)
+
+    # ---- PER-PIXEL COLOR LABELS (single pass) ----
+    colors = analyze_colors(hsv)
+
+    result = {
+        "colors": None,
+        "fractions": colors["fractions"],
+        "confidence": colors["confidence"],
+        "aspect_ratio": None,
+        "area_ratio": None,
+        "bbox": None,
+        "crop": crop
+    }
+
+    if colors["pixel_count"] < MIN_PIXELS:
+        return result
+
+    result["colors"] = dominant_colors(colors["fractions"])
+
+    aspect_ratio, area_ratio, bbox = extract_shape_features(crop)
+
+    result["aspect_ratio"] = aspect_ratio
+    result["area_ratio"] = area_ratio
+    result["bbox"] = bbox
+
+    print(f"🎨 Detected dominant colors: {result['colors']}")
+
+    return result
+
+
+def center_crop(frame):
+    """
+    Middle 30 % of the frame in both directions (a view, not a copy).
+    """
+
+    h, w = frame.shape[:2]
+
+    return frame[
+        int(h * 0.35):int(h * 0.65),
+        int(w * 0.35):int(w * 0.65)
+    ]
+
+
+def extract_shape_features(crop, level=SHAPE_LEVEL):
+    """
+    Extract shape features using edge detection.
+
+    level: pyramid level to run on (see SHAPE_LEVEL). Above 0 the edges
+           are dilated once to close the gaps downscaling opens.
+
+    Tolerance: level 0 is the original full-resolution result. At
+    level 1, p95 over bench_shape's synthetic crops differs from it by
+    up to 14 % in aspect ratio, 0.04 in area ratio and 21 px in any bbox
+    edge (most of it level 0's noise, see SHAPE_LEVEL).
+
+    Returns:
+    aspect_ratio, area_ratio, bbox   (bbox in full-resolution crop pixels)
+    """
+    import cv2
+
+    h, w = crop.shape[:2]
+
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+
+    for _ in range(level):
+        gray = cv2.pyrDown(gray)
+
+    edges = cv2.Canny(gray, 50, 150)
+
+    if level:
+        edges = cv2.dilate(edges, None)
+
+    contours, _ = cv2.findContours(
+        edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+    )
+
+    if not contours:
+        return None, None, None
+
+    largest = max(contours, key=cv2.contourArea)
+
+    x, y, bw, bh = cv2.boundingRect(largest)
+
+    if level:
+        # Undo the dilation's one-pixel growth
+        x, y, bw, bh = x + 1, y + 1, max(1, bw - 2), max(1, bh - 2)
+
+    sx = w / gray.shape[1]
+    sy = h / gray.shape[0]
+
+    bbox = (round(x * sx), round(y * sy), round(bw * sx), round(bh * sy))
+    object_area = cv2.contourArea(largest) * sx * sy
+
+    aspect_ratio = bbox[2] / bbox[3] if bbox[3] != 0 else 0
+    area_ratio = object_area / (h * w)
+
+    return aspect_ratio, area_ratio, bbox
@@ -0,0 +1,215 @@
+"""
+Persistent background camera stream.
+
+Opening the webcam, setting the resolution and throwing away warm-up
+frames costs hundreds of milliseconds. CameraStream does that once,
+then keeps grabbing frames on its own thread into a small ring buffer
+so the pipeline can take a frame without any device setup.
+
+Usage:
+    stream = CameraStream()
+    stream.start()
+    ts, frame = stream.latest()
+    ts, frame = stream.frame_after(trigger_time, timeout=0.5)
+    stream.stop()
+"""
+import threading
+import time
+from collections import deque
+
+
+FRAME_WIDTH = 1280
+FRAME_HEIGHT = 720
+WARMUP_FRAMES = 10
+BUFFER_SIZE = 8
+RECONNECT_DELAY = 1.0
+
+
+def open_camera(index=0, width=FRAME_WIDTH, height=FRAME_HEIGHT):
+    """
+    Opens the camera device with the cart's standard settings.
+    Returns None when the device is not accessible.
+    """
+    import cv2
+
+    cap = cv2.VideoCapture(index, cv2.CAP_DSHOW)
+    if not cap.isOpened():
+        cap.release()
+        return None
+
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+    return cap
+
+
+class CameraStream:
+    """
+    Owns the camera device and keeps the freshest frames in memory.
+
+    Frames are stored as (timestamp, frame) pairs, timestamps taken
+    from time.monotonic() right after the read returns.
+
+    on_frame: optional callable(frame), called on the capture thread
+    for every frame (e.g. PreviewChannel.submit). Must not block.
+    """
+
+    def __init__(
+        self, index=0, width=FRAME_WIDTH, height=FRAME_HEIGHT,
+        buffer_size=BUFFER_SIZE, reconnect_delay=RECONNECT_DELAY, on_frame=None
+    ):
+        self.index = index
+        self.width = width
+        self.height = height
+        self.reconnect_delay = reconnect_delay
+        self.on_frame = on_frame
+
+        self._frames = deque(maxlen=buffer_size)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._cap = None
+
+        self.connected = False
+        self.frames_read = 0
+        self.reconnects = 0
+
+    # ---------------- LIFECYCLE ----------------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="camera-stream", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """
+        Stops the capture thread and releases the device.
+        """
+        self._stop.set()
+
+        with self._cond:
+            self._cond.notify_all()
+
+        if self._thread:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                # Capture thread still owns the device; it releases on exit
+                return
+            self._thread = None
+
+        self._release()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---------------- CAPTURE THREAD ----------------
+    def _connect(self):
+        cap = open_camera(self.index, self.width, self.height)
+        if cap is None:
+            return False
+
+        for _ in range(WARMUP_FRAMES):
+            cap.read()
+
+        self._cap = cap
+        self.connected = True
+        print("📷 Camera stream connected")
+        return True
+
+    def _release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        self.connected = False
+
+    def _run(self):
+        warned = False
+
+        while not self._stop.is_set():
+
+            if self._cap is None and not self._connect():
+                if not warned:
+                    print("❌ Camera not accessible — retrying")
+                    warned = True
+                self._stop.wait(self.reconnect_delay)
+                continue
+
+            warned = False
+
+            ret, frame = self._cap.read()
+
+            if not ret:
+                # Device dropped (unplugged, driver reset...)
+                print("⚠️ Camera read failed — reconnecting")
+                self._release()
+                self.reconnects += 1
+                self._stop.wait(self.reconnect_delay)
+                continue
+
+            ts = time.monotonic()
+
+            with self._cond:
+                self._frames.append((ts, frame))
+                self.frames_read += 1
+                self._cond.notify_all()
+
+            if self.on_frame is not None:
+                self.on_frame(frame)
+
+        self._release()
+
+    # ---------------- CONSUMER API ----------------
+    def latest(self, timeout=None):
+        """
+        Returns the freshest (timestamp, frame).
+        Waits up to `timeout` seconds for a first frame; (None, None)
+        if nothing arrived.
+        """
+
+        with self._cond:
+            if not self._frames and timeout:
+                self._cond.wait_for(
+                    lambda: self._frames or self._stop.is_set(), timeout
+                )
+
+            if not self._frames:
+                return None, None
+
+            return self._frames[-1]
+
+    def frame_after(self, ts, timeout=1.0):
+        """
+        Returns the first buffered (timestamp, frame) captured after `ts`
+        (a time.monotonic() value), waiting up to `timeout` seconds.
+        """
+
+        def _find():
+            for item in self._frames:
+                if item[0] > ts:
+                    return item
+            return None
+
+        with self._cond:
+            found = self._cond.wait_for(
+                lambda: _find() or self._stop.is_set(), timeout
+            )
+
+            if not found or self._stop.is_set():
+                return None, None
+
+            return _find()
+
+    def frames_since(self, ts):
+        """
+        Returns all buffered (timestamp, frame) pairs newer than `ts`.
+        """
+        with self._cond:
+            return [item for item in self._frames if item[0] > ts]
@@ -1,20 +1,20 @@
-import random
-
-# Fake camera + detection logic
-def capture_and_detect():
-    app.refresh_camera()
-
-    """
-    Simulates camera image capture and product detection.
-    Returns (product_id, confidence)
-    """
-
-    detected_products = [
-        ("P001", 0.92),  # Soap
-        ("P002", 0.88),  # Biscuit
-        ("P003", 0.95),  # Rice
-        (None, 0.4)      # Failed detection
-    ]
-
-    return random.choice(detected_products)
+import random
+
+# Fake camera + detection logic
+def capture_and_detect():
+    app.refresh_camera()
+
+    """
+    Simulates camera image capture and product detection.
+    Returns (product_id, confidence)
+    """
+
+    detected_products = [
+        ("P001", 0.92),  # Soap
+        ("P002", 0.88),  # Biscuit
+        ("P003", 0.95),  # Rice
+        (None, 0.4)      # Failed detection
+    ]
+
+    return random.choice(detected_products)
 print(f"Vision result → color: {detected_color}, confidence: {vision_conf:.2f}")
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""
+Background archival of captured crops.
+
+The vision path used to cv2.imwrite("last_capture.jpg") on the pipeline
+thread before any analysis: a JPEG encode plus an SD-card write per
+event. CaptureArchive takes the crop in submit() (a deque append, no
+copy, no I/O) and a writer thread encodes and writes it.
+
+The queue is bounded: when the writer falls behind, the oldest waiting
+capture is dropped, never the pipeline.
+
+Files:
+    last_capture.jpg                        newest capture (debug view)
+    data/captures/<session>/<event id>.jpg  last `keep` captures of the
+                                            session, for audits
+
+    archive = CaptureArchive(keep=50).start()
+    archive.submit(crop, event_id=12)
+    archive.new_session()        # New Cart
+    archive.stats()              # {"written": ..., "dropped": ...}
+    archive.close()
+"""
+import os
+import threading
+import time
+from collections import deque
+
+
+ARCHIVE_DIR = os.path.join("data", "captures")
+LATEST_PATH = "last_capture.jpg"
+QUEUE_SIZE = 4           # captures waiting for the writer
+KEEP = 0                 # per-session captures kept (0 = newest only)
+FORMAT = "jpg"
+QUALITY = 90             # JPEG / WebP quality (0-100)
+PNG_COMPRESSION = 3      # PNG is lossless: 0-9, speed vs size
+
+_QUALITY_FLAGS = {
+    "jpg": "IMWRITE_JPEG_QUALITY",
+    "jpeg": "IMWRITE_JPEG_QUALITY",
+    "webp": "IMWRITE_WEBP_QUALITY",
+    "png": "IMWRITE_PNG_COMPRESSION",
+}
+
+
+def _session_name():
+    return time.strftime("%Y%m%d-%H%M%S")
+
+
+class CaptureArchive:
+
+    def __init__(
+        self, directory=ARCHIVE_DIR, fmt=FORMAT, quality=QUALITY, keep=KEEP,
+        latest_path=LATEST_PATH, queue_size=QUEUE_SIZE
+    ):
+        fmt = fmt.lower().lstrip(".")
+
+        if fmt not in _QUALITY_FLAGS:
+            raise ValueError(f"unsupported capture format {fmt!r} ({', '.join(_QUALITY_FLAGS)})")
+
+        self.directory = directory
+        self.fmt = fmt
+        self.quality = quality
+        self.keep = keep
+        self.latest_path = latest_path
+
+        self.session = _session_name()
+        self._session_files = deque()
+
+        self._queue = deque(maxlen=queue_size)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._busy = False
+        self._thread = None
+
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._writer_loop, name="capture-archive", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    # ---------------- PIPELINE SIDE ----------------
+    def submit(self, crop, event_id=None):
+        """
+        Queues one BGR crop; never blocks. The array is kept as is (not
+        copied), so it must not be modified afterwards.
+        """
+
+        if crop is None:
+            return
+
+        with self._cond:
+            if self._closed:
+                return
+
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1       # the deque pushes out the oldest
+
+            self._queue.append((self.session, event_id, crop))
+            self.submitted += 1
+            self._cond.notify()
+
+    def new_session(self, name=None):
+        """
+        Starts a new rolling window (e.g. New Cart). Captures already
+        queued still go to the session they were taken in.
+        """
+
+        with self._cond:
+            self.session = name or _session_name()
+
+    # ---------------- WRITER THREAD ----------------
+    def _writer_loop(self):
+        import cv2
+
+        ext = "." + self.fmt
+        level = PNG_COMPRESSION if self.fmt == "png" else int(self.quality)
+        params = [getattr(cv2, _QUALITY_FLAGS[self.fmt]), level]
+
+        while True:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+                self._cond.wait_for(lambda: self._queue or self._closed)
+
+                if not self._queue:
+                    return
+
+                session, event_id, crop = self._queue.popleft()
+                self._busy = True
+
+            try:
+                ok, data = cv2.imencode(ext, crop, params)
+
+                if not ok:
+                    raise ValueError(f"could not encode {ext}")
+
+                self._write(session, event_id, data.tobytes())
+                self.written += 1
+
+            except (OSError, ValueError, cv2.error) as e:
+                self.failed += 1
+                print(f"⚠️ Capture not archived: {e}")
+
+    def _write(self, session, event_id, data):
+        if self.latest_path:
+            # Replaced whole, so a viewer never reads half a file
+            tmp = self.latest_path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.latest_path)
+
+        if not self.keep:
+            return
+
+        folder = os.path.join(self.directory, session)
+        os.makedirs(folder, exist_ok=True)
+
+        name = f"{event_id:06d}" if event_id is not None else time.strftime("%H%M%S")
+        path = os.path.join(folder, f"{name}.{self.fmt}")
+
+        with open(path, "wb") as f:
+            f.write(data)
+
+        # Rolling window: the session's files, oldest first
+        if self._session_files and self._session_files[-1][0] != session:
+            self._session_files.clear()
+
+        self._session_files.append((session, path))
+
+        while len(self._session_files) > self.keep:
+            _, old = self._session_files.popleft()
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    # ---------------- STATUS / SHUTDOWN ----------------
+    def flush(self, timeout=2.0):
+        """
+        Waits until everything queued is written. Returns False on timeout.
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._queue and not self._busy, timeout
+            )
+
+    def stats(self):
+        with self._cond:
+            return {
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "queued": len(self._queue)
+            }
+
+    def close(self, timeout=2.0):
+        """
+        Writes what is still queued (up to timeout), then stops.
+        """
+
+        self.flush(timeout)
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,191 @@
+"""
+Thin cart client for the cart server.
+
+The cart keeps its scale, camera and vision. CartClient sends each
+event's weight and vision features to the server and waits for the
+result, which carries the cart lines that changed. Updates the server
+sends on its own (the cart state on connect, New Cart, another display
+attached to the same cart) are queued in `updates`.
+
+CartMirror applies those line states to a local Cart, so SmartCartUI
+runs on top of it unchanged.
+
+    client = CartClient("127.0.0.1:8765", "cart-7").connect()
+    result = client.resolve(125, {"colors": ["orange"], ...})
+    CartMirror(cart).apply(result["update"], products)
+"""
+import itertools
+import json
+import queue
+import socket
+import threading
+
+from common.services.cart_protocol import encode, parse_address
+
+
+REQUEST_TIMEOUT = 5.0    # s to wait for the server's result
+
+
+class CartClient:
+
+    def __init__(self, address, cart_id, timeout=REQUEST_TIMEOUT):
+        self.address = address
+        self.cart_id = cart_id
+        self.timeout = timeout
+
+        self.updates = queue.Queue()
+        self.connected = False
+
+        self._sock = None
+        self._send_lock = threading.Lock()
+        self._pending = {}            # request id -> [threading.Event, result]
+        self._ids = itertools.count(1)
+
+    def connect(self):
+        kind, target = parse_address(self.address)
+
+        if kind == "unix":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(target)
+        else:
+            sock = socket.create_connection(target, timeout=self.timeout)
+            sock.settimeout(None)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        self._sock = sock
+        self.connected = True
+
+        threading.Thread(
+            target=self._read_loop, name="cart-client", daemon=True
+        ).start()
+
+        self._send({"type": "hello", "cart": self.cart_id})
+        print(f"🔌 Connected to cart server {self.address} as {self.cart_id}")
+
+        return self
+
+    def _send(self, message):
+        data = encode(message)
+        with self._send_lock:
+            self._sock.sendall(data)
+
+    def resolve(self, weight_delta, features):
+        """
+        Sends one event. Returns the server's result message, or None
+        when the server did not answer in time (or is gone).
+        """
+
+        request_id = next(self._ids)
+        waiter = [threading.Event(), None]
+        self._pending[request_id] = waiter
+
+        message = {"type": "event", "id": request_id, "weight_delta": weight_delta}
+        message.update(features)
+
+        try:
+            self._send(message)
+        except OSError as e:
+            self._pending.pop(request_id, None)
+            print(f"⚠️ Cart server send failed: {e}")
+            return None
+
+        if not waiter[0].wait(self.timeout):
+            self._pending.pop(request_id, None)
+            print(f"⚠️ Cart server did not answer within {self.timeout:.0f} s")
+            return None
+
+        return waiter[1]
+
+    def reset(self):
+        """
+        Starts a new cart on the server (New Cart).
+        """
+        try:
+            self._send({"type": "reset"})
+        except OSError as e:
+            print(f"⚠️ Cart server send failed: {e}")
+
+    def _read_loop(self):
+        try:
+            for raw in self._sock.makefile("rb"):
+                message = json.loads(raw)
+                kind = message.get("type")
+
+                if kind == "result":
+                    waiter = self._pending.pop(message.get("id"), None)
+                    if waiter is not None:
+                        waiter[1] = message
+                        waiter[0].set()
+
+                elif kind == "update":
+                    self.updates.put(message)
+
+                elif kind == "error":
+                    print(f"⚠️ Cart server: {message.get('message')}")
+
+                    # A failed request gets no result
+                    waiter = self._pending.pop(message.get("id"), None)
+                    if waiter is not None:
+                        waiter[0].set()
+
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Cart server connection error: {e}")
+
+        self.connected = False
+        print("🔌 Cart server disconnected")
+
+        # Nobody will answer the requests still waiting
+        for waiter in list(self._pending.values()):
+            waiter[0].set()
+        self._pending.clear()
+
+    def close(self):
+        if self._sock is None:
+            return
+
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+        self._sock.close()
+        self._sock = None
+
+
+class CartMirror:
+    """
+    Keeps a local Cart equal to the server's, from "update" messages.
+
+    Updates may arrive out of order (a result waiting on a worker
+    thread vs. a later push), so each line remembers the version it was
+    set at and older states are ignored.
+    """
+
+    def __init__(self, cart):
+        self.cart = cart
+        self._floor = 0          # version of the last reset
+        self._versions = {}      # product_id -> version of its state
+
+    def apply(self, update, products):
+        version = update["version"]
+
+        if version < self._floor:
+            return
+
+        if update.get("reset"):
+            self.cart.reset()
+            self._floor = version
+            self._versions.clear()
+
+        for pid, (quantity, weight) in update["lines"].items():
+            if self._versions.get(pid, -1) > version:
+                continue
+
+            product = products.get(pid)
+
+            if product is None:
+                print(f"⚠️ Server cart has unknown product {pid}")
+                continue
+
+            self.cart.set_line(product, quantity, weight)
+            self._versions[pid] = version
@@ -0,0 +1,324 @@
+"""
+Append-only cart journal with group commit and crash replay.
+
+Every committed event is appended as one compact JSON line: the cart
+events applied (simulate_event dicts), the outcome, the vision
+features and the resulting state of each cart line it touched. Lines
+are stored as absolute [quantity, weight], so replay is exact and
+never re-runs matching logic.
+
+The hot path (record()) only diffs the touched lines and queues a
+dict. A writer thread serializes the queue, writes and fsyncs it as
+one batch (group commit), and every SNAPSHOT_EVERY records writes a
+full snapshot and truncates the log.
+
+Directory layout:
+    snapshot.json   {"seq": n, "lines": {product_id: [quantity, weight]}}
+    journal.log     records with seq > snapshot seq, one per line
+
+    journal = CartJournal()          # reads what a crash left behind
+    journal.restore(cart, catalog)   # on the cart's thread
+    journal.record(cart, "ADD", cart_events, features)
+    journal.close(discard=True)      # clean end of session
+"""
+import json
+import os
+import threading
+import time
+
+
+JOURNAL_DIR = os.path.join("data", "journal")
+COMMIT_INTERVAL = 0.05    # s, longest a record waits for its fsync
+SNAPSHOT_EVERY = 500      # records between snapshots
+APPEND_BUDGET = 0.0002    # s, hot-path cost allowed per record
+
+_SEPARATORS = (",", ":")
+
+
+def line_states(cart, product_ids=None):
+    """
+    {product_id: [quantity, weight]} for the given cart lines ([0, 0]
+    = line gone), or for every line when product_ids is None. Also the
+    "lines" of the cart server's update messages.
+    """
+
+    if product_ids is None:
+        return {pid: [item.quantity, item.weight] for pid, item in cart.items.items()}
+
+    states = {}
+
+    for pid in product_ids:
+        item = cart.items.get(pid)
+        states[pid] = [0, 0] if item is None else [item.quantity, item.weight]
+
+    return states
+
+
+class CartJournal:
+
+    def __init__(
+        self, directory=JOURNAL_DIR, commit_interval=COMMIT_INTERVAL,
+        snapshot_every=SNAPSHOT_EVERY
+    ):
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.commit_interval = commit_interval
+        self.snapshot_every = snapshot_every
+
+        self._log_path = os.path.join(directory, "journal.log")
+        self._snapshot_path = os.path.join(directory, "snapshot.json")
+
+        self._cond = threading.Condition()
+        self._pending = []
+        self._closing = False
+
+        self._seq = 0
+        self.durable_seq = 0
+        self._cart_version = None
+        self.restored = False
+
+        # Writer-side copy of the cart lines, for snapshots
+        self._lines = {}
+        self._since_snapshot = 0
+
+        self.records = 0
+        self.commits = 0
+        self.snapshots = 0
+        self.max_append = 0.0
+        self.over_budget = 0
+
+        start = time.perf_counter()
+        replayed = self._load()
+        self.recovery_time = time.perf_counter() - start
+
+        if self._lines or replayed:
+            print(
+                f"📒 Journal: {len(self._lines)} cart line(s) recovered "
+                f"({replayed} records) in {self.recovery_time * 1000:.1f} ms"
+            )
+
+        self._file = open(self._log_path, "a", encoding="utf-8")
+
+        self._thread = threading.Thread(
+            target=self._writer_loop, name="cart-journal", daemon=True
+        )
+        self._thread.start()
+
+    # ---------------- RECOVERY ----------------
+    def _load(self):
+        """
+        Reads snapshot + log tail into self._lines. Returns the number
+        of log records replayed. A torn last line (crash mid-write)
+        is cut off.
+        """
+
+        snapshot_seq = 0
+
+        if os.path.exists(self._snapshot_path):
+            with open(self._snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            snapshot_seq = snapshot["seq"]
+            self._lines = {pid: tuple(state) for pid, state in snapshot["lines"].items()}
+
+        self._seq = snapshot_seq
+        replayed = 0
+
+        if os.path.exists(self._log_path):
+            good = 0
+
+            with open(self._log_path, "rb") as f:
+                for raw in f:
+                    try:
+                        record = json.loads(raw)
+                    except ValueError:
+                        record = None
+
+                    if record is None or not raw.endswith(b"\n"):
+                        break
+
+                    good += len(raw)
+
+                    if record["seq"] <= snapshot_seq:
+                        continue
+
+                    self._apply(record)
+                    self._seq = record["seq"]
+                    replayed += 1
+
+            # Cut the torn tail so new records start on a clean line
+            if good < os.path.getsize(self._log_path):
+                print("⚠️ Journal: torn record at the end of the log dropped")
+                with open(self._log_path, "r+b") as f:
+                    f.truncate(good)
+
+        self.durable_seq = self._seq
+        return replayed
+
+    def _apply(self, record):
+        if record.get("reset"):
+            self._lines = {}
+
+        for pid, state in record["lines"].items():
+            if state[0] or state[1]:
+                self._lines[pid] = tuple(state)
+            else:
+                self._lines.pop(pid, None)
+
+    def restore(self, cart, catalog):
+        """
+        Puts the recovered lines into `cart` (call on the thread that
+        owns the cart, before the first record()). Runs once.
+        """
+
+        if self.restored:
+            return
+
+        for pid, (quantity, weight) in list(self._lines.items()):
+            product = catalog.get(pid)
+
+            if product is None:
+                print(f"⚠️ Journal: product {pid} no longer in the catalog — dropped")
+                continue
+
+            cart.set_line(product, quantity, weight)
+
+        self._cart_version = cart.version
+        self.restored = True
+
+    # ---------------- HOT PATH ----------------
+    def record(self, cart, outcome, cart_events=(), features=None):
+        """
+        Queues one committed event with the new state of every cart
+        line changed since the previous record. Never blocks on disk.
+        """
+
+        start = time.perf_counter()
+
+        changed = None
+        if self._cart_version is not None:
+            changed = cart.changes_since(self._cart_version)
+
+        record = {"outcome": outcome, "t": round(time.time(), 3)}
+
+        if changed is None:
+            # Reset, or nothing recorded yet: store every line. From
+            # here on the journal mirrors this cart, not the old one.
+            record["reset"] = True
+            self.restored = True
+
+        record["lines"] = line_states(cart, changed)
+
+        if cart_events:
+            record["events"] = list(cart_events)
+        if features:
+            record["features"] = features
+
+        self._cart_version = cart.version
+
+        with self._cond:
+            self._seq += 1
+            record["seq"] = self._seq
+            self._pending.append(record)
+            self._cond.notify()
+
+        elapsed = time.perf_counter() - start
+
+        self.records += 1
+        if elapsed > self.max_append:
+            self.max_append = elapsed
+        if elapsed > APPEND_BUDGET:
+            self.over_budget += 1
+
+        return record["seq"]
+
+    # ---------------- WRITER THREAD ----------------
+    def _writer_loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._pending or self._closing, self.commit_interval
+                )
+                batch, self._pending = self._pending, []
+                closing = self._closing
+
+            if batch:
+                self._commit(batch)
+
+            if closing and not batch:
+                return
+
+    def _commit(self, batch):
+        self._file.write(
+            "".join(json.dumps(r, separators=_SEPARATORS) + "\n" for r in batch)
+        )
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        for record in batch:
+            self._apply(record)
+
+        self._since_snapshot += len(batch)
+        self.commits += 1
+
+        if self._since_snapshot >= self.snapshot_every:
+            self._write_snapshot(batch[-1]["seq"])
+
+        with self._cond:
+            self.durable_seq = batch[-1]["seq"]
+            self._cond.notify_all()
+
+    def _write_snapshot(self, seq):
+        tmp = self._snapshot_path + ".tmp"
+
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"seq": seq, "lines": self._lines}, f, separators=_SEPARATORS)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp, self._snapshot_path)
+
+        # Every logged record is now covered by the snapshot
+        self._file.close()
+        self._file = open(self._log_path, "w", encoding="utf-8")
+
+        self._since_snapshot = 0
+        self.snapshots += 1
+
+    # ---------------- LIFECYCLE ----------------
+    def flush(self, timeout=None):
+        """
+        Waits until everything recorded so far is on disk.
+        """
+        with self._cond:
+            seq = self._seq
+            return self._cond.wait_for(lambda: self.durable_seq >= seq, timeout)
+
+    def close(self, discard=False):
+        """
+        Writes out what is queued and stops the writer. discard=True
+        also deletes the journal (the session ended cleanly, there is
+        nothing to recover).
+        """
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+
+        self._thread.join()
+        self._file.close()
+
+        if discard:
+            for path in (self._log_path, self._snapshot_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def stats(self):
+        return {
+            "records": self.records,
+            "commits": self.commits,
+            "snapshots": self.snapshots,
+            "durable_seq": self.durable_seq,
+            "max_append": self.max_append,
+            "over_budget": self.over_budget,
+            "recovery_time": self.recovery_time
+        }
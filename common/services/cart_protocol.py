@@ -0,0 +1,72 @@
+"""
+Wire format shared by the cart server and its clients.
+
+One JSON object per line, over TCP ("host:port") or a Unix socket
+(a filesystem path).
+
+    cart -> server
+      {"type": "hello", "cart": "cart-7"}        attach to (or open) the session
+      {"type": "event", "id": 1, "weight_delta": 125, "colors": [...],
+       "confidence": 0.8, "aspect_ratio": 1.7, "area_ratio": 0.24}
+      {"type": "reset"}                           New Cart
+
+    server -> cart
+      {"type": "result", "id": 1, "outcome": "ADD", "confidence": 0.8,
+       "names": "Santoor Soap", "update": {...}}
+      {"type": "update", "version": 12, "reset": true,
+       "lines": {...}, "total": 115.0, "item_count": 3}
+      {"type": "error", "message": "..."}
+
+"lines" maps product_id -> [quantity, weight] for the cart lines that
+changed ([0, 0] = line gone), or for every line when "reset" is set,
+the same absolute form as the cart journal.
+"""
+import json
+import os
+
+from common.services.cart_journal import line_states
+
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+
+_SEPARATORS = (",", ":")
+
+
+def parse_address(address):
+    """
+    "host:port" -> ("tcp", (host, port)); a path -> ("unix", path).
+    """
+
+    if os.sep in address or "/" in address or address.endswith(".sock"):
+        return "unix", address
+
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+def encode(message):
+    return (json.dumps(message, separators=_SEPARATORS) + "\n").encode("utf-8")
+
+
+def cart_update(cart, since=None):
+    """
+    "update" message with the lines changed after version `since`
+    (every line when since is None or the change log no longer
+    reaches back that far).
+    """
+
+    changed = None if since is None else cart.changes_since(since)
+
+    update = {
+        "type": "update",
+        "version": cart.version,
+        "total": round(cart.total(), 2),
+        "item_count": cart.item_count
+    }
+
+    if changed is None:
+        update["reset"] = True
+
+    update["lines"] = line_states(cart, changed)
+
+    return update
@@ -0,0 +1,340 @@
+"""
+Multi-cart backend server: one catalog and one model for many carts.
+
+Running main.py on every cart means every cart parses the catalog,
+unpickles the KNN model and pays the whole Python start-up. Here one
+asyncio process holds the ProductIndex and the model once and keeps a
+Cart per session. Carts send weight + vision features (see
+cart_protocol) and get their changed cart lines back; every other
+connection attached to the same cart is pushed the same update.
+
+Events are resolved on worker threads (RESOLVE_WORKERS), not on the
+event loop: the ML tie-break alone takes ~0.7 ms and a multi-item
+search may use its whole 20 ms budget, which would stall every other
+cart's I/O. A per-cart lock keeps each cart's events in order. Quiet
+mode drops the per-event log lines of the pipeline, resolver and cart
+(INFO on the "common" loggers); warnings still show.
+
+Pushes to a cart's other connections never wait for them. A client
+that has more than MAX_WRITE_BUFFER bytes unread gets no more pushes
+until it catches up, and then one full cart state.
+
+A session whose last connection closed is dropped after SESSION_IDLE
+seconds; a cart that reconnects before then gets its cart back.
+
+    python main.py --serve 127.0.0.1:8765
+    python -m benchmarks.load_carts 200
+"""
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common.models.cart import Cart
+from common.services.cart_protocol import (
+    DEFAULT_ADDRESS,
+    cart_update,
+    encode,
+    parse_address
+)
+from common.services.pipeline import Pipeline
+
+
+# Resolving is pure Python: with the GIL more threads add hand-offs,
+# not throughput. One keeps the event loop free for I/O.
+RESOLVE_WORKERS = 1
+MAX_WRITE_BUFFER = 256 * 1024     # bytes unread by one client
+SESSION_IDLE = 600                # seconds a cart without connections is kept
+
+# Parent of the pipeline, resolver, event handler and cart loggers
+EVENT_LOGGER = logging.getLogger("common")
+
+
+class CartSession:
+    """
+    One cart's server-side state: its Cart and a Pipeline that shares
+    the server's catalog and model.
+    """
+
+    def __init__(self, cart_id, ml_model, product_index):
+        self.cart_id = cart_id
+        self.cart = Cart()
+        # Weight and vision arrive with each event: no scale, no camera
+        self.pipeline = Pipeline(
+            weight_provider=None, camera=None, ml_model=ml_model,
+            catalog=product_index, cart=self.cart, stabilize=None
+        )
+
+        self.writers = set()
+        self.stale = set()           # writers that missed pushes
+        self.lock = asyncio.Lock()
+        self.events = 0
+        self.idle = None             # eviction timer while no one is attached
+        self._version = self.cart.version
+
+    def update(self, full=False):
+        """
+        Update message for everything changed since the last one.
+        """
+        update = cart_update(self.cart, None if full else self._version)
+        self._version = self.cart.version
+        return update
+
+
+class CartServer:
+
+    def __init__(self, product_index, ml_model, address=DEFAULT_ADDRESS, quiet=True):
+        self.product_index = product_index
+        self.ml_model = ml_model
+        self.address = address
+        self.quiet = quiet
+
+        self.sessions = {}
+        self.connections = 0
+        self.events = 0
+        self.errors = 0
+        self.evicted = 0
+
+        self._server = None
+        self._started = None
+        self._executor = None
+        self._log_level = None
+
+    async def start(self):
+        if self.quiet:
+            self._log_level = EVENT_LOGGER.level
+            EVENT_LOGGER.setLevel(logging.WARNING)
+
+        self._executor = ThreadPoolExecutor(
+            RESOLVE_WORKERS, thread_name_prefix="cart-resolve"
+        )
+
+        kind, target = parse_address(self.address)
+
+        if kind == "unix":
+            self._server = await asyncio.start_unix_server(self._handle, path=target)
+        else:
+            host, port = target
+            self._server = await asyncio.start_server(self._handle, host, port)
+
+            # Port 0 picks a free port
+            if port == 0:
+                port = self._server.sockets[0].getsockname()[1]
+                self.address = f"{host}:{port}"
+
+        self._started = time.perf_counter()
+        print(f"🛒 Cart server listening on {self.address}")
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+        for session in self.sessions.values():
+            if session.idle is not None:
+                session.idle.cancel()
+
+        if self._log_level is not None:
+            EVENT_LOGGER.setLevel(self._log_level)
+            self._log_level = None
+
+    def session(self, cart_id):
+        session = self.sessions.get(cart_id)
+
+        if session is None:
+            session = CartSession(cart_id, self.ml_model, self.product_index)
+            self.sessions[cart_id] = session
+
+        elif session.idle is not None:
+            session.idle.cancel()
+            session.idle = None
+
+        return session
+
+    def _detach(self, session, writer):
+        """
+        Forgets a closed connection; the session's last one starts its
+        idle timer.
+        """
+
+        session.writers.discard(writer)
+        session.stale.discard(writer)
+
+        if not session.writers and session.idle is None:
+            session.idle = asyncio.get_running_loop().call_later(
+                SESSION_IDLE, self._evict, session
+            )
+
+    def _evict(self, session):
+        session.idle = None
+
+        if session.writers or self.sessions.get(session.cart_id) is not session:
+            return
+
+        del self.sessions[session.cart_id]
+        self.evicted += 1
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+
+        return {
+            "sessions": len(self.sessions),
+            "connections": self.connections,
+            "events": self.events,
+            "errors": self.errors,
+            "evicted": self.evicted,
+            "events_per_sec": self.events / elapsed if elapsed > 0 else 0.0
+        }
+
+    # ---------------- CONNECTIONS ----------------
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        session = None
+
+        try:
+            while True:
+                raw = await reader.readline()
+
+                if not raw:
+                    break
+
+                message = {}
+
+                try:
+                    message = json.loads(raw)
+                    kind = message.get("type")
+
+                    if kind == "hello":
+                        cart_id = message.get("cart")
+
+                        if cart_id is None or cart_id == "":
+                            raise ValueError("hello needs a cart id")
+
+                        if session is not None:
+                            self._detach(session, writer)
+
+                        session = self.session(str(cart_id))
+
+                        # Whole cart first: the client may be reconnecting
+                        async with session.lock:
+                            session.writers.add(writer)
+                            writer.write(encode(cart_update(session.cart)))
+
+                    elif session is None:
+                        raise ValueError("send hello first")
+
+                    elif kind == "event":
+                        await self._event(session, writer, message)
+
+                    elif kind == "reset":
+                        async with session.lock:
+                            session.cart.reset()
+                            self._broadcast(session, session.update(), None)
+
+                    else:
+                        raise ValueError(f"unknown message type {kind!r}")
+
+                except Exception as e:
+                    self.errors += 1
+                    writer.write(encode({
+                        "type": "error", "id": message.get("id"), "message": str(e)
+                    }))
+
+                await writer.drain()
+
+        except ConnectionError:
+            pass
+
+        finally:
+            if session is not None:
+                self._detach(session, writer)
+
+            self.connections -= 1
+            writer.close()
+
+    async def _event(self, session, writer, message):
+        loop = asyncio.get_running_loop()
+
+        # One event per cart at a time, in arrival order
+        async with session.lock:
+            event = await loop.run_in_executor(
+                self._executor, session.pipeline.process_features,
+                message["weight_delta"], message
+            )
+
+            session.events += 1
+            self.events += 1
+
+            update = session.update()
+
+            result = {"type": "result", "id": message.get("id"), "update": update}
+
+            if event is None:
+                result["outcome"] = None    # below the noise threshold
+            else:
+                result["outcome"] = event["outcome"]
+                result["confidence"] = round(float(event.get("confidence") or 0.0), 4)
+                result["names"] = event.get("names")
+
+            writer.write(encode(result))
+            self._broadcast(session, update, writer)
+
+    def _broadcast(self, session, update, sender):
+        """
+        Pushes `update` to the cart's other connections without waiting
+        for them (call with session.lock held).
+        """
+
+        if not update["lines"] and not update.get("reset"):
+            return
+
+        data = encode(update)
+
+        for other in session.writers:
+            if other is sender:
+                continue
+
+            if other.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+                session.stale.add(other)
+                continue
+
+            if other in session.stale:
+                # Missed pushes: the whole cart instead of this change
+                session.stale.discard(other)
+                other.write(encode(cart_update(session.cart)))
+            else:
+                other.write(data)
+
+
+def serve(product_index, ml_model, address=DEFAULT_ADDRESS, quiet=True):
+    """
+    Runs the server until interrupted, then prints its stats.
+    """
+
+    server = CartServer(product_index, ml_model, address, quiet)
+
+    async def main():
+        await server.start()
+        await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+    stats = server.stats()
+    print(
+        f"\n🛑 Cart server stopped: {stats['sessions']} carts, "
+        f"{stats['events']} events ({stats['events_per_sec']:.1f} events/s), "
+        f"{stats['errors']} errors"
+    )
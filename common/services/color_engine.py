@@ -0,0 +1,195 @@
+"""
+Vectorized color engine.
+
+Labels every pixel of an HSV crop in one pass using lookup tables
+precomputed from the classify_color() rules, then counts labels to get
+the fraction of each color in the foreground.
+
+classify_color() only depends on:
+    hue        (0-179, OpenCV scale)
+    s < 35     (white check)
+    v < 50     (black check)
+    v > 160    (white check)
+
+so the tables (built on first use by lookup_tables()) are:
+    sv_lut[s, v]      -> 0 for background, else 1 + saturation/value class
+    hue_lut[h, class] -> color label
+"""
+from functools import lru_cache
+
+import numpy as np
+
+
+COLOR_NAMES = (
+    "red", "orange", "yellow", "green",
+    "blue", "purple", "black", "white"
+)
+
+UNCLASSIFIED = len(COLOR_NAMES)      # foreground pixel, classify_color -> None
+BACKGROUND = len(COLOR_NAMES) + 1    # filtered out by the S/V mask
+N_LABELS = len(COLOR_NAMES) + 2
+
+# Same foreground filter as the original vision path
+MIN_SATURATION = 30
+MIN_VALUE = 70
+MIN_PIXELS = 80
+
+# Representative (s, v) values for every class classify_color() can tell apart
+_S_LEVELS = (0, 255)        # s < 35, s >= 35
+_V_LEVELS = (0, 100, 255)   # v < 50, 50 <= v <= 160, v > 160
+
+
+def classify_color(h, s, v):
+    """
+    Coarse HSV color classification.
+    """
+
+    if v < 50:
+        return "black"
+
+    if s < 35 and v > 160:
+        return "white"
+
+    if h < 10 or h > 170:
+        return "red"
+    elif 10 <= h < 30:
+        return "orange"
+    elif 30 <= h < 50:
+        return "yellow"
+    elif 50 <= h < 85:
+        return "green"
+    elif 85 <= h < 140:
+        return "blue"
+    elif 140 <= h < 170:
+        return "purple"
+
+    return None
+
+
+def compute_confidence(s, v):
+    """
+    Confidence estimation.
+    """
+
+    confidence = ((s / 255) * 0.6 + (v / 255) * 0.4) + 0.2
+
+    return round(min(confidence, 1.0), 2)
+
+
+def _sv_class(s, v):
+    s_cls = 0 if s < 35 else 1
+    v_cls = 0 if v < 50 else (1 if v <= 160 else 2)
+    return 1 + s_cls * len(_V_LEVELS) + v_cls
+
+
+def _build_sv_lut():
+    lut = np.zeros((256, 256), dtype=np.uint8)
+
+    for s in range(256):
+        for v in range(256):
+            if s > MIN_SATURATION and v > MIN_VALUE:
+                lut[s, v] = _sv_class(s, v)
+
+    return lut
+
+
+def _build_hue_lut():
+    n_classes = 1 + len(_S_LEVELS) * len(_V_LEVELS)
+    lut = np.full((180, n_classes), BACKGROUND, dtype=np.uint8)
+
+    for h in range(180):
+        for s in _S_LEVELS:
+            for v in _V_LEVELS:
+                color = classify_color(h, s, v)
+                label = COLOR_NAMES.index(color) if color else UNCLASSIFIED
+                lut[h, _sv_class(s, v)] = label
+
+    return lut
+
+
+@lru_cache(maxsize=None)
+def lookup_tables():
+    """
+    Returns (sv_lut, hue_lut), built once.
+    """
+    return _build_sv_lut(), _build_hue_lut()
+
+
+def _hist(image, bins, channel=0, mask=None):
+    import cv2
+
+    hist = cv2.calcHist([image], [channel], mask, [bins], [0, bins])
+    return hist.ravel().astype(np.int64)
+
+
+def _hist_median(hist, n):
+    """
+    Median of n values given their 256-bin histogram (same result as
+    np.median, without sorting the pixels).
+    """
+    cum = np.cumsum(hist)
+    lo = int(np.searchsorted(cum, (n - 1) // 2, side="right"))
+    hi = int(np.searchsorted(cum, n // 2, side="right"))
+    return (lo + hi) / 2
+
+
+def analyze_colors(hsv):
+    """
+    Labels every pixel of an HSV image.
+
+    Returns dict:
+        fractions   - {color: fraction of foreground pixels}, largest first
+        confidence  - compute_confidence() on the foreground S/V medians
+        pixel_count - number of foreground pixels
+
+    fractions is empty and confidence 0.0 when fewer than MIN_PIXELS
+    pixels pass the foreground filter.
+    """
+
+    sv_lut, hue_lut = lookup_tables()
+
+    s = hsv[:, :, 1]
+    v = hsv[:, :, 2]
+
+    # Flat table lookups (take) are much cheaper than 2-D fancy indexing
+    sv_index = s.astype(np.uint16) << 8
+    sv_index |= v
+    sv_class = sv_lut.ravel().take(sv_index)
+
+    hue_index = hsv[:, :, 0].astype(np.uint16) * hue_lut.shape[1]
+    hue_index += sv_class
+    labels = hue_lut.ravel().take(hue_index)
+
+    counts = _hist(labels, N_LABELS)
+    pixel_count = int(labels.size - counts[BACKGROUND])
+
+    if pixel_count < MIN_PIXELS:
+        return {
+            "fractions": {},
+            "confidence": 0.0,
+            "pixel_count": pixel_count
+        }
+
+    order = np.argsort(-counts[:len(COLOR_NAMES)], kind="stable")
+    fractions = {
+        COLOR_NAMES[i]: float(counts[i] / pixel_count)
+        for i in order
+        if counts[i]
+    }
+
+    fg = (sv_class != 0).view(np.uint8)
+    s_val = _hist_median(_hist(hsv, 256, channel=1, mask=fg), pixel_count)
+    v_val = _hist_median(_hist(hsv, 256, channel=2, mask=fg), pixel_count)
+
+    return {
+        "fractions": fractions,
+        "confidence": compute_confidence(s_val, v_val),
+        "pixel_count": pixel_count
+    }
+
+
+def dominant_colors(fractions, top=2):
+    """
+    Returns the `top` most frequent colors (most frequent first).
+    """
+    return list(fractions)[:top]
@@ -1,16 +1,26 @@
-CONFIDENCE_THRESHOLD = 0.5
-
-def handle_event(cart, product, event):
-    print(f"🔍 Event confidence: {event['confidence']}")
-
-    if event["confidence"] < CONFIDENCE_THRESHOLD:
-        print("⚠️ Low confidence event ignored")
-        return
-
-    if event["event_type"] == "ADD":
-        print(f"➕ ADD detected (Product ID: {product.id})")
-        cart.add(product, event["weight_delta"])
-
-    elif event["event_type"] == "REMOVE":
-        print(f"➖ REMOVE detected (Weight change: {event['weight_delta']}g)")
-        cart.remove_by_weight(event["weight_delta"])
+import logging
+
+
+CONFIDENCE_THRESHOLD = 0.5
+
+log = logging.getLogger(__name__)
+
+def handle_event(cart, product, event):
+    log.info(f"🔍 Event confidence: {event['confidence']}")
+
+    if event["confidence"] < CONFIDENCE_THRESHOLD:
+        log.info("⚠️ Low confidence event ignored")
+        return
+
+    if event["event_type"] == "ADD":
+        log.info(f"➕ ADD detected (Product ID: {product.id})")
+        cart.add(product, event["weight_delta"])
+
+    elif event["event_type"] == "REMOVE":
+        log.info(f"➖ REMOVE detected (Weight change: {event['weight_delta']}g)")
+
+        # Product already picked (unique weight match or vision)
+        if product is not None and product.id in cart.items:
+            return cart.remove(product.id, event["weight_delta"])
+
+        return cart.remove_by_weight(event["weight_delta"])
@@ -0,0 +1,179 @@
+"""
+Motion-gated frame selection.
+
+After a weight trigger the product may still be dropping, or the
+shopper's hand may still be in view. Analyzing the first frame after
+the scale settles then gives wrong colors (the hand) or none at all.
+
+MotionGate watches the stream's frames after the event instead, with
+a cheap difference over the center crop: gray, box-downscaled by
+DOWNSCALE, and the share of those cells whose gray level moved by more
+than PIXEL_THRESHOLD.
+
+    changed   > CHANGE_FRACTION of the cells differ from the pre-event
+              background
+    still     <= MOTION_FRACTION differ from the previous frame
+
+The first frame that is changed and has been still for STILL_FRAMES
+frames is analyzed. A scene that is still but never changes (the item
+went in outside the crop) is taken after UNCHANGED_FRAMES; one that
+keeps moving until the timeout falls back to the newest frame.
+
+Both calls take the trigger's timestamp: the walk starts at the first
+frame after the trigger, which the stream's ring buffer still holds when
+the scale settles later.
+
+    gate = MotionGate()
+    background = gate.background(stream, trigger_ts)      # at the trigger
+    frame = gate.select(stream, background, trigger_ts)   # to analyze
+
+Without a background (no frame from before the trigger, e.g. the camera
+was still warming up) only stillness is waited for; those events are
+counted in stats()["no_background"].
+"""
+import time
+
+
+DOWNSCALE = 8
+PIXEL_THRESHOLD = 20     # gray levels (block averages, so noise stays below)
+CHANGE_FRACTION = 0.03
+MOTION_FRACTION = 0.01
+STILL_FRAMES = 2
+UNCHANGED_FRAMES = 8
+GATE_TIMEOUT = 1.0       # s of motion before the newest frame is used
+
+
+def signature(frame, downscale=DOWNSCALE):
+    """
+    Small gray thumbnail of the center crop. Averaging whole blocks
+    also averages out sensor noise.
+    """
+    import cv2
+
+    from common.services.camera_real import center_crop
+
+    gray = cv2.cvtColor(center_crop(frame), cv2.COLOR_BGR2GRAY)
+    h, w = gray.shape
+
+    return cv2.resize(
+        gray, (max(1, w // downscale), max(1, h // downscale)),
+        interpolation=cv2.INTER_AREA
+    )
+
+
+def difference(a, b, pixel_threshold=PIXEL_THRESHOLD):
+    """
+    Share (0-1) of signature cells that differ by more than
+    pixel_threshold.
+    """
+    import cv2
+
+    return float((cv2.absdiff(a, b) > pixel_threshold).mean())
+
+
+class MotionGate:
+
+    def __init__(
+        self, change_fraction=CHANGE_FRACTION, motion_fraction=MOTION_FRACTION,
+        still_frames=STILL_FRAMES, unchanged_frames=UNCHANGED_FRAMES,
+        timeout=GATE_TIMEOUT, downscale=DOWNSCALE
+    ):
+        self.change_fraction = change_fraction
+        self.motion_fraction = motion_fraction
+        self.still_frames = still_frames
+        self.unchanged_frames = unchanged_frames
+        self.timeout = timeout
+        self.downscale = downscale
+
+        self.events = 0
+        self.frames = 0          # frames compared
+        self.gated = 0           # changed + still
+        self.unchanged = 0       # still, never changed
+        self.fallbacks = 0       # still moving at the timeout
+        self.no_background = 0   # no pre-event scene to compare with
+
+    def background(self, stream, before):
+        """
+        Signature of the oldest buffered frame taken at or before
+        `before` (the trigger), i.e. the scene before the item went in.
+        None when the stream holds no such frame.
+        """
+
+        frames = stream.frames_since(float("-inf")) if hasattr(stream, "frames_since") else []
+
+        if not frames or frames[0][0] > before:
+            return None
+
+        return signature(frames[0][1], self.downscale)
+
+    def select(self, stream, background, after, timeout=None):
+        """
+        Walks the frames captured after `after` (the trigger) and returns
+        the first one worth analyzing (see module doc), or None when no
+        frame arrived.
+        """
+
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        self.events += 1
+
+        if background is None:
+            self.no_background += 1
+
+        previous = None
+        latest = None
+        still = 0
+        ts = after
+
+        while True:
+            remaining = deadline - time.monotonic()
+
+            if remaining <= 0:
+                break
+
+            ts_frame, frame = stream.frame_after(ts, timeout=remaining)
+
+            if frame is None:
+                break
+
+            ts = ts_frame
+            latest = frame
+
+            current = signature(frame, self.downscale)
+            self.frames += 1
+
+            if previous is not None and difference(current, previous) <= self.motion_fraction:
+                still += 1
+            else:
+                still = 0
+
+            previous = current
+
+            changed = background is None or difference(current, background) > self.change_fraction
+
+            if changed and still >= self.still_frames:
+                self.gated += 1
+                return frame
+
+            if not changed and still >= self.unchanged_frames:
+                print("⚠️ Scene did not change — analyzing it anyway")
+                self.unchanged += 1
+                return frame
+
+        if latest is not None:
+            print("⚠️ Scene still moving — analyzing the newest frame")
+            self.fallbacks += 1
+
+        return latest
+
+    def stats(self):
+        return {
+            "events": self.events,
+            "frames": self.frames,
+            "gated": self.gated,
+            "unchanged": self.unchanged,
+            "fallbacks": self.fallbacks,
+            "no_background": self.no_background,
+            "frames_per_event": self.frames / self.events if self.events else 0.0
+        }
@@ -0,0 +1,1096 @@
+"""
+Staged, non-blocking cart event pipeline.
+
+Every slow step of an event runs on its own worker thread, and stages
+hand events to each other through small bounded queues:
+
+    weight acquisition → stabilization → capture → vision → resolve / ML
+                                                                  │
+                                                     results queue│
+                                                                  ▼
+                                                 cart commit (UI thread)
+
+The Tk main loop never waits on the scale, the camera or the model: it
+only drains the results queue (non-blocking) every RESULT_POLL_MS and
+applies each result to the cart and the screen. Cart state is only
+ever touched on the UI thread.
+
+Every dependency is injected, so the same Pipeline also runs without a
+display:
+
+    pipeline = Pipeline(
+        weight_provider=weight_provider, camera=camera, ml_model=model,
+        catalog=catalog, cart=Cart()
+    )
+    stats = pipeline.run_headless()      # as fast as inputs arrive
+
+Several pipelines (carts) can share one catalog and model in a process.
+
+Dependencies can also come from a WarmupManager that is still loading
+them: each stage then waits only for the one it uses (acquisition for
+the weight provider, capture for the camera, resolve for the catalog,
+the tie-break for the model).
+
+With a CartJournal every committed outcome is journaled, and the cart
+lines a crash left behind are restored before the first commit. The UI
+thread never waits for that: results stay queued until the journal and
+catalog have warmed up.
+
+With a CartClient (remote=) the cart only weighs, captures and runs
+vision: the resolve stage sends the weight and vision features to the
+cart server, and the local cart mirrors the server's. The server side
+runs process_features() for each such message.
+
+With a VisionPool (vision=) frame analysis runs in worker processes.
+The vision stage only submits the frame; the resolve stage collects the
+result, so the next events' frames are analyzed meanwhile. Several
+pipelines (cameras) in one process can share one pool.
+
+With a MotionGate (motion_gate=) the capture stage waits for the scene
+to change from before the event and stop moving, instead of taking the
+first frame after the scale settled.
+
+With a CaptureArchive (archive=) every analyzed crop is handed to its
+writer thread, tagged with the event id; nothing is written on the
+pipeline's threads.
+
+Per-event progress goes to the logging module (INFO) — this module's
+logger and the resolver's, event handler's and cart's. main.py prints
+it to stdout; the cart server raises the level to drop it.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+
+from ml.utils import extract_ml_features
+from inputs.simulation.simulator import simulate_event
+
+from common.services.camera_real import analyze_frame_detailed, grab_frame
+from common.services.cart_client import CartMirror
+from common.services.event_handler import handle_event
+from common.services.product_index import ProductIndex
+from common.services.product_resolver import (
+    resolve_product_by_weight,
+    resolve_products_by_weight_multi,
+    resolve_removal_multi
+)
+from common.services.vision_mapper import map_color_to_categories
+from common.services.weight_stabilizer import StabilizationDetector
+
+
+NOISE_THRESHOLD = 5          # grams
+ML_CONFIDENCE_THRESHOLD = 0.7
+LOW_VISION_CONFIDENCE = 0.15
+
+STAGE_QUEUE_SIZE = 2
+RESULT_QUEUE_SIZE = 8
+
+IDLE_POLL = 0.2              # seconds between empty weight polls
+CAPTURE_TIMEOUT = 1.0        # seconds to wait for a post-event frame
+VISION_TIMEOUT = 5.0         # seconds to wait for a vision worker
+RESULT_POLL_MS = 50
+
+_STOP = object()
+
+log = logging.getLogger(__name__)
+
+
+# ---------------- DEBUG LOG ----------------
+def log_debug_info(
+    weight_delta,
+    detected_colors,
+    vision_conf,
+    aspect_ratio,
+    area_ratio,
+    candidate_categories,
+    product=None
+):
+
+    if not log.isEnabledFor(logging.INFO):
+        return
+
+    lines = [
+        "",
+        "==============================",
+        " SMART CART EVENT PIPELINE",
+        "==============================",
+        f"Weight delta: {weight_delta} g",
+        f"Detected colors: {detected_colors}"
+    ]
+
+    if aspect_ratio:
+        lines.append(f"Aspect ratio: {aspect_ratio:.2f}")
+
+    if area_ratio:
+        lines.append(f"Area ratio: {area_ratio:.3f}")
+
+    lines.append(f"Candidate categories: {candidate_categories}")
+
+    if product:
+        diff = abs(product.unit_weight - abs(weight_delta))
+
+        lines.append("\nResolver result:")
+        lines.append(f"Matched product: {product.name}")
+        lines.append(f"Expected weight: {product.unit_weight} g")
+        lines.append(f"Weight difference: {diff} g")
+
+    else:
+        lines.append("\nResolver result: ❌ NO MATCH")
+
+    lines.append("==============================\n")
+
+    log.info("\n".join(lines))
+
+
+def _vision_features(event):
+    """
+    The event's vision results as plain JSON values (vision numbers may
+    be NumPy scalars).
+    """
+
+    features = {}
+
+    if event.get("colors"):
+        features["colors"] = list(event["colors"])
+
+    for key in ("confidence", "aspect_ratio", "area_ratio"):
+        if event.get(key) is not None:
+            features[key] = round(float(event[key]), 4)
+
+    return features
+
+
+# ---------------- STABILIZATION ----------------
+def wait_for_weight_stabilization(weight_provider, detector=None):
+    """
+    Waits until the raw load-cell readings settle (rolling variance and
+    slope below threshold), capped by the detector timeout.
+
+    Providers without a raw sample stream (read_sample) deliver deltas
+    the firmware has already stabilized, so there is nothing to wait for.
+    """
+
+    read_sample = getattr(weight_provider, "read_sample", None)
+
+    if read_sample is None:
+        return True
+
+    detector = detector or StabilizationDetector()
+
+    log.info("⏳ Waiting for weight to stabilize...")
+
+    stable, weight, elapsed = detector.wait(read_sample)
+
+    if stable:
+        log.info(f"✅ Weight stable after {elapsed * 1000:.0f} ms")
+    else:
+        log.info(f"⚠️ Weight not stable after {elapsed:.1f} s — continuing")
+
+    return stable
+
+
+class HeadlessSink:
+    """
+    UI sink for runs without a display.
+
+    Same hooks as SmartCartUI (minus after()), so the pipeline commits
+    results directly instead of handing them to a Tk loop.
+    """
+
+    view_mode = "CART"
+
+    def __init__(self):
+        self.outcomes = Counter()
+        self.last_event = None
+
+    def update_frame(self, frame):
+        pass
+
+    def update_event(self, action, confidence=None, product_name=None):
+        self.outcomes[action] += 1
+        self.last_event = (action, confidence, product_name)
+
+    def refresh(self):
+        pass
+
+
+class Pipeline:
+    """
+    One cart's event pipeline.
+
+    weight_provider: get_next_weight() (+ optional read_sample(), and
+        sample_source() for the samples of the event just read)
+    camera: anything with frame_after(ts, timeout) -> (ts, frame),
+        e.g. a CameraStream; None opens the webcam per event.
+    ml_model: loaded ProductMLModel (predict(features))
+    catalog: ProductIndex, or a products mapping to index
+    cart: Cart
+    ui: UI sink — SmartCartUI, or anything with update_frame(),
+        update_event(), refresh() and a view_mode attribute. When it
+        also has after(), results are committed on its thread.
+        Defaults to HeadlessSink.
+    stabilize: callable(samples) -> bool, blocks until the scale has
+        settled. samples is the event's sample source, or the weight
+        provider itself.
+    warmup: optional WarmupManager. Dependencies passed as None are
+        taken from its "weight_provider", "camera", "ml_model",
+        "product_index" and "journal" tasks when a stage first needs
+        them.
+    journal: optional CartJournal, written on the commit thread.
+    remote: optional CartClient (or a "remote" warm-up task). Events
+        are resolved by the cart server and `cart` mirrors its cart.
+    vision: optional VisionPool (or a "vision" warm-up task) that
+        analyzes frames in worker processes; it may be shared with
+        other pipelines. None analyzes in the vision stage's own thread.
+    motion_gate: optional MotionGate choosing which camera frame to
+        analyze (needs a CameraStream-like camera).
+    archive: optional CaptureArchive (or an "archive" warm-up task)
+        that saves the analyzed crops.
+    """
+
+    def __init__(
+        self, weight_provider, camera, ml_model, catalog,
+        cart, ui=None, stabilize=wait_for_weight_stabilization, warmup=None,
+        journal=None, remote=None, vision=None, motion_gate=None, archive=None
+    ):
+        self.weight_provider = weight_provider
+        self.camera = camera
+        self.ml_model = ml_model
+        self.product_index = (
+            catalog if catalog is None or isinstance(catalog, ProductIndex)
+            else ProductIndex(catalog)
+        )
+        self.cart = cart
+        self.ui = ui if ui is not None else HeadlessSink()
+        self.stabilize = stabilize
+        self.warmup = warmup
+        self.journal = journal
+        self.remote = remote
+        self.vision = vision
+        self.motion_gate = motion_gate
+        self.archive = archive
+        self._mirror = None
+
+        self._stop = threading.Event()
+        self._threads = []
+
+        self.q_stabilize = queue.Queue(STAGE_QUEUE_SIZE)
+        self.q_capture = queue.Queue(STAGE_QUEUE_SIZE)
+        self.q_vision = queue.Queue(STAGE_QUEUE_SIZE)
+        self.q_resolve = queue.Queue(STAGE_QUEUE_SIZE)
+        self.results = queue.Queue(RESULT_QUEUE_SIZE)
+
+        self.events_in = 0
+        self.events_committed = 0
+
+    # ---------------- HEADLESS MODE ----------------
+    def process(self, weight_delta):
+        """
+        Runs one weight event through every stage on the calling thread.
+        Returns the finished event dict (None for noise).
+        """
+
+        self._drain_updates()
+
+        event = self._new_event(weight_delta)
+
+        if event is None:
+            return None
+
+        resolve = self._resolve_remote if self._is_remote() else self._resolve
+
+        for stage in (self._stabilize, self._capture, self._vision, self._collect_vision, resolve):
+            event = stage(event)
+            if "outcome" in event:
+                break
+
+        self.restore_cart()
+        self._commit(event)
+        return event
+
+    def process_features(self, weight_delta, features):
+        """
+        Runs one event whose frame was analyzed elsewhere (a remote cart
+        sends its weight and vision features): removal triage, resolve /
+        ML and commit, on the calling thread.
+
+        features: colors, confidence, aspect_ratio, area_ratio
+        Returns the finished event dict (None for noise): its "outcome"
+        is the one committed, and "names" the products added or removed.
+        """
+
+        event = self._new_event(weight_delta)
+
+        if event is None:
+            return None
+
+        event["colors"] = list(features.get("colors") or [])
+        event["confidence"] = features.get("confidence", 0.0)
+        event["aspect_ratio"] = features.get("aspect_ratio")
+        event["area_ratio"] = features.get("area_ratio")
+
+        stages = [self._check_vision, self._resolve]
+
+        if event["event_type"] == "REMOVE":
+            stages.insert(0, self._triage_removal)
+
+        for stage in stages:
+            event = stage(event)
+            if "outcome" in event:
+                break
+
+        self.restore_cart()
+        self._commit(event)
+        return event
+
+    def run_headless(self, max_events=None):
+        """
+        Pulls weights and processes them back to back, without threads
+        or a UI loop, until the provider raises StopIteration (or
+        max_events were processed).
+
+        Returns dict: events, elapsed, events_per_sec, outcomes
+        """
+
+        outcomes = Counter()
+        processed = 0
+        start = time.perf_counter()
+
+        weight_provider = self._dependency("weight_provider")
+
+        while weight_provider is not None and (max_events is None or processed < max_events):
+
+            try:
+                weight_delta = weight_provider.get_next_weight()
+            except StopIteration:
+                break
+
+            if weight_delta is None:
+                time.sleep(0.001)
+                continue
+
+            event = self.process(weight_delta)
+
+            if event is not None:
+                processed += 1
+                outcomes[event["outcome"]] += 1
+
+        elapsed = time.perf_counter() - start
+
+        return {
+            "events": processed,
+            "elapsed": elapsed,
+            "events_per_sec": processed / elapsed if elapsed > 0 else 0.0,
+            "outcomes": dict(outcomes)
+        }
+
+    # ---------------- THREADED MODE ----------------
+    def start(self):
+        stages = [
+            ("acquire", self._acquire_loop, ()),
+            ("stabilize", self._stage_loop,
+             (self._stabilize, self.q_stabilize, self.q_capture)),
+            ("capture", self._stage_loop,
+             (self._capture, self.q_capture, self.q_vision)),
+            ("vision", self._stage_loop,
+             (self._vision, self.q_vision, self.q_resolve)),
+            ("resolve", self._stage_loop,
+             (self._resolve_stage, self.q_resolve, self.results)),
+        ]
+
+        for name, target, args in stages:
+            t = threading.Thread(
+                target=target, args=args, name=f"pipeline-{name}", daemon=True
+            )
+            t.start()
+            self._threads.append(t)
+
+        if hasattr(self.ui, "after"):
+            self.ui.after(RESULT_POLL_MS, self._drain_results)
+        else:
+            t = threading.Thread(
+                target=self._commit_loop, name="pipeline-commit", daemon=True
+            )
+            t.start()
+            self._threads.append(t)
+
+        return self
+
+    def stop(self, timeout=1.0):
+        """
+        Signals every stage to stop, then waits at most `timeout` in
+        total (not per stage) for their threads. A stage still busy
+        after that (a slow camera or vision call) is a daemon thread
+        and ends on its own.
+        """
+        self._stop.set()
+
+        deadline = time.monotonic() + timeout
+
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+
+        self._threads = []
+
+    @property
+    def running(self):
+        return not self._stop.is_set()
+
+    def _dependency(self, name):
+        """
+        Returns the dependency attribute `name`, first waiting for the
+        warm-up manager if it is still loading it. None when it failed
+        to load (or the pipeline stopped while waiting).
+        """
+
+        value = getattr(self, name)
+
+        if value is not None or self.warmup is None or name not in self.warmup:
+            return value
+
+        if not self.warmup.wait(name, timeout=0):
+            log.info(f"⏳ Waiting for {name} to warm up...")
+
+            while not self.warmup.wait(name, timeout=0.1):
+                if self._stop.is_set():
+                    return None
+
+        value = self.warmup.get(name)
+
+        if name == "product_index" and value is not None and not isinstance(value, ProductIndex):
+            value = ProductIndex(value)
+
+        setattr(self, name, value)
+        return value
+
+    def _is_remote(self):
+        return self.remote is not None or (
+            self.warmup is not None and "remote" in self.warmup
+        )
+
+    def _put(self, q, item):
+        """
+        Blocking put that still notices shutdown (backpressure without
+        deadlocking stop()).
+        """
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _stage_loop(self, fn, inbox, outbox):
+        while not self._stop.is_set():
+            try:
+                event = inbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            if event is _STOP:
+                self._put(outbox, _STOP)
+                return
+
+            try:
+                event = fn(event)
+            except Exception as e:
+                log.warning(f"⚠️ Pipeline stage error: {e}")
+                continue
+
+            if event is None:
+                continue
+
+            # Rejected events skip the remaining stages
+            target = self.results if "outcome" in event else outbox
+            self._put(target, event)
+
+    # ---------------- STAGE 1: WEIGHT ACQUISITION ----------------
+    def _acquire_loop(self):
+        weight_provider = self._dependency("weight_provider")
+
+        if weight_provider is None:
+            log.info("❌ No weight provider — event processing disabled")
+            self._put(self.q_stabilize, _STOP)
+            return
+
+        log.info("\n🔔 Waiting for next cart event...")
+
+        while not self._stop.is_set():
+
+            try:
+                weight_delta = weight_provider.get_next_weight()
+            except StopIteration:
+                log.info("🔚 Weight input ended")
+                self._put(self.q_stabilize, _STOP)
+                return
+
+            if weight_delta is None:
+                self._stop.wait(IDLE_POLL)
+                continue
+
+            event = self._new_event(weight_delta)
+
+            if event is None:
+                continue
+
+            # Acquisition reads ahead of stabilization: each event keeps
+            # its own raw samples
+            sample_source = getattr(weight_provider, "sample_source", None)
+            if sample_source is not None:
+                event["samples"] = sample_source()
+
+            self._put(self.q_stabilize, event)
+
+            log.info("\n🔔 Waiting for next cart event...")
+
+    def _new_event(self, weight_delta):
+        if abs(weight_delta) < NOISE_THRESHOLD:
+            log.info("⚠️ Noise ignored")
+            return None
+
+        self.events_in += 1
+
+        event = {
+            "id": self.events_in,
+            "weight_delta": weight_delta,
+            "event_type": "ADD" if weight_delta > 0 else "REMOVE",
+            "t_trigger": time.monotonic()
+        }
+
+        # Scene before the item went in (no waiting for a camera still
+        # warming up)
+        if self.motion_gate is not None:
+            if self.camera is not None:
+                event["background"] = self.motion_gate.background(self.camera, event["t_trigger"])
+            else:
+                log.info("⏳ Camera still warming up — no motion background for this event")
+
+        return event
+
+    # ---------------- STAGE 2: STABILIZATION ----------------
+    def _stabilize(self, event):
+        samples = event.pop("samples", None)
+
+        if samples is None:
+            samples = self._dependency("weight_provider")
+
+        event["stable"] = self.stabilize(samples)
+        event["settled_at"] = time.monotonic()
+        return event
+
+    # ---------------- STAGE 3: CAPTURE ----------------
+    def _capture(self, event):
+        # A remote cart's removals are triaged by the server's cart
+        if event["event_type"] == "REMOVE" and not self._is_remote():
+            event = self._triage_removal(event)
+            if "outcome" in event:
+                return event
+
+        camera = self._dependency("camera")
+
+        if camera is None:
+            frame = grab_frame()
+        elif self.motion_gate is not None:
+            frame = self.motion_gate.select(
+                camera, event.pop("background", None), event["t_trigger"],
+                timeout=CAPTURE_TIMEOUT
+            )
+        else:
+            _, frame = camera.frame_after(
+                event["settled_at"], timeout=CAPTURE_TIMEOUT
+            )
+
+        if frame is None:
+            log.info("❌ No frame available for this event")
+            event.update(outcome="REJECT_VISION", confidence=0.0, frame=None)
+            return event
+
+        event["frame"] = frame
+        return event
+
+    def _triage_removal(self, event):
+        """
+        A removal whose weight matches exactly one cart line needs no
+        camera. Otherwise the candidates are kept for vision to choose
+        from. The cart itself is only changed at commit time.
+        """
+
+        candidates = self.cart.removal_candidates(event["weight_delta"])
+        event["remove_candidates"] = [item.product for item in candidates]
+
+        if len(candidates) == 1:
+            log.info(f"➖ Weight matches only {candidates[0].product.name} — vision skipped")
+            event.update(outcome="REMOVE", product=candidates[0].product, confidence=1.0)
+
+        elif candidates:
+            log.info(f"⚠️ {len(candidates)} cart items match {abs(event['weight_delta'])} g — checking vision")
+
+        else:
+            # Several items taken out at once?
+            combos = resolve_removal_multi(self.cart, event["weight_delta"])
+            event["remove_combos"] = combos
+
+            if len(combos) == 1:
+                names = " + ".join(p.name for p in combos[0])
+                log.info(f"➖ Weight matches only {names} — vision skipped")
+                event.update(outcome="REMOVE", products=combos[0], confidence=1.0)
+
+        return event
+
+    # ---------------- STAGE 4: VISION ----------------
+    def _vision(self, event):
+        pool = self._dependency("vision")
+
+        if pool is not None:
+            # Not waited for here: the resolve stage collects the result,
+            # so the next event's frame goes to the pool meanwhile
+            try:
+                event["vision_future"] = pool.submit(event["frame"], VISION_TIMEOUT)
+                return event
+            except Exception as e:
+                log.info(f"⚠️ Vision pool unavailable ({e}) — analyzing here")
+
+        return self._apply_vision(event, analyze_frame_detailed(event.pop("frame")))
+
+    def _collect_vision(self, event):
+        """
+        Waits for the pool result _vision() submitted (if any).
+        """
+
+        future = event.pop("vision_future", None)
+
+        if future is None:
+            return event
+
+        frame = event.pop("frame")
+
+        try:
+            vision = future.result(VISION_TIMEOUT)
+        except Exception as e:
+            log.info(f"⚠️ Vision worker failed ({e}) — analyzing here")
+            vision = analyze_frame_detailed(frame)
+
+        return self._apply_vision(event, vision)
+
+    def _apply_vision(self, event, vision):
+        archive = self._dependency("archive")
+        if archive is not None:
+            archive.submit(vision["crop"], event["id"])
+
+        event["frame"] = vision["crop"]
+        event["colors"] = vision["colors"]
+        event["fractions"] = vision["fractions"]
+        event["confidence"] = vision["confidence"]
+        event["aspect_ratio"] = vision["aspect_ratio"]
+        event["area_ratio"] = vision["area_ratio"]
+
+        return self._check_vision(event)
+
+    def _check_vision(self, event):
+        if not event["colors"]:
+            if event["event_type"] == "REMOVE":
+                if self._is_remote():
+                    return event    # the server removes by weight
+
+                # Best weight match (nearest line, or first combination)
+                log.info("⚠️ Vision failed to detect color — removing by weight")
+                if event.get("remove_combos"):
+                    event["products"] = event["remove_combos"][0]
+                event["outcome"] = "REMOVE"
+                return event
+
+            log.info("❌ Vision failed to detect color")
+            event["outcome"] = "REJECT_VISION"
+            return event
+
+        if event["confidence"] < LOW_VISION_CONFIDENCE:
+            log.info(f"⚠️ Low vision confidence ({event['confidence']:.2f}) — continuing for demo")
+
+        return event
+
+    # ---------------- STAGE 5: RESOLVE / ML ----------------
+    def _resolve_stage(self, event):
+        event = self._collect_vision(event)
+
+        if "outcome" in event:
+            return event
+
+        return self._resolve_remote(event) if self._is_remote() else self._resolve(event)
+
+    def _resolve(self, event):
+        detected_colors = event["colors"]
+
+        if event["event_type"] == "REMOVE":
+            return self._resolve_removal(event)
+
+        candidate_categories = []
+
+        for color in detected_colors:
+            candidate_categories.extend(map_color_to_categories(color))
+
+        candidate_categories = list(set(candidate_categories))
+
+        log.info(f"Colors {detected_colors} mapped to categories: {candidate_categories}")
+
+        if not candidate_categories:
+            log.info("❌ No matching category")
+            event["outcome"] = "REJECT_MATCH"
+            return event
+
+        product_index = self._dependency("product_index")
+
+        if product_index is None:
+            log.info("❌ Product catalog unavailable")
+            event["outcome"] = "REJECT_MATCH"
+            return event
+
+        candidates = resolve_product_by_weight(
+            product_index,
+            candidate_categories,
+            event["weight_delta"],
+            detected_colors,
+            event["aspect_ratio"],
+            event["area_ratio"]
+        )
+
+        product = self._decide(event, candidates)
+
+        log.info(f"Candidates: {[c.id for c in candidates]}")
+        log_debug_info(
+            event["weight_delta"],
+            detected_colors,
+            event["confidence"],
+            event["aspect_ratio"],
+            event["area_ratio"],
+            candidate_categories,
+            product
+        )
+
+        if not product:
+            # Several items put in at once?
+            combos = resolve_products_by_weight_multi(
+                product_index,
+                candidate_categories,
+                event["weight_delta"],
+                detected_colors
+            )
+
+            if combos:
+                log.info(f"🧩 Explained as {len(combos[0])} items: {[p.name for p in combos[0]]}")
+                event["products"] = combos[0]
+                event["outcome"] = "ADD"
+                return event
+
+            log.info("⚠️ No product matched for detected category + weight")
+            event["outcome"] = "REJECT_MATCH"
+            return event
+
+        event["product"] = product
+        event["outcome"] = "ADD"
+        return event
+
+    def _resolve_removal(self, event):
+        """
+        Picks the ambiguous removal's cart line (or combination of lines)
+        by color. None leaves the choice to the nearest weight match at
+        commit time.
+        """
+
+        detected = set(event["colors"])
+        product = None
+
+        for candidate in event.get("remove_candidates", []):
+            if detected.intersection(candidate.dominant_colors):
+                product = candidate
+                break
+
+        if event.get("remove_combos"):
+            # Several items out at once: let the colors rank the combinations
+            combos = resolve_removal_multi(self.cart, event["weight_delta"], event["colors"])
+            if combos:
+                event["products"] = combos[0]
+
+        log_debug_info(
+            event["weight_delta"],
+            event["colors"],
+            event["confidence"],
+            event["aspect_ratio"],
+            event["area_ratio"],
+            [],
+            product
+        )
+
+        event["product"] = product
+        event["outcome"] = "REMOVE"
+        return event
+
+    # ---------------- STAGE 5 (REMOTE): CART SERVER ----------------
+    def _resolve_remote(self, event):
+        """
+        Sends the weight and vision features to the cart server, which
+        resolves the event against its catalog and cart.
+        """
+
+        remote = self._dependency("remote")
+        result = None
+
+        if remote is not None:
+            result = remote.resolve(event["weight_delta"], _vision_features(event))
+
+        if result is None:
+            log.info("❌ Cart server unavailable")
+            event["outcome"] = "REJECT_MATCH"
+            return event
+
+        event["outcome"] = result["outcome"] or "REJECT_MATCH"
+        event["confidence"] = result.get("confidence", 0.0)
+        event["names"] = result.get("names")
+        event["update"] = result["update"]
+        return event
+
+    def _decide(self, event, candidates):
+        """
+        Decision layer: single match wins, ML breaks ties.
+        """
+
+        if not candidates:
+            return None
+
+        if len(candidates) == 1:
+            return candidates[0]
+
+        features = extract_ml_features(
+            weight=abs(event["weight_delta"]),
+            aspect_ratio=event["aspect_ratio"],
+            area_ratio=event["area_ratio"],
+            dominant_color=event["colors"][0] if event["colors"] else None
+        )
+
+        ml_model = self._dependency("ml_model")
+
+        if ml_model is None:
+            return candidates[0]
+
+        pred_id, confidence = ml_model.predict(features)
+
+        if confidence > ML_CONFIDENCE_THRESHOLD:
+            for c in candidates:
+                if c.id == pred_id:
+                    return c
+
+        return candidates[0]
+
+    # ---------------- STAGE 6: CART COMMIT (UI THREAD) ----------------
+    def _drain_results(self):
+        # A cart recovered from the journal goes in before any new
+        # event; until that can happen without waiting, results stay
+        # queued (the stages block on the full queue, not the UI)
+        ready = self._restore_ready()
+
+        if ready:
+            self.restore_cart()
+
+        while ready:
+            try:
+                event = self.results.get_nowait()
+            except queue.Empty:
+                break
+
+            if event is _STOP:
+                log.info("🔚 Backend pipeline drained")
+                return
+
+            self._commit(event)
+
+        self._drain_updates()
+
+        if self.running:
+            self.ui.after(RESULT_POLL_MS, self._drain_results)
+
+    def _commit_loop(self):
+        """
+        Commit stage for sinks without a UI loop.
+        """
+        while not self._stop.is_set():
+            self._drain_updates()
+
+            try:
+                event = self.results.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            if event is _STOP:
+                return
+
+            self.restore_cart()
+            self._commit(event)
+
+    def _drain_updates(self):
+        """
+        Applies cart updates the server pushed on its own (state on
+        connect, New Cart, other displays of the same cart).
+        """
+
+        remote = self.remote
+
+        if remote is None and self.warmup is not None and "remote" in self.warmup:
+            remote = self.warmup.get("remote")
+
+        if remote is None:
+            return
+
+        while True:
+            try:
+                update = remote.updates.get_nowait()
+            except queue.Empty:
+                break
+
+            self._commit({"outcome": "SYNC", "update": update})
+
+    def _restore_ready(self):
+        """
+        True once restore_cart() can run without waiting for warm-up.
+        """
+
+        if self.warmup is None:
+            return True
+
+        return all(
+            name not in self.warmup or self.warmup.wait(name, timeout=0)
+            for name in ("journal", "product_index")
+        )
+
+    def restore_cart(self):
+        """
+        Replays the journal into the cart (once), before the first
+        commit. Waits for the journal and catalog to warm up: call it
+        on the UI thread only once _restore_ready().
+        """
+
+        journal = self._dependency("journal")
+
+        if journal is None or journal.restored:
+            return journal
+
+        product_index = self._dependency("product_index")
+        journal.restore(self.cart, product_index.products if product_index else {})
+        self.ui.refresh()
+
+        return journal
+
+    def _journal(self, event, outcome, cart_events=()):
+        journal = self.journal
+
+        if journal is None:
+            return
+
+        features = {"weight_delta": event["weight_delta"]}
+        features.update(_vision_features(event))
+
+        journal.record(self.cart, outcome, cart_events, features)
+
+    def _commit_remote(self, event):
+        """
+        Mirrors the server's cart update; the server already applied
+        the event to its own cart.
+        """
+
+        ui = self.ui
+        outcome = event["outcome"]
+
+        if self._mirror is None:
+            self._mirror = CartMirror(self.cart)
+
+        product_index = self._dependency("product_index")
+        self._mirror.apply(event["update"], product_index.products if product_index else {})
+
+        if event.get("frame") is not None:
+            ui.update_frame(event["frame"])
+
+        if outcome != "SYNC":
+            ui.update_event(outcome, event.get("confidence", 0.0), event.get("names"))
+
+        ui.refresh()
+
+        if outcome in ("ADD", "REMOVE"):
+            self.events_committed += 1
+
+    def _commit(self, event):
+        if "update" in event:
+            return self._commit_remote(event)
+
+        ui = self.ui
+        outcome = event["outcome"]
+        confidence = event.get("confidence", 0.0)
+
+        if event.get("frame") is not None:
+            ui.update_frame(event["frame"])
+
+        if outcome in ("REJECT_VISION", "REJECT_MATCH"):
+            ui.update_event(outcome, confidence)
+            ui.refresh()
+            self._journal(event, outcome)
+            return
+
+        if ui.view_mode != "CART":
+            return
+
+        cart_events = []
+
+        if outcome == "ADD":
+            products = event.get("products") or [event["product"]]
+            added = []
+
+            for product in products:
+                cart_event = simulate_event(
+                    event_type="ADD",
+                    product_id=product.id,
+                    weight_delta=(
+                        event["weight_delta"] if len(products) == 1
+                        else product.unit_weight
+                    ),
+                    confidence=confidence
+                )
+
+                handle_event(self.cart, product, cart_event)
+                cart_events.append(cart_event)
+                added.append(product.name)
+
+            event["names"] = " + ".join(added)
+            ui.update_event("ADD", confidence, event["names"])
+
+        else:
+            products = event.get("products") or [event.get("product")]
+            removed = []
+
+            for product in products:
+                cart_event = simulate_event(
+                    event_type="REMOVE",
+                    product_id=product.id if product else None,
+                    weight_delta=(
+                        event["weight_delta"] if len(products) == 1
+                        else -product.unit_weight
+                    ),
+                    confidence=confidence
+                )
+
+                name = handle_event(self.cart, product, cart_event)
+
+                if name:
+                    cart_events.append(cart_event)
+                    removed.append(name)
+
+            if removed:
+                event["names"] = " + ".join(removed)
+                ui.update_event("REMOVE", confidence, event["names"])
+            else:
+                # Nothing in the cart matched after all
+                outcome = event["outcome"] = "REJECT_MATCH"
+                ui.update_event(outcome, confidence)
+
+        ui.refresh()
+        self._journal(event, outcome, cart_events)
+        self.events_committed += 1
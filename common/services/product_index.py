@@ -0,0 +1,105 @@
+"""
+Weight-sorted, per-category product index.
+
+Built once from the products dict. For every category it keeps the
+unit-weight products sorted by weight, with each product's palette
+stored as a color bitmask, so a ±tolerance lookup is a bisect range
+query instead of a full catalog scan.
+
+Products without a unit_weight (priced by weight) are not indexed —
+they can never match a single-item weight event.
+"""
+from bisect import bisect_left, bisect_right
+
+from common.services.vision_mapper import COLOR_BITS, colors_to_mask
+
+
+# Slack on the bisect bounds; the exact `diff <= tolerance` check is
+# applied afterwards so results match the linear scan bit for bit.
+_EPS = 1e-9
+
+
+class ProductIndex:
+
+    def __init__(self, products):
+        self.products = products
+        self.color_bits = dict(COLOR_BITS)
+
+        # category -> (weights, entries); entries are
+        # (weight, order, color_mask, product) sorted by (weight, order)
+        self._categories = {}
+
+        staged = {}
+
+        for order, product in enumerate(products.values()):
+
+            if product.unit_weight is None:
+                continue
+
+            # Palette colors outside the standard set get their own bit
+            mask = colors_to_mask(product.dominant_colors, self.color_bits, grow=True)
+
+            staged.setdefault(product.category, []).append(
+                (product.unit_weight, order, mask, product)
+            )
+
+        for category, entries in staged.items():
+            entries.sort(key=lambda e: (e[0], e[1]))
+            self._categories[category] = ([e[0] for e in entries], entries)
+
+    def __len__(self):
+        return sum(len(w) for w, _ in self._categories.values())
+
+    def color_mask(self, colors):
+        return colors_to_mask(colors, self.color_bits)
+
+    def in_range(self, categories, low, high):
+        """
+        Yields (weight, order, color_mask, product) for indexed products
+        of the given categories with low <= weight <= high.
+        """
+
+        for category in set(categories):
+            index = self._categories.get(category)
+
+            if index is None:
+                continue
+
+            weights, entries = index
+
+            lo = bisect_left(weights, low)
+            hi = bisect_right(weights, high)
+
+            yield from entries[lo:hi]
+
+    def lookup(self, categories, target, tolerance, detected_colors):
+        """
+        Same candidates, in the same order, as the original two-pass scan
+        in resolve_product_by_weight().
+
+        Returns (products, used_fallback)
+        """
+
+        color_mask = self.color_mask(detected_colors)
+
+        in_window = [
+            (abs(weight - target), order, mask, product)
+            for weight, order, mask, product in self.in_range(
+                categories, target - tolerance - _EPS, target + tolerance + _EPS
+            )
+        ]
+
+        in_window = [c for c in in_window if c[0] <= tolerance]
+
+        # -------- PRIMARY: palette overlaps detected colors --------
+        candidates = [c for c in in_window if c[2] & color_mask]
+        used_fallback = False
+
+        # -------- FALLBACK: weight + category only --------
+        if not candidates:
+            candidates = in_window
+            used_fallback = True
+
+        candidates.sort(key=lambda c: (c[0], c[1]))
+
+        return [c[3] for c in candidates], used_fallback
@@ -1,22 +1,11 @@
-import json
-from common.models.product import Product
-
-def load_products(path="data/products.json"):
-    with open(path, "r") as f:
-        data = json.load(f)
-
-    products = {}
-    for p in data:
-        product = Product(
-            id=p["id"],
-            name=p["name"],
-            category=p["category"],
-            unit_weight=p.get("unit_weight"),
-            price_per_unit=p.get("price_per_unit"),
-            price_per_gram=p.get("price_per_gram"),
-            vision_profile=p.get("vision_profile"),
-            shape_profile=p.get("shape_profile")
-        )
-        products[product.id] = product
-
-    return products
+import json
+from common.models.catalog import ProductCatalog
+
+def load_products(path="data/products.json"):
+    """
+    Loads the catalog as a ProductCatalog (usable as {id: Product}).
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+
+    return ProductCatalog.from_records(data)
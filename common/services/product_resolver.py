@@ -1,50 +1,117 @@
-def resolve_product_by_weight(
-    products,
-    candidate_categories,
-    weight_delta,
-    detected_colors,
-    aspect_ratio=None,
-    area_ratio=None
-):
-    target = abs(weight_delta)
-    tolerance = 5
-
-    candidates = []
-
-    # -------- PRIMARY FILTER --------
-    for product in products.values():
-
-        if product.category not in candidate_categories:
-            continue
-
-        if product.unit_weight is None:
-            continue
-
-        palette = product.vision_profile.get("dominant_colors", [])
-
-        if not any(c in palette for c in detected_colors):
-            continue
-
-        diff = abs(product.unit_weight - target)
-
-        if diff <= tolerance:
-            candidates.append((product, diff))
-
-    # -------- FALLBACK --------
-    if not candidates:
-
-        print("⚠️ Color mismatch — fallback")
-
-        for product in products.values():
-
-            if product.category not in candidate_categories:
-                continue
-
-            diff = abs(product.unit_weight - target)
-
-            if diff <= tolerance:
-                candidates.append((product, diff))
-
-    candidates.sort(key=lambda x: x[1])
-
-    return [c[0] for c in candidates]
\ No newline at end of file
+import logging
+
+from common.services.product_index import ProductIndex
+from common.services.weight_combinations import MAX_ITEMS, TIME_BUDGET, find_combinations
+
+
+WEIGHT_TOLERANCE = 5
+
+log = logging.getLogger(__name__)
+
+
+def resolve_product_by_weight(
+    products,
+    candidate_categories,
+    weight_delta,
+    detected_colors,
+    aspect_ratio=None,
+    area_ratio=None
+):
+    """
+    products: ProductIndex (preferred) or the plain products dict.
+    A dict is indexed on every call, so build a ProductIndex once and
+    pass that on the hot path.
+
+    Returns matching products, closest weight first.
+    """
+    index = products if isinstance(products, ProductIndex) else ProductIndex(products)
+
+    target = abs(weight_delta)
+
+    candidates, used_fallback = index.lookup(
+        candidate_categories,
+        target,
+        WEIGHT_TOLERANCE,
+        detected_colors
+    )
+
+    if used_fallback:
+        log.info("⚠️ Color mismatch — fallback")
+
+    return candidates
+
+
+def resolve_products_by_weight_multi(
+    products,
+    candidate_categories,
+    weight_delta,
+    detected_colors,
+    max_items=MAX_ITEMS,
+    time_budget=TIME_BUDGET
+):
+    """
+    Explains an ADD weight as several catalog products put in at once.
+
+    Candidates are the indexed products of the candidate categories
+    whose palette overlaps the detected colors (any palette when none
+    does), lighter than the weight itself.
+
+    Returns combinations (lists of products, repeats allowed), fewest
+    items then closest total weight first. Empty when nothing fits.
+    """
+    index = products if isinstance(products, ProductIndex) else ProductIndex(products)
+
+    target = abs(weight_delta)
+
+    pool = list(index.in_range(candidate_categories, 0, target + WEIGHT_TOLERANCE))
+    color_mask = index.color_mask(detected_colors)
+
+    entries = [e for e in pool if e[2] & color_mask] or pool
+    entries.sort(key=lambda e: (e[0], e[1]))
+
+    combos, complete = find_combinations(
+        [e[0] for e in entries], target, WEIGHT_TOLERANCE,
+        max_items=max_items, time_budget=time_budget
+    )
+
+    if not complete:
+        log.info(f"⚠️ Multi-item search stopped at its {time_budget * 1000:.0f} ms budget")
+
+    return [[entries[i][3] for i in combo] for combo in combos]
+
+
+def resolve_removal_multi(
+    cart,
+    weight_delta,
+    detected_colors=None,
+    max_items=MAX_ITEMS,
+    time_budget=TIME_BUDGET
+):
+    """
+    Explains a REMOVE weight as several unit items taken out of the
+    cart at once (never more of a product than the cart holds).
+
+    With detected colors, lines whose palette overlaps them are tried
+    first; the whole cart otherwise.
+
+    Returns combinations (lists of products), best first.
+    """
+    target = abs(weight_delta)
+
+    lines = cart.unit_lines(target + WEIGHT_TOLERANCE)
+
+    if detected_colors:
+        detected = set(detected_colors)
+        matching = [line for line in lines if detected.intersection(line[1].dominant_colors)]
+        lines = matching or lines
+
+    combos, complete = find_combinations(
+        [weight for weight, _, _ in lines], target, WEIGHT_TOLERANCE,
+        max_items=max_items, counts=[quantity for _, _, quantity in lines],
+        time_budget=time_budget
+    )
+
+    if not complete:
+        log.info(f"⚠️ Multi-item search stopped at its {time_budget * 1000:.0f} ms budget")
+
+    return [[lines[i][1] for i in combo] for combo in combos]
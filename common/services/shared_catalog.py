@@ -0,0 +1,487 @@
+"""
+Shared-memory catalog and KNN model for several cart processes on one
+host.
+
+Every cart process used to parse data/products.json into its own
+Product objects and unpickle its own ml/knn_model.pkl (and import
+sklearn to do it). Here one loader process publishes the catalog's
+numeric columns, the product records and the KNN training matrix into
+a memory-mapped file under SHARED_DIR (/dev/shm on Linux, so RAM
+only). Workers map it read-only: NumPy views straight onto the
+mapping, nothing is copied, and a Product object is only built for a
+product the worker actually touches.
+
+Files:
+    control            8 bytes: current generation (uint64)
+    catalog-<gen>.bin  one published generation, never modified
+
+    [header length: u64][header JSON][arrays, 64-byte aligned]
+
+Publishing writes a complete new generation file, then stores its
+number in `control`. Workers compare that number on every lookup
+(one memory read) and switch to the new file as a whole, so a query
+never mixes two generations. Old files are unlinked once superseded;
+workers still using one keep their mapping until they switch.
+
+    publisher = SharedCatalogPublisher()          # loader process
+    publisher.publish(records, ml_model)
+
+    catalog = SharedCatalog()                     # each worker
+    index = SharedProductIndex(catalog)           # for the resolver
+    model = SharedMLModel(catalog)                # for the tie-break
+"""
+import json
+import mmap
+import os
+import tempfile
+from collections.abc import Mapping
+
+import numpy as np
+
+from common.models.catalog import ProductCatalog
+from common.models.product import Product
+from common.services.product_index import ProductIndex
+from ml.model import FEATURE_NAMES, ProductMLModel
+
+
+SHARED_DIR = (
+    "/dev/shm/smartcart" if os.path.isdir("/dev/shm")
+    else os.path.join(tempfile.gettempdir(), "smartcart")
+)
+KEEP_GENERATIONS = 2     # files kept for workers that are still switching
+ATTACH_RETRIES = 5
+
+_ALIGN = 64
+_COLUMNS = (
+    "unit_weight", "price_per_unit", "price_per_gram",
+    "ar_min", "ar_max", "min_area_ratio", "category_code", "color_mask"
+)
+
+
+def _aligned(n):
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _generation_path(directory, generation):
+    return os.path.join(directory, f"catalog-{generation:06d}.bin")
+
+
+# ---------------- PUBLISHER (LOADER PROCESS) ----------------
+class SharedCatalogPublisher:
+
+    def __init__(self, directory=SHARED_DIR, keep=KEEP_GENERATIONS):
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.keep = keep
+
+        control_path = os.path.join(directory, "control")
+
+        if not os.path.exists(control_path):
+            with open(control_path, "wb") as f:
+                f.write(bytes(8))
+
+        self._control_file = open(control_path, "r+b")
+        self._control_map = mmap.mmap(self._control_file.fileno(), 8)
+        self._control = np.frombuffer(self._control_map, dtype=np.uint64, count=1)
+
+        # Continue numbering after a restarted loader
+        self.generation = int(self._control[0])
+
+    def publish(self, records, ml_model=None):
+        """
+        records: products.json-style dicts
+        ml_model: loaded ProductMLModel (KNN), or None
+
+        Returns the new generation number.
+        """
+
+        catalog = ProductCatalog.from_records(records)
+        generation = self.generation + 1
+
+        arrays = {name: getattr(catalog, name) for name in _COLUMNS}
+
+        # Weight-sorted view (loose products, NaN, sort last)
+        arrays["weight_order"] = np.argsort(catalog.unit_weight, kind="stable")
+        arrays["sorted_weight"] = catalog.unit_weight[arrays["weight_order"]]
+
+        # Product records, parsed one at a time on first use
+        blobs = [
+            json.dumps(r, separators=(",", ":")).encode("utf-8") for r in records
+        ]
+        arrays["record_offsets"] = np.cumsum([0] + [len(b) for b in blobs], dtype=np.int64)
+        arrays["records"] = np.frombuffer(b"".join(blobs), dtype=np.uint8)
+
+        # IDs in catalog order, and sorted for id -> position lookups
+        # without a dict
+        ids = np.array([r["id"].encode("utf-8") for r in records])
+        id_order = np.argsort(ids, kind="stable")
+        arrays["ids"] = ids
+        arrays["sorted_ids"] = ids[id_order]
+        arrays["id_positions"] = id_order
+
+        header = {
+            "generation": generation,
+            "count": len(records),
+            "indexed": int(np.count_nonzero(~np.isnan(catalog.unit_weight))),
+            "categories": catalog.categories,
+            "color_bits": catalog.color_bits,
+            "model": None
+        }
+
+        model = _knn_params(ml_model)
+
+        if model is not None:
+            params, fit_X, fit_y = model
+            header["model"] = params
+            arrays["knn_X"] = fit_X
+            arrays["knn_y"] = fit_y
+
+        self._write(generation, header, arrays)
+
+        # Only now do workers see it
+        self._control[0] = generation
+        self._control_map.flush()
+        self.generation = generation
+
+        self._unlink_old()
+        return generation
+
+    def _write(self, generation, header, arrays):
+        layout = {}
+        offset = 0
+
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            arrays[name] = array
+            layout[name] = [offset, array.dtype.str, list(array.shape)]
+            offset = _aligned(offset + array.nbytes)
+
+        header["arrays"] = layout
+        head = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        start = _aligned(8 + len(head))
+
+        path = _generation_path(self.directory, generation)
+        tmp = path + ".tmp"
+
+        with open(tmp, "wb") as f:
+            f.write(np.uint64(len(head)).tobytes())
+            f.write(head)
+
+            for name, array in arrays.items():
+                f.seek(start + layout[name][0])
+                f.write(array.tobytes())
+
+            f.truncate(max(start + offset, 1))
+
+        os.replace(tmp, path)
+
+    def _unlink_old(self):
+        for name in os.listdir(self.directory):
+            if not (name.startswith("catalog-") and name.endswith(".bin")):
+                continue
+
+            generation = int(name[len("catalog-"):-len(".bin")])
+
+            if generation <= self.generation - self.keep:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass  # still mapped (Windows); next publish retries
+
+    def close(self, remove=False):
+        """
+        remove=True also deletes the published files (workers keep
+        what they have mapped).
+        """
+
+        del self._control
+        self._control_map.close()
+        self._control_file.close()
+
+        if remove:
+            for name in os.listdir(self.directory):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+def _knn_params(ml_model):
+    """
+    (params, fit_X, fit_y) of a loaded KNN ProductMLModel, or None when
+    it cannot be served from shared memory.
+    """
+
+    model = getattr(ml_model, "model", None)
+
+    if model is None or not hasattr(model, "_fit_X"):
+        return None
+
+    weights = getattr(model, "weights", "uniform")
+    metric = getattr(model, "effective_metric_", None)
+    p = getattr(model, "effective_metric_params_", {}).get("p", 2)
+
+    if callable(weights) or getattr(model, "outputs_2d_", False):
+        print("⚠️ KNN model with custom weights is not shared — workers load their own")
+        return None
+
+    if metric == "euclidean":
+        p = 2
+    elif metric == "manhattan":
+        p = 1
+    elif metric != "minkowski":
+        print(f"⚠️ KNN metric {metric!r} is not shared — workers load their own")
+        return None
+
+    params = {
+        "classes": [str(c) for c in model.classes_],
+        "n_neighbors": int(model.n_neighbors),
+        "weights": weights,
+        "p": p,
+        "feature_names": list(ml_model.feature_names)
+    }
+
+    return params, np.asarray(model._fit_X, dtype=np.float64), np.asarray(model._y, dtype=np.int64)
+
+
+# ---------------- WORKERS ----------------
+class _Generation:
+    """
+    One mapped generation file: header + NumPy views, plus the Products
+    built from it so far.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        length = int(np.frombuffer(self._map, dtype=np.uint64, count=1)[0])
+        header = json.loads(self._map[8:8 + length])
+        start = _aligned(8 + length)
+
+        self.generation = header["generation"]
+        self.count = header["count"]
+        self.indexed = header["indexed"]
+        self.categories = header["categories"]
+        self.category_codes = {c: i for i, c in enumerate(self.categories)}
+        self.color_bits = header["color_bits"]
+        self.model = header["model"]
+
+        for name, (offset, dtype, shape) in header["arrays"].items():
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape)) if shape else 1
+            view = np.frombuffer(self._map, dtype=dtype, count=count, offset=start + offset)
+            setattr(self, name, view.reshape(shape))
+
+        self._products = {}
+
+    def product(self, i):
+        product = self._products.get(i)
+
+        if product is None:
+            a, b = self.record_offsets[i], self.record_offsets[i + 1]
+            product = Product.from_record(json.loads(self.records[a:b].tobytes()))
+            self._products[i] = product
+
+        return product
+
+    def position(self, product_id):
+        key = product_id.encode("utf-8")
+        i = int(np.searchsorted(self.sorted_ids, key))
+
+        if i < len(self.sorted_ids) and self.sorted_ids[i] == key:
+            return int(self.id_positions[i])
+
+        return None
+
+
+class SharedCatalog(Mapping):
+    """
+    Worker view of the published catalog. Behaves like the
+    {id: Product} dict the rest of the system uses.
+    """
+
+    def __init__(self, directory=SHARED_DIR):
+        self.directory = directory
+
+        control_path = os.path.join(directory, "control")
+
+        if not os.path.exists(control_path):
+            raise FileNotFoundError(f"no shared catalog published in {directory}")
+
+        with open(control_path, "rb") as f:
+            self._control_map = mmap.mmap(f.fileno(), 8, access=mmap.ACCESS_READ)
+
+        self._control = np.frombuffer(self._control_map, dtype=np.uint64, count=1)
+        self._current = None
+        self.switches = 0
+
+        self.refresh()
+
+        if self._current is None:
+            raise FileNotFoundError(f"no shared catalog published in {directory}")
+
+    def refresh(self):
+        """
+        Switches to the newest generation. Returns True when it changed.
+        """
+
+        for _ in range(ATTACH_RETRIES):
+            generation = int(self._control[0])
+
+            if generation == 0:
+                return False
+
+            if self._current is not None and generation == self._current.generation:
+                return False
+
+            try:
+                state = _Generation(_generation_path(self.directory, generation))
+            except FileNotFoundError:
+                continue  # superseded while we opened it: read control again
+
+            if self._current is not None:
+                self.switches += 1
+
+            self._current = state
+            return True
+
+        return False
+
+    def current(self):
+        """
+        The generation to use for one query (consistent throughout it).
+        """
+
+        if int(self._control[0]) != self._current.generation:
+            self.refresh()
+
+        return self._current
+
+    @property
+    def generation(self):
+        return self._current.generation
+
+    def column(self, name):
+        return getattr(self.current(), name)
+
+    # ---------------- MAPPING ----------------
+    def __getitem__(self, product_id):
+        state = self.current()
+        i = state.position(product_id)
+
+        if i is None:
+            raise KeyError(product_id)
+
+        return state.product(i)
+
+    def __iter__(self):
+        return (i.decode("utf-8") for i in self.current().ids)
+
+    def __len__(self):
+        return self.current().count
+
+    def __contains__(self, product_id):
+        return self.current().position(product_id) is not None
+
+    def values(self):
+        state = self.current()
+        return [state.product(i) for i in range(state.count)]
+
+    def product_at(self, i):
+        return self.current().product(i)
+
+
+class SharedProductIndex(ProductIndex):
+    """
+    ProductIndex over a SharedCatalog: window queries are searchsorted
+    calls on the shared weight column, and only the products inside the
+    window are built. lookup() is inherited unchanged.
+    """
+
+    def __init__(self, catalog):
+        self.products = catalog
+
+    @property
+    def color_bits(self):
+        return self.products.current().color_bits
+
+    def __len__(self):
+        return self.products.current().indexed
+
+    def in_range(self, categories, low, high):
+        state = self.products.current()
+
+        codes = [state.category_codes[c] for c in set(categories) if c in state.category_codes]
+
+        lo = np.searchsorted(state.sorted_weight, low, side="left")
+        hi = np.searchsorted(state.sorted_weight, high, side="right")
+
+        window = state.weight_order[lo:hi]
+        window = window[np.isin(state.category_code[window], codes)]
+
+        for i in window.tolist():
+            product = state.product(i)
+            yield product.unit_weight, i, int(state.color_mask[i]), product
+
+
+class _KNNView:
+    """
+    The parts of a fitted KNeighborsClassifier ProductMLModel uses,
+    over one generation's shared training matrix. Neighbours are found
+    by brute force; equal distances are broken by training row order.
+    """
+
+    outputs_2d_ = False
+
+    def __init__(self, state):
+        params = state.model
+
+        self._fit_X = state.knn_X
+        self._y = state.knn_y
+        self.classes_ = np.array(params["classes"], dtype=object)
+        self.n_neighbors = params["n_neighbors"]
+        self.weights = params["weights"]
+        self.p = params["p"]
+
+    def kneighbors(self, X):
+        k = min(self.n_neighbors, len(self._fit_X))
+
+        diff = np.abs(X[:, None, :] - self._fit_X[None, :, :])
+
+        if self.p == 2:
+            dist = np.sqrt((diff ** 2).sum(axis=2))
+        elif self.p == 1:
+            dist = diff.sum(axis=2)
+        else:
+            dist = (diff ** self.p).sum(axis=2) ** (1.0 / self.p)
+
+        ind = np.argsort(dist, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(dist, ind, axis=1), ind
+
+
+class SharedMLModel(ProductMLModel):
+    """
+    ProductMLModel answering from the shared training matrix. Needs no
+    sklearn or joblib in the worker.
+    """
+
+    def __init__(self, catalog):
+        super().__init__(model_path=None)
+        self.catalog = catalog
+
+        params = catalog.current().model
+
+        if params is None:
+            raise ValueError("no KNN model was published with the catalog")
+
+        self.feature_names = params["feature_names"]
+        order = [FEATURE_NAMES.index(name) for name in self.feature_names]
+        self._column_order = None if order == list(range(len(order))) else order
+
+    def load(self):
+        pass  # nothing to load: the matrix is already mapped
+
+    def _predict_array(self, X, model=None):
+        return super()._predict_array(X, _KNNView(self.catalog.current()))
@@ -1,43 +1,72 @@
-COLOR_TO_CATEGORY = {
-
-    "orange": ["toiletries", "beverages", "snacks"],
-
-    "red": ["toiletries", "snacks"],
-
-    "blue": [
-        "household",
-        "stationery",
-        "toiletries"
-    ],
-
-    "yellow": [
-        "snacks",
-        "groceries",
-        "stationery"
-    ],
-
-    "green": [
-        "groceries",
-        "snacks"
-    ],
-
-    "white": [
-        "dairy",
-        "stationery",
-        "toiletries"
-    ],
-
-    "purple": [
-        "snacks"
-    ],
-
-    "black": [
-        "stationery",
-        "toiletries"
-
-    ]
-}
-
-
-def map_color_to_categories(detected_color):
-    return COLOR_TO_CATEGORY.get(detected_color, [])
\ No newline at end of file
+COLOR_TO_CATEGORY = {
+
+    "orange": ["toiletries", "beverages", "snacks"],
+
+    "red": ["toiletries", "snacks"],
+
+    "blue": [
+        "household",
+        "stationery",
+        "toiletries"
+    ],
+
+    "yellow": [
+        "snacks",
+        "groceries",
+        "stationery"
+    ],
+
+    "green": [
+        "groceries",
+        "snacks"
+    ],
+
+    "white": [
+        "dairy",
+        "stationery",
+        "toiletries"
+    ],
+
+    "purple": [
+        "snacks"
+    ],
+
+    "black": [
+        "stationery",
+        "toiletries"
+
+    ]
+}
+
+
+def map_color_to_categories(detected_color):
+    return COLOR_TO_CATEGORY.get(detected_color, [])
+
+
+# Fixed bit per known color, used for palette bitmasks
+COLOR_BITS = {
+    color: 1 << i for i, color in enumerate(COLOR_TO_CATEGORY)
+}
+
+
+def colors_to_mask(colors, bits=COLOR_BITS, grow=False, max_bits=None):
+    """
+    OR of the bits of the given colors.
+
+    Unknown colors are ignored, or with grow=True given the next free
+    bit in `bits` (a palette color outside the standard set), as long as
+    `bits` holds fewer than max_bits colors.
+    """
+    mask = 0
+
+    for color in colors or ():
+        bit = bits.get(color)
+
+        if bit is None:
+            if not grow or (max_bits is not None and len(bits) >= max_bits):
+                continue
+            bit = bits[color] = 1 << len(bits)
+
+        mask |= bit
+
+    return mask
@@ -0,0 +1,360 @@
+"""
+Vision analysis on a pool of worker processes.
+
+analyze_frame_detailed() (HSV labels, Canny + findContours) spends
+much of its time in Python glue that holds the GIL, so threads cannot
+run two analyses at once. VisionPool runs it in worker processes
+instead. One pool can be shared by several Pipelines (cameras / carts)
+in a process, and each Pipeline keeps several frames in flight.
+
+Frames are not pickled. Each in-flight frame gets a slot: a
+memory-mapped file under VISION_DIR (/dev/shm on Linux) that the
+worker maps too. submit() copies the frame into a free slot and sends
+only (task id, slot, shape, dtype) to the least busy worker, on that
+worker's own queue. The result (plain colors / ratios / bbox) comes
+back as a concurrent.futures.Future.
+
+    pool = VisionPool(workers=2).start()
+    future = pool.submit(frame)
+    vision = future.result()        # same dict as analyze_frame_detailed()
+    pool.close()
+
+submit() blocks while every slot is in use (backpressure). The pool
+records which worker each task went to, so a worker that dies fails
+every task it was given (even one it had not started) and is replaced.
+"""
+import itertools
+import mmap
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+
+
+VISION_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+SLOTS_PER_WORKER = 2
+START_TIMEOUT = 30.0     # s for the workers to import cv2 / NumPy
+RESULT_POLL = 0.2        # s between worker liveness checks
+
+
+# ---------------- WORKER PROCESS ----------------
+def _map_slot(path, size):
+    with open(path, "r+b") as f:
+        return mmap.mmap(f.fileno(), size)
+
+
+def _worker_main(worker_id, directory, tasks, results, quiet):
+    """
+    tasks: this worker's own queue; results: shared by all workers.
+    """
+    import contextlib
+    import io
+
+    import numpy as np
+
+    from common.services.camera_real import analyze_frame_detailed
+
+    maps = {}     # slot -> mmap
+
+    results.put(("ready", worker_id, None, None))
+
+    while True:
+        task = tasks.get()
+
+        if task is None:
+            break
+
+        task_id, slot, shape, dtype = task
+
+        try:
+            nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            buffer = maps.get(slot)
+
+            # The parent grows a slot for a larger frame
+            if buffer is None or len(buffer) < nbytes:
+                if buffer is not None:
+                    buffer.close()
+                buffer = maps[slot] = _map_slot(os.path.join(directory, f"slot-{slot}"), nbytes)
+
+            frame = np.frombuffer(buffer, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+
+            with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+                vision = analyze_frame_detailed(frame)
+
+            # The crop is a view of the parent's own frame
+            vision.pop("crop")
+            del frame
+
+            results.put(("done", worker_id, task_id, vision))
+
+        except Exception as e:
+            results.put(("error", worker_id, task_id, f"{type(e).__name__}: {e}"))
+
+    for buffer in maps.values():
+        buffer.close()
+
+
+# ---------------- POOL ----------------
+class _Slot:
+
+    def __init__(self, path):
+        self.path = path
+        self.size = 0
+        self.map = None
+
+    def write(self, frame):
+        import numpy as np
+
+        if frame.nbytes > self.size:
+            if self.map is not None:
+                self.map.close()
+
+            with open(self.path, "r+b" if self.map is not None else "w+b") as f:
+                f.truncate(frame.nbytes)
+                self.map = mmap.mmap(f.fileno(), frame.nbytes)
+
+            self.size = frame.nbytes
+
+        np.frombuffer(self.map, dtype=frame.dtype, count=frame.size)[:] = frame.reshape(-1)
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+
+class VisionPool:
+
+    def __init__(self, workers=None, slots=None, quiet=False):
+        self.workers = workers or os.cpu_count() or 1
+        self.quiet = quiet
+
+        self._ctx = multiprocessing.get_context("spawn")   # no fork of a threaded process
+        self._directory = tempfile.mkdtemp(prefix="smartcart-vision-", dir=VISION_DIR)
+        self._remove_slots = weakref.finalize(self, shutil.rmtree, self._directory, True)
+        self._slots = [
+            _Slot(os.path.join(self._directory, f"slot-{i}"))
+            for i in range(slots or self.workers * SLOTS_PER_WORKER)
+        ]
+
+        self._free = queue.Queue()
+        for i in range(len(self._slots)):
+            self._free.put(i)
+
+        self._results = self._ctx.Queue()
+        self._processes = {}     # worker id -> (process, task queue)
+        self._assigned = {}      # worker id -> task ids sent to it
+        self._pending = {}       # task id -> (future, slot, frame, worker id)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._worker_ids = itertools.count()
+        self._ready = threading.Event()
+        self._started = set()    # worker ids that got ready
+        self._closed = False
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+
+    def start(self, timeout=START_TIMEOUT):
+        """
+        Starts the workers; returns once all of them have imported the
+        vision code (or timeout passed).
+        """
+
+        for _ in range(self.workers):
+            self._spawn()
+
+        threading.Thread(target=self._result_loop, name="vision-results", daemon=True).start()
+
+        if not self._ready.wait(timeout):
+            print(f"⚠️ Only {len(self._started)}/{self.workers} vision workers started")
+        else:
+            print(f"🧠 {self.workers} vision worker process(es) ready")
+
+        return self
+
+    def _spawn(self):
+        worker_id = next(self._worker_ids)
+
+        tasks = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self._directory, tasks, self._results, self.quiet),
+            name=f"vision-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+
+        with self._lock:
+            self._processes[worker_id] = (process, tasks)
+            self._assigned[worker_id] = set()
+
+    def submit(self, frame, timeout=None):
+        """
+        Queues one BGR frame. Returns a Future of the
+        analyze_frame_detailed() dict (its "crop" a view of `frame`).
+        """
+        import numpy as np
+
+        if self._closed:
+            raise RuntimeError("vision pool is closed")
+
+        try:
+            slot = self._free.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("no free vision slot") from None
+
+        frame = np.ascontiguousarray(frame)
+        self._slots[slot].write(frame)
+
+        task_id = next(self._ids)
+        future = Future()
+        future.set_running_or_notify_cancel()
+
+        with self._lock:
+            if not self._assigned:
+                self._free.put(slot)
+                raise RuntimeError("no vision workers running")
+
+            # Least busy worker; recorded before sending, so a worker
+            # that dies with the task still in its queue fails it too
+            worker_id = min(self._assigned, key=lambda w: len(self._assigned[w]))
+            self._assigned[worker_id].add(task_id)
+            self._pending[task_id] = (future, slot, frame, worker_id)
+            self.submitted += 1
+
+            tasks = self._processes[worker_id][1]
+
+        tasks.put((task_id, slot, frame.shape, frame.dtype.str))
+        return future
+
+    def analyze(self, frame, timeout=None):
+        """
+        Blocking submit(frame).result().
+        """
+        return self.submit(frame, timeout).result(timeout)
+
+    def _finish(self, task_id, vision=None, error=None):
+        with self._lock:
+            entry = self._pending.pop(task_id, None)
+
+            if entry is None:
+                return
+
+            future, slot, frame, worker_id = entry
+            self._assigned.get(worker_id, set()).discard(task_id)
+
+            if error is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+        self._free.put(slot)
+
+        if error is not None:
+            future.set_exception(RuntimeError(error))
+            return
+
+        from common.services.camera_real import center_crop
+
+        vision["crop"] = center_crop(frame)
+        future.set_result(vision)
+
+    def _result_loop(self):
+        next_check = time.monotonic() + RESULT_POLL
+
+        while not self._closed:
+            # On a clock, not only when the queue runs dry: the other
+            # workers' results would otherwise hide a dead one
+            if time.monotonic() >= next_check:
+                self._check_workers()
+                next_check = time.monotonic() + RESULT_POLL
+
+            try:
+                kind, worker_id, task_id, payload = self._results.get(timeout=RESULT_POLL)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+
+            if kind == "ready":
+                self._started.add(worker_id)
+                if len(self._started) >= self.workers:
+                    self._ready.set()
+
+            elif kind == "done":
+                self._finish(task_id, vision=payload)
+
+            elif kind == "error":
+                self._finish(task_id, error=payload)
+
+    def _check_workers(self):
+        for worker_id, (process, _) in list(self._processes.items()):
+            if process.is_alive() or self._closed:
+                continue
+
+            with self._lock:
+                del self._processes[worker_id]
+                lost = self._assigned.pop(worker_id)
+
+            for task_id in lost:
+                self._finish(task_id, error="vision worker died")
+
+            # One that never started would only fail again
+            if worker_id not in self._started:
+                print(f"❌ Vision worker {worker_id} failed to start ({process.exitcode})")
+                continue
+
+            if self._closed:
+                continue
+
+            print(f"⚠️ Vision worker {worker_id} exited ({process.exitcode}) — restarting")
+            self.restarts += 1
+            self._spawn()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": len(self._processes),
+                "in_flight": len(self._pending),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "restarts": self.restarts
+            }
+
+    def close(self, timeout=2.0):
+        if self._closed:
+            return
+
+        self._closed = True
+
+        # The result thread may still be replacing a dead worker
+        with self._lock:
+            processes = list(self._processes.values())
+
+        for _, tasks in processes:
+            tasks.put(None)
+
+        for process, _ in processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+
+        with self._lock:
+            pending = list(self._pending)
+
+        for task_id in pending:
+            self._finish(task_id, error="vision pool closed")
+
+        for slot in self._slots:
+            slot.close()
+
+        self._remove_slots()
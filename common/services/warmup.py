@@ -0,0 +1,149 @@
+"""
+Parallel background warm-up of the cart's dependencies.
+
+Loading the model, the catalog, connecting the weight sensor (the
+Arduino resets for 2 s when the port opens) and getting the first
+camera frame are independent, so each runs on its own thread. Boot
+then takes as long as the slowest one instead of the sum.
+
+    warmup = WarmupManager()
+    warmup.add("ml_model", load_model)
+    warmup.add("camera", open_stream)
+    warmup.start()
+
+    warmup.status()              # {"ml_model": "ready", "camera": "warming"}
+    if warmup.wait("ml_model", timeout=5):
+        model = warmup.get("ml_model")    # None if loading failed
+
+Consumers (the Pipeline) wait only for the dependency they need, so a
+stage can run as soon as its own inputs are ready.
+"""
+import threading
+import time
+
+
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+class _Task:
+
+    def __init__(self, name, fn):
+        self.name = name
+        self.fn = fn
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.elapsed = None
+        self.finished = None
+
+
+class WarmupManager:
+
+    def __init__(self):
+        self._tasks = {}
+        self._started = None
+
+    def add(self, name, fn):
+        """
+        Registers fn() -> dependency under `name`. Call before start().
+        """
+        self._tasks[name] = _Task(name, fn)
+        return self
+
+    def start(self):
+        self._started = time.perf_counter()
+
+        for task in self._tasks.values():
+            threading.Thread(
+                target=self._run, args=(task,), name=f"warmup-{task.name}", daemon=True
+            ).start()
+
+        return self
+
+    def _run(self, task):
+        start = time.perf_counter()
+
+        try:
+            task.value = task.fn()
+        except Exception as e:
+            task.error = e
+            print(f"❌ {task.name} failed to start: {e}")
+
+        task.finished = time.perf_counter()
+        task.elapsed = task.finished - start
+
+        if task.error is None:
+            print(f"✅ {task.name} ready in {task.elapsed:.2f} s")
+
+        task.done.set()
+
+    # ---------------- QUERIES ----------------
+    def __contains__(self, name):
+        return name in self._tasks
+
+    def ready(self, name):
+        task = self._tasks[name]
+        return task.done.is_set() and task.error is None
+
+    def wait(self, name, timeout=None):
+        """
+        Blocks until `name` finished. Returns True when it finished
+        (successfully or not) within `timeout`.
+        """
+        return self._tasks[name].done.wait(timeout)
+
+    def get(self, name):
+        """
+        The loaded dependency, or None while warming or after failure.
+        """
+        task = self._tasks[name]
+        return task.value if task.done.is_set() else None
+
+    def error(self, name):
+        return self._tasks[name].error
+
+    def wait_all(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        for task in self._tasks.values():
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not task.done.wait(remaining):
+                return False
+
+        return True
+
+    def status(self):
+        """
+        {name: "warming" | "ready" | "failed"}
+        """
+        status = {}
+
+        for name, task in self._tasks.items():
+            if not task.done.is_set():
+                status[name] = WARMING
+            else:
+                status[name] = FAILED if task.error is not None else READY
+
+        return status
+
+    @property
+    def all_done(self):
+        return all(task.done.is_set() for task in self._tasks.values())
+
+    def timings(self):
+        """
+        Per-task seconds, plus "wall" (start to last finished task).
+        """
+        timings = {
+            name: task.elapsed
+            for name, task in self._tasks.items()
+            if task.elapsed is not None
+        }
+
+        if self._started is not None and self._tasks and self.all_done:
+            last = max(task.finished for task in self._tasks.values())
+            timings["wall"] = last - self._started
+
+        return timings
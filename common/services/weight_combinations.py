@@ -0,0 +1,121 @@
+"""
+Bounded subset-sum search: which few items add up to a weight?
+
+Shoppers often put two or three items in at once. Given the candidate
+item weights sorted ascending, find_combinations() enumerates small
+multisets (up to `max_items` items, each at most `counts[i]` times)
+whose total lies within ±tolerance of the target.
+
+The search picks items in non-decreasing weight order, which gives
+cheap pruning:
+- with k items still to pick, the next one weighs at most the
+  remaining weight / k (it is the smallest of the k), so the loop stops
+  there;
+- the last item is a bisect range query, not a loop;
+- subtrees that cannot reach the target even with the heaviest item
+  are skipped.
+
+Fewer items are tried first and the search stops at the first item
+count that explains the weight. A hard time budget bounds the worst
+case. When it runs out, the combinations found so far are returned
+with complete=False.
+"""
+import time
+from bisect import bisect_left, bisect_right
+
+
+MAX_ITEMS = 3             # items per event
+MAX_COMBINATIONS = 8      # results kept per search
+TIME_BUDGET = 0.02        # s per search
+CHECK_EVERY = 256         # nodes between clock reads
+
+# Slack on the bisect bounds; the exact tolerance check runs after
+_EPS = 1e-9
+
+
+class _Stop(Exception):
+    pass
+
+
+def find_combinations(
+    weights, target, tolerance, max_items=MAX_ITEMS, counts=None,
+    min_items=2, limit=MAX_COMBINATIONS, time_budget=TIME_BUDGET
+):
+    """
+    weights: item weights, sorted ascending
+    counts: how many of each item are available (None = unlimited)
+
+    Returns (combinations, complete). Each combination is a tuple of
+    indices into `weights` (repeated for several of the same item),
+    fewest items first, then closest total.
+    """
+
+    if not weights or target <= 0:
+        return [], True
+
+    deadline = time.perf_counter() + time_budget
+    heaviest = weights[-1]
+
+    used = [0] * len(weights)
+    chosen = []
+    found = []
+    nodes = [0]
+    timed_out = [False]
+
+    def available(i):
+        return counts is None or used[i] < counts[i]
+
+    def tick():
+        nodes[0] += 1
+        if nodes[0] % CHECK_EVERY == 0 and time.perf_counter() > deadline:
+            timed_out[0] = True
+            raise _Stop
+
+    def search(start, remaining, slots):
+        tick()
+
+        if heaviest * slots < remaining - tolerance:
+            return
+
+        if slots == 1:
+            lo = bisect_left(weights, remaining - tolerance - _EPS, start)
+            hi = bisect_right(weights, remaining + tolerance + _EPS, start)
+
+            for j in range(lo, hi):
+                if available(j) and abs(weights[j] - remaining) <= tolerance:
+                    found.append(tuple(chosen) + (j,))
+                    if len(found) >= limit:
+                        raise _Stop
+            return
+
+        # The next item is the lightest of the `slots` still to pick
+        stop = bisect_right(weights, (remaining + tolerance) / slots + _EPS, start)
+
+        for i in range(start, stop):
+            if not available(i):
+                continue
+
+            used[i] += 1
+            chosen.append(i)
+
+            try:
+                search(i, remaining - weights[i], slots - 1)
+            finally:
+                chosen.pop()
+                used[i] -= 1
+
+    for n in range(max(min_items, 1), max_items + 1):
+        try:
+            search(0, target, n)
+        except _Stop:
+            break
+
+        if found:
+            break
+
+    def miss(combo):
+        return abs(sum(weights[i] for i in combo) - target)
+
+    found.sort(key=lambda combo: (len(combo), miss(combo)))
+
+    return found, not timed_out[0]
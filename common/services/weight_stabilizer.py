@@ -0,0 +1,165 @@
+"""
+Streaming load-cell stabilization detector.
+
+Keeps rolling sums over the last `window` (t, weight) samples, so the
+mean, variance and least-squares slope are updated in O(1) per
+sample. The reading is "stable" once the window is full and both the
+variance and the slope are below their thresholds.
+
+Typical use:
+    detector = StabilizationDetector()
+    stable, weight, elapsed = detector.wait(weight_provider.read_sample)
+
+Offline (synthetic traces, simulation checks):
+    t_stable = StabilizationDetector().run(trace)
+"""
+import time
+from collections import deque
+
+
+WINDOW = 8                 # samples (0.2 s at 40 Hz)
+VARIANCE_THRESHOLD = 1.0   # g²
+SLOPE_THRESHOLD = 5.0      # g / s
+TIMEOUT = 1.5              # s, the old fixed wait is now the upper bound
+
+
+class StabilizationDetector:
+
+    def __init__(
+        self, window=WINDOW, variance_threshold=VARIANCE_THRESHOLD,
+        slope_threshold=SLOPE_THRESHOLD, timeout=TIMEOUT
+    ):
+        self.window = window
+        self.variance_threshold = variance_threshold
+        self.slope_threshold = slope_threshold
+        self.timeout = timeout
+        self.reset()
+
+    def reset(self):
+        self._samples = deque()
+        self._t0 = None
+
+        # Rolling sums (t relative to the first sample for precision)
+        self._sx = 0.0
+        self._sy = 0.0
+        self._sxx = 0.0
+        self._sxy = 0.0
+        self._syy = 0.0
+
+    # ---------------- STREAMING UPDATE ----------------
+    def update(self, t, weight):
+        """
+        Adds one sample; returns True when the reading is stable.
+        """
+
+        if self._t0 is None:
+            self._t0 = t
+
+        x = t - self._t0
+        y = float(weight)
+
+        self._samples.append((x, y))
+        self._sx += x
+        self._sy += y
+        self._sxx += x * x
+        self._sxy += x * y
+        self._syy += y * y
+
+        if len(self._samples) > self.window:
+            ox, oy = self._samples.popleft()
+            self._sx -= ox
+            self._sy -= oy
+            self._sxx -= ox * ox
+            self._sxy -= ox * oy
+            self._syy -= oy * oy
+
+        return self.is_stable()
+
+    @property
+    def count(self):
+        return len(self._samples)
+
+    @property
+    def mean(self):
+        n = len(self._samples)
+        return self._sy / n if n else None
+
+    @property
+    def variance(self):
+        n = len(self._samples)
+        if n < 2:
+            return None
+        mean = self._sy / n
+        return max(self._syy / n - mean * mean, 0.0)
+
+    @property
+    def slope(self):
+        n = len(self._samples)
+        if n < 2:
+            return None
+        denom = n * self._sxx - self._sx * self._sx
+        if denom <= 0:
+            return None
+        return (n * self._sxy - self._sx * self._sy) / denom
+
+    def is_stable(self):
+        if len(self._samples) < self.window:
+            return False
+
+        variance = self.variance
+        slope = self.slope
+
+        return (
+            variance is not None and slope is not None
+            and variance <= self.variance_threshold
+            and abs(slope) <= self.slope_threshold
+        )
+
+    # ---------------- DRIVERS ----------------
+    def run(self, samples):
+        """
+        Feeds an iterable of (t, weight) samples.
+        Returns the timestamp of the first stable sample, or None.
+        Samples later than `timeout` after the first one are ignored.
+        """
+
+        self.reset()
+        start = None
+
+        for t, weight in samples:
+            if start is None:
+                start = t
+            if t - start > self.timeout:
+                return None
+            if self.update(t, weight):
+                return t
+
+        return None
+
+    def wait(self, read_sample, timeout=None, clock=time.monotonic):
+        """
+        Pulls samples from read_sample() until stable or timeout.
+
+        read_sample: returns (t, weight) or None when no sample is ready.
+        Returns (stable, mean_weight, elapsed_seconds)
+        """
+
+        timeout = self.timeout if timeout is None else timeout
+
+        self.reset()
+        start = clock()
+
+        while True:
+            elapsed = clock() - start
+
+            if elapsed >= timeout:
+                return False, self.mean, elapsed
+
+            sample = read_sample()
+
+            if sample is None:
+                time.sleep(0.005)
+                continue
+
+            if self.update(*sample):
+                return True, self.mean, clock() - start
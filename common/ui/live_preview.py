@@ -0,0 +1,122 @@
+"""
+Live camera preview for the cart screen.
+
+Frames come from any thread (the camera stream's capture thread, the
+pipeline) through submit(), which only swaps a reference under a
+lock. The Tk thread picks up the newest frame at most `fps` times a
+second and pastes it into one PhotoImage that is created once and
+reused, so no Tk image is allocated per frame.
+
+Frames that arrive faster than the display rate replace the one still
+waiting: the preview always shows the freshest frame, never a backlog.
+
+    preview = PreviewChannel(fps=15)
+    stream = CameraStream(on_frame=preview.submit).start()
+    preview.attach(label)          # on the Tk thread
+"""
+import threading
+import time
+
+
+PREVIEW_SIZE = (320, 240)
+PREVIEW_FPS = 15
+
+
+class PreviewChannel:
+
+    def __init__(self, size=PREVIEW_SIZE, fps=PREVIEW_FPS):
+        self.size = size
+        self.interval_ms = max(1, round(1000 / fps))
+
+        self._lock = threading.Lock()
+        self._pending = None
+        self._hold_until = 0.0
+
+        self.label = None
+        self._photo = None
+        self._after_id = None
+
+        self.submitted = 0
+        self.shown = 0
+        self.dropped = 0
+
+    # ---------------- ANY THREAD ----------------
+    def submit(self, frame, hold=0.0):
+        """
+        Offers a BGR frame for display. Never blocks on Tk.
+
+        hold: keep this frame on screen for `hold` seconds; live frames
+        submitted meanwhile are dropped (used for the event capture).
+        """
+
+        now = time.monotonic()
+
+        with self._lock:
+            self.submitted += 1
+
+            if not hold and now < self._hold_until:
+                self.dropped += 1
+                return
+
+            if self._pending is not None:
+                self.dropped += 1
+
+            self._pending = frame
+
+            if hold:
+                self._hold_until = now + hold
+
+    def stats(self):
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "shown": self.shown,
+                "dropped": self.dropped
+            }
+
+    # ---------------- TK THREAD ----------------
+    def attach(self, label):
+        """
+        Starts showing frames in `label` (a tk.Label).
+        """
+        self.detach()
+        self.label = label
+        self._photo = None
+        self._after_id = label.after(self.interval_ms, self._tick)
+
+    def detach(self):
+        if self.label is not None and self._after_id is not None:
+            try:
+                self.label.after_cancel(self._after_id)
+            except Exception:
+                pass  # widget already destroyed
+
+        self._after_id = None
+        self.label = None
+
+    def _tick(self):
+        with self._lock:
+            frame, self._pending = self._pending, None
+
+        if frame is not None:
+            self._show(frame)
+
+        self._after_id = self.label.after(self.interval_ms, self._tick)
+
+    def _show(self, frame):
+        import cv2
+        from PIL import Image, ImageTk
+
+        frame = cv2.resize(frame, self.size)
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        image = Image.fromarray(frame)
+
+        if self._photo is None:
+            self._photo = ImageTk.PhotoImage(image)
+            self.label.configure(image=self._photo)
+        else:
+            # Same size every time: update the pixels in place
+            self._photo.paste(image)
+
+        with self._lock:
+            self.shown += 1
@@ -1,549 +1,665 @@
-"""
-Smart Cart – On-Cart UI Screen (FINAL, CORRECT VERSION)
-=====================================================
-
-Features:
-- Cart item list (authoritative from backend Cart)
-- Last action display (ADD / REMOVE / REJECT)
-- Confidence display
-- Camera frame display (backend-owned camera)
-- Final bill screen at demo end
-
-ARCHITECTURE GUARANTEES:
-- UI makes NO decisions
-- UI does NOT open the camera
-- UI only displays data pushed from backend
-"""
-import qrcode
-import random
-
-import tkinter as tk
-from tkinter import ttk
-import cv2
-from PIL import Image, ImageTk
-
-# ---------------- UI CONFIG ----------------
-BG_COLOR = "#0f172a"
-FG_COLOR = "#e5e7eb"
-ACCENT = "#22c55e"
-WARN = "#f59e0b"
-ERROR = "#ef4444"
-
-FONT_L = ("Segoe UI", 20, "bold")
-FONT_M = ("Segoe UI", 14)
-FONT_S = ("Segoe UI", 11)
-
-
-class SmartCartUI(tk.Tk):
-    def __init__(self, cart, on_shutdown=None):
-        super().__init__()
-        self.cart = cart
-        self.on_shutdown = on_shutdown
-
-        # ---------- Treeview styling ----------
-        style = ttk.Style(self)
-        style.theme_use("default")
-
-        style.configure(
-            "Treeview",
-            background="#020617",
-            foreground=FG_COLOR,
-            rowheight=32,
-            fieldbackground="#020617",
-            borderwidth=0,
-            font=FONT_S
-        )
-
-        style.configure(
-            "Treeview.Heading",
-            background="#020617",
-            foreground=ACCENT,
-            font=("Segoe UI", 11, "bold")
-        )
-
-        style.map(
-            "Treeview",
-            background=[("selected", "#1e293b")]
-        )
-
-        self.view_mode = "CART"
-        self.payment_qr_generated = False
-        self.payment_success = False
-        self.current_txn_id = None
-
-        self.title("Smart Cart Display")
-        self.geometry("1100x600")
-        self.configure(bg=BG_COLOR)
-        self.resizable(False, False)
-
-        self._build_layout()
-        self.refresh()
-
-    def _build_layout(self):
-        # Root grid config
-        self.grid_rowconfigure(1, weight=1)
-        self.grid_columnconfigure(0, weight=1)
-
-        # ---------- HEADER (row 0) ----------
-        header = tk.Frame(self, bg="#020617")
-        header.grid(row=0, column=0, sticky="ew", padx=20, pady=10)
-
-        tk.Label(
-            header,
-            text="🛒 SMART CART",
-            font=FONT_L,
-            fg=ACCENT,
-            bg="#020617"
-        ).pack(side="left")
-
-        self.status_label = tk.Label(
-            header,
-            text="SYSTEM READY",
-            font=FONT_S,
-            fg=FG_COLOR,
-            bg="#020617"
-        )
-        self.status_label.pack(side="right")
-
-        # ---------- BODY (row 1 – expandable) ----------
-        body = tk.Frame(self, bg=BG_COLOR)
-        body.grid(row=1, column=0, sticky="nsew", padx=20)
-
-        # LEFT: Cart table
-        left = tk.Frame(body, bg=BG_COLOR)
-        left.pack(side="left", fill="both", expand=True)
-
-        columns = ("name", "qty_wt", "price")
-        self.tree = ttk.Treeview(left, columns=columns, show="headings", height=12)
-
-        self.tree.heading("name", text="Item")
-        self.tree.heading("qty_wt", text="Qty / Weight")
-        self.tree.heading("price", text="Subtotal (₹)")
-
-        self.tree.column("name", width=260)
-        self.tree.column("qty_wt", width=150, anchor="center")
-        self.tree.column("price", width=150, anchor="e")
-
-        self.tree.pack(fill="both", expand=True)
-
-        # RIGHT: Status panel
-        right = tk.Frame(body, bg="#020617")
-        right.pack(side="right", fill="y", padx=15)
-
-        self.cam_label = tk.Label(right, bg="black", width=320, height=240)
-        self.cam_label.pack(pady=(12, 8))
-
-        self.action_label = tk.Label(
-            right,
-            text="Last Action: -",
-            font=("Segoe UI", 15, "bold"),
-            fg=ACCENT,
-            bg="#020617"
-        )
-        self.action_label.pack(anchor="w", padx=10, pady=(8, 4))
-
-        self.conf_label = tk.Label(
-            right,
-            text="Confidence: -",
-            font=FONT_S,
-            fg=FG_COLOR,
-            bg="#020617"
-        )
-        self.conf_label.pack(anchor="w", padx=10)
-
-        # ---------- FOOTER (row 2 – FIXED) ----------
-        self.footer = tk.Frame(self, bg="#020617")
-        self.footer.grid(row=2, column=0, sticky="ew", padx=20, pady=10)
-
-        self.checkout_btn = tk.Button(
-            self.footer,
-            text="Proceed to Bill",
-            font=FONT_M,
-            bg=ACCENT,
-            fg="black",
-            padx=16,
-            pady=6,
-            command=self.show_final_bill
-        )
-        self.checkout_btn.pack(side="left")
-
-        self.total_label = tk.Label(
-            self.footer,
-            text="TOTAL: ₹0.00",
-            font=FONT_L,
-            fg=ACCENT,
-            bg="#020617"
-        )
-        self.total_label.pack(side="right")
-
-        
-    def show_cart_view(self):
-        """
-        Restore the main cart UI view.
-        Cart data is preserved.
-        """
-        self.view_mode = "CART"
-
-        for widget in self.winfo_children():
-            widget.destroy()
-
-        self._build_layout()
-        self.refresh()
-
-        
-      
-    # ---------------- BACKEND → UI HOOKS ----------------
-    def update_event(self, action, confidence=None, product_name=None):
-
-        if action == "ADD" and product_name:
-            text, color = f"Added {product_name}", ACCENT
-
-        elif action == "REMOVE" and product_name:
-            text, color = f"Removed {product_name}", WARN
-
-        elif action == "REJECT_VISION":
-            text, color = "Rejected (vision unreliable)", ERROR
-
-        elif action == "REJECT_MATCH":
-            text, color = "Rejected (no product match)", ERROR
-
-        elif action == "REJECT":
-            text, color = "Rejected", ERROR
-
-        else:
-            text, color = action, FG_COLOR
-
-        self.action_label.config(text=f"Last Action: {text}", fg=color)
-
-        if confidence is not None:
-            self.conf_label.config(text=f"Confidence: {confidence:.2f}")
-        else:
-            self.conf_label.config(text="Confidence: -")            
-
-    def update_frame(self, frame):
-        if frame is None:
-            return
-
-        frame = cv2.resize(frame, (320, 240))
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img = ImageTk.PhotoImage(Image.fromarray(frame))
-        self.cam_label.configure(image=img)
-        self.cam_label.image = img
-
-    def refresh(self):
-        if self.view_mode != "CART":
-            return
-        self.tree.delete(*self.tree.get_children())
-
-        if not self.cart.items:
-            self.status_label.config(text="Cart empty", fg=WARN)
-            self.tree.insert("", "end", values=("— No items in cart —", "", ""))
-        else:
-            self.status_label.config(text="Cart updated", fg=ACCENT)
-
-            for item in self.cart.items.values():
-                qty = (
-                    f"{item.quantity} unit(s)"
-                    if item.product.price_per_unit is not None
-                    else f"{item.weight} g"
-                )
-                self.tree.insert(
-                    "",
-                    "end",
-                    values=(item.product.name, qty, f"₹{item.subtotal:.2f}")
-                )
-
-        self.total_label.config(text=f"TOTAL: ₹{self.cart.total():.2f}")
-
-
-    # ---------------- FINAL BILL SCREEN ----------------
-    def show_final_bill(self):
-        self.view_mode = "BILL"
-
-        # Clear existing UI
-        for widget in self.winfo_children():
-            widget.destroy()
-
-        # Container for centering content
-        container = tk.Frame(self, bg=BG_COLOR)
-        container.pack(expand=True)
-
-        # Title
-        tk.Label(
-            container,
-            text="FINAL BILL",
-            font=FONT_L,
-            fg=ACCENT,
-            bg=BG_COLOR
-        ).pack(pady=(10, 20))
-
-        # Items
-        items_frame = tk.Frame(container, bg=BG_COLOR)
-        items_frame.pack(pady=10)
-
-        for item in self.cart.items.values():
-            if item.product.price_per_unit is not None:
-                line = f"{item.product.name:<20}  x{item.quantity:<2}   ₹{item.subtotal:.2f}"
-            else:
-                line = f"{item.product.name:<20}  {item.weight}g   ₹{item.subtotal:.2f}"
-
-            tk.Label(
-                items_frame,
-                text=line,
-                font=FONT_M,
-                fg=FG_COLOR,
-                bg=BG_COLOR,
-                anchor="w"
-            ).pack(anchor="w", padx=20)
-
-        # Divider
-        tk.Label(
-            container,
-            text="—" * 30,
-            fg=FG_COLOR,
-            bg=BG_COLOR
-        ).pack(pady=10)
-
-        # Total
-        tk.Label(
-            container,
-            text=f"TOTAL: ₹{self.cart.total():.2f}",
-            font=FONT_L,
-            fg=ACCENT,
-            bg=BG_COLOR
-        ).pack(pady=15)
-
-        # Closing note
-        tk.Label(
-            container,
-            text="Thank you for using Smart Cart",
-            font=FONT_S,
-            fg=FG_COLOR,
-            bg=BG_COLOR
-        ).pack(pady=(5, 15))
-
-        # End button
-        btns = tk.Frame(container, bg=BG_COLOR)
-        btns.pack(pady=10)
-
-        tk.Button(
-            btns,
-            text="Back to Cart",
-            font=FONT_M,
-            command=self.show_cart_view,
-            width=12
-        ).pack(side="left", padx=10)
-
-        tk.Button(
-            btns,
-            text="Pay Now",
-            font=FONT_M,
-            bg=ACCENT,
-            fg="black",
-            command=self.show_payment_view,
-            width=10
-        ).pack(side="right", padx=10)
-
-    def show_payment_view(self):
-        self.view_mode = "PAYMENT"
-        self.payment_qr_generated = True
-        self.payment_success = False
-
-        # Generate transaction ID
-        self.current_txn_id = f"TXN-{random.randint(100000, 999999)}"
-
-        for widget in self.winfo_children():
-            widget.destroy()
-
-        container = tk.Frame(self, bg=BG_COLOR)
-        container.pack(expand=True)
-
-        tk.Label(
-            container,
-            text="PAYMENT",
-            font=FONT_L,
-            fg=ACCENT,
-            bg=BG_COLOR
-        ).pack(pady=(10, 15))
-
-        tk.Label(
-            container,
-            text=f"Amount to Pay: ₹{self.cart.total():.2f}",
-            font=FONT_M,
-            fg=FG_COLOR,
-            bg=BG_COLOR
-        ).pack(pady=5)
-
-        # ---- Generate QR ----
-        qr_data = f"SMARTCART|{self.current_txn_id}|AMT:{self.cart.total():.2f}"
-        qr = qrcode.make(qr_data)
-        qr = qr.resize((200, 200))
-
-        self.qr_img = ImageTk.PhotoImage(qr)
-
-        qr_label = tk.Label(container, image=self.qr_img, bg=BG_COLOR)
-        qr_label.pack(pady=15)
-
-        tk.Label(
-            container,
-            text=f"Transaction ID: {self.current_txn_id}",
-            font=FONT_S,
-            fg="#38bdf8",
-            bg=BG_COLOR
-        ).pack(pady=5)
-
-        tk.Label(
-            container,
-            text="Scan & Pay using UPI\n(Demo QR – Payment Simulation)",
-            font=FONT_S,
-            fg="#38bdf8",
-            bg=BG_COLOR
-        ).pack(pady=10)
-
-        self.payment_status_label = tk.Label(
-            container,
-            text="Status: Waiting for payment",
-            font=FONT_M,
-            fg=WARN,
-            bg=BG_COLOR
-        )
-        self.payment_status_label.pack(pady=10)
-
-        btns = tk.Frame(container, bg=BG_COLOR)
-        btns.pack(pady=15)
-
-        tk.Button(
-            btns,
-            text="Confirm Payment (Demo)",
-            font=FONT_M,
-            bg=ACCENT,
-            fg="black",
-            command=self.confirm_payment,
-            width=18
-        ).pack(side="left", padx=10)
-
-        tk.Button(
-            btns,
-            text="Cancel",
-            font=FONT_M,
-            command=self.show_cart_view,
-            width=10
-        ).pack(side="right", padx=10)
-        tk.Button(
-            container,
-            text="Proceed to Exit Gate",
-            font=FONT_M,
-            bg="#38bdf8",      # INFO blue
-            fg="black",
-            padx=16,
-            pady=6,
-            command=self.show_exit_verification
-        ).pack(pady=(10, 0))
-
-    def confirm_payment(self):
-        self.payment_success = True
-
-        self.payment_status_label.config(
-            text="✅ Payment Successful",
-            fg=ACCENT
-        
-        )
-        # Immediate transition (no delay, no race conditions)
-        self.show_exit_verification()
-    def show_exit_verification(self):
-        self.view_mode = "EXIT"
-
-        for widget in self.winfo_children():
-            widget.destroy()
-
-        container = tk.Frame(self, bg=BG_COLOR)
-        container.pack(expand=True)
-
-        tk.Label(
-            container,
-            text="EXIT GATE VERIFICATION",
-            font=FONT_L,
-            fg=ACCENT,
-            bg=BG_COLOR
-        ).pack(pady=(10, 20))
-
-        if self.payment_success:
-            tk.Label(
-                container,
-                text=f"Payment VERIFIED\nTransaction: {self.current_txn_id}",
-                font=FONT_M,
-                fg=FG_COLOR,
-                bg=BG_COLOR
-            ).pack(pady=10)
-
-            status = tk.Label(
-                container,
-                text="🟢 Gate Open\nPlease proceed",
-                font=FONT_M,
-                fg=ACCENT,
-                bg=BG_COLOR
-            )
-            status.pack(pady=20)
-
-        else:
-            tk.Label(
-                container,
-                text="⚠️ PAYMENT NOT VERIFIED\nUnpaid items detected",
-                font=FONT_M,
-                fg=ERROR,
-                bg=BG_COLOR
-            ).pack(pady=15)
-
-            tk.Label(
-                container,
-                text="🔒 Gate Locked",
-                font=FONT_M,
-                fg=ERROR,
-                bg=BG_COLOR
-            ).pack(pady=10)
-
-        btns = tk.Frame(container, bg=BG_COLOR)
-        btns.pack(pady=25)
-
-        if not self.payment_success:
-            tk.Button(
-                btns,
-                text="Go to Payment",
-                font=FONT_M,
-                command=self.show_payment_view,
-                width=14
-            ).pack(side="left", padx=10)
-
-        tk.Button(
-            btns,
-            text="New Cart",
-            font=FONT_M,
-            command=self.start_new_cart,
-            width=12
-        ).pack(side="left", padx=10)
-
-        tk.Button(
-            btns,
-            text="End Demo",
-            font=FONT_M,
-            command=self.end_demo,
-            width=10
-        ).pack(side="right", padx=10)
-    def start_new_cart(self):
-        """
-        Starts a fresh shopping session.
-        """
-        self.cart.reset()
-
-        # Reset payment state
-        self.payment_qr_generated = False
-        self.payment_success = False
-        self.current_txn_id = None
-
-        self.show_cart_view()
-    def end_demo(self):
-        if self.on_shutdown:
-            self.on_shutdown()
-        self.destroy()
-
+"""
+Smart Cart – On-Cart UI Screen (FINAL, CORRECT VERSION)
+=====================================================
+
+Features:
+- Cart item list (authoritative from backend Cart)
+- Last action display (ADD / REMOVE / REJECT)
+- Confidence display
+- Camera frame display (backend-owned camera): live preview, with the
+  event capture held on screen for a moment
+- Final bill screen at demo end
+
+ARCHITECTURE GUARANTEES:
+- UI makes NO decisions
+- UI does NOT open the camera
+- UI only displays data pushed from backend
+
+cv2, PIL and qrcode are imported on first use (first camera frame,
+payment screen) so the window can appear before they load.
+"""
+import random
+
+import tkinter as tk
+from tkinter import ttk
+
+from common.ui.live_preview import PreviewChannel
+
+# ---------------- UI CONFIG ----------------
+BG_COLOR = "#0f172a"
+FG_COLOR = "#e5e7eb"
+ACCENT = "#22c55e"
+WARN = "#f59e0b"
+ERROR = "#ef4444"
+
+FONT_L = ("Segoe UI", 20, "bold")
+FONT_M = ("Segoe UI", 14)
+FONT_S = ("Segoe UI", 11)
+
+EMPTY_ROW = "__empty__"   # Treeview iid of the "No items" placeholder
+EVENT_FRAME_HOLD = 1.5    # s the event capture stays over the live preview
+
+
+class SmartCartUI(tk.Tk):
+    def __init__(self, cart, on_shutdown=None, preview=None, on_new_cart=None):
+        super().__init__()
+        self.cart = cart
+        self.on_shutdown = on_shutdown
+        self.on_new_cart = on_new_cart
+        self.preview = preview if preview is not None else PreviewChannel()
+
+        # ---------- Treeview styling ----------
+        style = ttk.Style(self)
+        style.theme_use("default")
+
+        style.configure(
+            "Treeview",
+            background="#020617",
+            foreground=FG_COLOR,
+            rowheight=32,
+            fieldbackground="#020617",
+            borderwidth=0,
+            font=FONT_S
+        )
+
+        style.configure(
+            "Treeview.Heading",
+            background="#020617",
+            foreground=ACCENT,
+            font=("Segoe UI", 11, "bold")
+        )
+
+        style.map(
+            "Treeview",
+            background=[("selected", "#1e293b")]
+        )
+
+        self.view_mode = "CART"
+        self.payment_qr_generated = False
+        self.payment_success = False
+        self.current_txn_id = None
+
+        self.title("Smart Cart Display")
+        self.geometry("1100x600")
+        self.configure(bg=BG_COLOR)
+        self.resizable(False, False)
+
+        # Every screen is built once and stacked in the same grid cell;
+        # switching views raises one and refreshes its dynamic parts.
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.screens = {}
+
+        for mode, build in (
+            ("CART", self._build_layout),
+            ("BILL", self._build_bill_screen),
+            ("PAYMENT", self._build_payment_screen),
+            ("EXIT", self._build_exit_screen),
+        ):
+            screen = tk.Frame(self, bg=BG_COLOR)
+            screen.grid(row=0, column=0, sticky="nsew")
+            build(screen)
+            self.screens[mode] = screen
+
+        self._show_screen("CART")
+        self.refresh()
+
+        self.preview.attach(self.cam_label)
+
+    def _show_screen(self, mode):
+        self.view_mode = mode
+        self.screens[mode].tkraise()
+
+    # ---------------- CART SCREEN ----------------
+    def _build_layout(self, screen):
+        screen.grid_rowconfigure(1, weight=1)
+        screen.grid_columnconfigure(0, weight=1)
+
+        # ---------- HEADER (row 0) ----------
+        header = tk.Frame(screen, bg="#020617")
+        header.grid(row=0, column=0, sticky="ew", padx=20, pady=10)
+
+        tk.Label(
+            header,
+            text="🛒 SMART CART",
+            font=FONT_L,
+            fg=ACCENT,
+            bg="#020617"
+        ).pack(side="left")
+
+        self.status_label = tk.Label(
+            header,
+            text="SYSTEM READY",
+            font=FONT_S,
+            fg=FG_COLOR,
+            bg="#020617"
+        )
+        self.status_label.pack(side="right")
+
+        self.warmup_label = tk.Label(
+            header,
+            text="",
+            font=FONT_S,
+            fg=FG_COLOR,
+            bg="#020617"
+        )
+        self.warmup_label.pack(side="right", padx=20)
+
+        # ---------- BODY (row 1 – expandable) ----------
+        body = tk.Frame(screen, bg=BG_COLOR)
+        body.grid(row=1, column=0, sticky="nsew", padx=20)
+
+        # LEFT: Cart table
+        left = tk.Frame(body, bg=BG_COLOR)
+        left.pack(side="left", fill="both", expand=True)
+
+        columns = ("name", "qty_wt", "price")
+        self.tree = ttk.Treeview(left, columns=columns, show="headings", height=12)
+
+        self.tree.heading("name", text="Item")
+        self.tree.heading("qty_wt", text="Qty / Weight")
+        self.tree.heading("price", text="Subtotal (₹)")
+
+        self.tree.column("name", width=260)
+        self.tree.column("qty_wt", width=150, anchor="center")
+        self.tree.column("price", width=150, anchor="e")
+
+        self.tree.pack(fill="both", expand=True)
+        self._rendered_version = None
+
+        # RIGHT: Status panel
+        right = tk.Frame(body, bg="#020617")
+        right.pack(side="right", fill="y", padx=15)
+
+        self.cam_label = tk.Label(right, bg="black", width=320, height=240)
+        self.cam_label.pack(pady=(12, 8))
+
+        self.action_label = tk.Label(
+            right,
+            text="Last Action: -",
+            font=("Segoe UI", 15, "bold"),
+            fg=ACCENT,
+            bg="#020617"
+        )
+        self.action_label.pack(anchor="w", padx=10, pady=(8, 4))
+
+        self.conf_label = tk.Label(
+            right,
+            text="Confidence: -",
+            font=FONT_S,
+            fg=FG_COLOR,
+            bg="#020617"
+        )
+        self.conf_label.pack(anchor="w", padx=10)
+
+        # ---------- FOOTER (row 2 – FIXED) ----------
+        self.footer = tk.Frame(screen, bg="#020617")
+        self.footer.grid(row=2, column=0, sticky="ew", padx=20, pady=10)
+
+        self.checkout_btn = tk.Button(
+            self.footer,
+            text="Proceed to Bill",
+            font=FONT_M,
+            bg=ACCENT,
+            fg="black",
+            padx=16,
+            pady=6,
+            command=self.show_final_bill
+        )
+        self.checkout_btn.pack(side="left")
+
+        self.total_label = tk.Label(
+            self.footer,
+            text="TOTAL: ₹0.00",
+            font=FONT_L,
+            fg=ACCENT,
+            bg="#020617"
+        )
+        self.total_label.pack(side="right")
+
+        
+    def show_cart_view(self):
+        """
+        Restore the main cart UI view.
+        Cart data is preserved.
+        """
+        self._show_screen("CART")
+        self.refresh()
+
+    # ---------------- BACKEND → UI HOOKS ----------------
+    def update_event(self, action, confidence=None, product_name=None):
+
+        if action == "ADD" and product_name:
+            text, color = f"Added {product_name}", ACCENT
+
+        elif action == "REMOVE" and product_name:
+            text, color = f"Removed {product_name}", WARN
+
+        elif action == "REJECT_VISION":
+            text, color = "Rejected (vision unreliable)", ERROR
+
+        elif action == "REJECT_MATCH":
+            text, color = "Rejected (no product match)", ERROR
+
+        elif action == "REJECT":
+            text, color = "Rejected", ERROR
+
+        else:
+            text, color = action, FG_COLOR
+
+        self.action_label.config(text=f"Last Action: {text}", fg=color)
+
+        if confidence is not None:
+            self.conf_label.config(text=f"Confidence: {confidence:.2f}")
+        else:
+            self.conf_label.config(text="Confidence: -")            
+
+    def update_warmup(self, status):
+        """
+        status: {dependency name: "warming" | "ready" | "failed"},
+        as returned by WarmupManager.status().
+        """
+
+        failed = [name for name, state in status.items() if state == "failed"]
+        warming = [name for name, state in status.items() if state == "warming"]
+
+        if failed:
+            text, color = f"Unavailable: {', '.join(failed)}", ERROR
+        elif warming:
+            text, color = f"Warming up: {', '.join(warming)}…", WARN
+        else:
+            text, color = "", FG_COLOR
+
+        self.warmup_label.config(text=text, fg=color)
+
+    def update_frame(self, frame):
+        """
+        Shows the frame an event was decided on. Safe from any thread;
+        the preview paints it on its next tick.
+        """
+        if frame is None:
+            return
+
+        self.preview.submit(frame, hold=EVENT_FRAME_HOLD)
+
+    def refresh(self):
+        """
+        Syncs the cart table with the cart.
+
+        Rows use the product ID as their Treeview iid, so only the lines
+        the cart reports as changed since the last refresh are inserted,
+        updated or deleted. Falls back to a full redraw when the cart
+        cannot say what changed (first draw, after reset()).
+        """
+        if self.view_mode != "CART":
+            return
+
+        changed = None
+        if self._rendered_version is not None:
+            changed = self.cart.changes_since(self._rendered_version)
+
+        if changed is None:
+            self.tree.delete(*self.tree.get_children())
+            changed = self.cart.items.keys()
+
+        added = set()
+
+        for product_id in changed:
+            iid = str(product_id)
+            item = self.cart.items.get(product_id)
+
+            if item is None:
+                if self.tree.exists(iid):
+                    self.tree.delete(iid)
+            elif self.tree.exists(iid):
+                self.tree.item(iid, values=self._row_values(item))
+            else:
+                added.add(product_id)
+
+        # New lines sit at the end of the cart, so walk it backwards
+        # only until all of them were seen, then append in cart order.
+        if added:
+            new_ids = []
+
+            for product_id in reversed(self.cart.items):
+                if product_id in added:
+                    new_ids.append(product_id)
+                    if len(new_ids) == len(added):
+                        break
+
+            for product_id in reversed(new_ids):
+                item = self.cart.items[product_id]
+                self.tree.insert("", "end", iid=str(product_id), values=self._row_values(item))
+
+        self._rendered_version = self.cart.version
+
+        if not self.cart.items:
+            self.status_label.config(text="Cart empty", fg=WARN)
+            if not self.tree.exists(EMPTY_ROW):
+                self.tree.insert("", "end", iid=EMPTY_ROW, values=("— No items in cart —", "", ""))
+        else:
+            self.status_label.config(text="Cart updated", fg=ACCENT)
+            if self.tree.exists(EMPTY_ROW):
+                self.tree.delete(EMPTY_ROW)
+
+        self.total_label.config(text=f"TOTAL: ₹{self.cart.total():.2f}")
+
+    @staticmethod
+    def _row_values(item):
+        qty = (
+            f"{item.quantity} unit(s)"
+            if item.product.price_per_unit is not None
+            else f"{item.weight} g"
+        )
+        return (item.product.name, qty, f"₹{item.subtotal:.2f}")
+
+    # ---------------- FINAL BILL SCREEN ----------------
+    def _build_bill_screen(self, screen):
+        # Container for centering content
+        container = tk.Frame(screen, bg=BG_COLOR)
+        container.pack(expand=True)
+
+        # Title
+        tk.Label(
+            container,
+            text="FINAL BILL",
+            font=FONT_L,
+            fg=ACCENT,
+            bg=BG_COLOR
+        ).pack(pady=(10, 20))
+
+        # Items (one label, text refreshed on entry)
+        self.bill_items_label = tk.Label(
+            container,
+            text="",
+            font=FONT_M,
+            fg=FG_COLOR,
+            bg=BG_COLOR,
+            justify="left",
+            anchor="w"
+        )
+        self.bill_items_label.pack(pady=10, padx=20)
+
+        # Divider
+        tk.Label(
+            container,
+            text="—" * 30,
+            fg=FG_COLOR,
+            bg=BG_COLOR
+        ).pack(pady=10)
+
+        # Total
+        self.bill_total_label = tk.Label(
+            container,
+            text="",
+            font=FONT_L,
+            fg=ACCENT,
+            bg=BG_COLOR
+        )
+        self.bill_total_label.pack(pady=15)
+
+        # Closing note
+        tk.Label(
+            container,
+            text="Thank you for using Smart Cart",
+            font=FONT_S,
+            fg=FG_COLOR,
+            bg=BG_COLOR
+        ).pack(pady=(5, 15))
+
+        # End button
+        btns = tk.Frame(container, bg=BG_COLOR)
+        btns.pack(pady=10)
+
+        tk.Button(
+            btns,
+            text="Back to Cart",
+            font=FONT_M,
+            command=self.show_cart_view,
+            width=12
+        ).pack(side="left", padx=10)
+
+        tk.Button(
+            btns,
+            text="Pay Now",
+            font=FONT_M,
+            bg=ACCENT,
+            fg="black",
+            command=self.show_payment_view,
+            width=10
+        ).pack(side="right", padx=10)
+
+    def show_final_bill(self):
+        lines = []
+
+        for item in self.cart.items.values():
+            if item.product.price_per_unit is not None:
+                lines.append(f"{item.product.name:<20}  x{item.quantity:<2}   ₹{item.subtotal:.2f}")
+            else:
+                lines.append(f"{item.product.name:<20}  {item.weight}g   ₹{item.subtotal:.2f}")
+
+        self.bill_items_label.config(text="\n".join(lines))
+        self.bill_total_label.config(text=f"TOTAL: ₹{self.cart.total():.2f}")
+
+        self._show_screen("BILL")
+
+    # ---------------- PAYMENT SCREEN ----------------
+    def _build_payment_screen(self, screen):
+        container = tk.Frame(screen, bg=BG_COLOR)
+        container.pack(expand=True)
+
+        tk.Label(
+            container,
+            text="PAYMENT",
+            font=FONT_L,
+            fg=ACCENT,
+            bg=BG_COLOR
+        ).pack(pady=(10, 15))
+
+        self.amount_label = tk.Label(
+            container,
+            text="",
+            font=FONT_M,
+            fg=FG_COLOR,
+            bg=BG_COLOR
+        )
+        self.amount_label.pack(pady=5)
+
+        self.qr_label = tk.Label(container, bg=BG_COLOR)
+        self.qr_label.pack(pady=15)
+
+        self.txn_label = tk.Label(
+            container,
+            text="",
+            font=FONT_S,
+            fg="#38bdf8",
+            bg=BG_COLOR
+        )
+        self.txn_label.pack(pady=5)
+
+        tk.Label(
+            container,
+            text="Scan & Pay using UPI\n(Demo QR – Payment Simulation)",
+            font=FONT_S,
+            fg="#38bdf8",
+            bg=BG_COLOR
+        ).pack(pady=10)
+
+        self.payment_status_label = tk.Label(
+            container,
+            text="Status: Waiting for payment",
+            font=FONT_M,
+            fg=WARN,
+            bg=BG_COLOR
+        )
+        self.payment_status_label.pack(pady=10)
+
+        btns = tk.Frame(container, bg=BG_COLOR)
+        btns.pack(pady=15)
+
+        tk.Button(
+            btns,
+            text="Confirm Payment (Demo)",
+            font=FONT_M,
+            bg=ACCENT,
+            fg="black",
+            command=self.confirm_payment,
+            width=18
+        ).pack(side="left", padx=10)
+
+        tk.Button(
+            btns,
+            text="Cancel",
+            font=FONT_M,
+            command=self.show_cart_view,
+            width=10
+        ).pack(side="right", padx=10)
+        tk.Button(
+            container,
+            text="Proceed to Exit Gate",
+            font=FONT_M,
+            bg="#38bdf8",      # INFO blue
+            fg="black",
+            padx=16,
+            pady=6,
+            command=self.show_exit_verification
+        ).pack(pady=(10, 0))
+
+    def show_payment_view(self):
+        self.payment_qr_generated = True
+        self.payment_success = False
+
+        # Generate transaction ID
+        self.current_txn_id = f"TXN-{random.randint(100000, 999999)}"
+
+        total = self.cart.total()
+
+        self.amount_label.config(text=f"Amount to Pay: ₹{total:.2f}")
+        self.txn_label.config(text=f"Transaction ID: {self.current_txn_id}")
+        self.payment_status_label.config(text="Status: Waiting for payment", fg=WARN)
+
+        # ---- Generate QR ----
+        import qrcode
+        from PIL import ImageTk
+
+        qr_data = f"SMARTCART|{self.current_txn_id}|AMT:{total:.2f}"
+        qr = qrcode.make(qr_data)
+        qr = qr.resize((200, 200))
+
+        self.qr_img = ImageTk.PhotoImage(qr)
+        self.qr_label.config(image=self.qr_img)
+
+        self._show_screen("PAYMENT")
+
+    def confirm_payment(self):
+        self.payment_success = True
+
+        self.payment_status_label.config(
+            text="✅ Payment Successful",
+            fg=ACCENT
+        
+        )
+        # Immediate transition (no delay, no race conditions)
+        self.show_exit_verification()
+
+    # ---------------- EXIT GATE SCREEN ----------------
+    def _build_exit_screen(self, screen):
+        container = tk.Frame(screen, bg=BG_COLOR)
+        container.pack(expand=True)
+
+        tk.Label(
+            container,
+            text="EXIT GATE VERIFICATION",
+            font=FONT_L,
+            fg=ACCENT,
+            bg=BG_COLOR
+        ).pack(pady=(10, 20))
+
+        self.exit_detail_label = tk.Label(
+            container,
+            text="",
+            font=FONT_M,
+            bg=BG_COLOR
+        )
+        self.exit_detail_label.pack(pady=10)
+
+        self.gate_label = tk.Label(
+            container,
+            text="",
+            font=FONT_M,
+            bg=BG_COLOR
+        )
+        self.gate_label.pack(pady=20)
+
+        btns = tk.Frame(container, bg=BG_COLOR)
+        btns.pack(pady=25)
+
+        # Only shown while the payment is not verified
+        self.goto_payment_btn = tk.Button(
+            btns,
+            text="Go to Payment",
+            font=FONT_M,
+            command=self.show_payment_view,
+            width=14
+        )
+
+        self.new_cart_btn = tk.Button(
+            btns,
+            text="New Cart",
+            font=FONT_M,
+            command=self.start_new_cart,
+            width=12
+        )
+        self.new_cart_btn.pack(side="left", padx=10)
+
+        tk.Button(
+            btns,
+            text="End Demo",
+            font=FONT_M,
+            command=self.end_demo,
+            width=10
+        ).pack(side="right", padx=10)
+
+    def show_exit_verification(self):
+        if self.payment_success:
+            self.exit_detail_label.config(
+                text=f"Payment VERIFIED\nTransaction: {self.current_txn_id}",
+                fg=FG_COLOR
+            )
+            self.gate_label.config(text="🟢 Gate Open\nPlease proceed", fg=ACCENT)
+            self.goto_payment_btn.pack_forget()
+
+        else:
+            self.exit_detail_label.config(
+                text="⚠️ PAYMENT NOT VERIFIED\nUnpaid items detected",
+                fg=ERROR
+            )
+            self.gate_label.config(text="🔒 Gate Locked", fg=ERROR)
+            self.goto_payment_btn.pack(side="left", padx=10, before=self.new_cart_btn)
+
+        self._show_screen("EXIT")
+
+    def start_new_cart(self):
+        """
+        Starts a fresh shopping session.
+        """
+        self.cart.reset()
+
+        if self.on_new_cart:
+            self.on_new_cart()
+
+        # Reset payment state
+        self.payment_qr_generated = False
+        self.payment_success = False
+        self.current_txn_id = None
+
+        self.show_cart_view()
+
+    def end_demo(self):
+        if self.on_shutdown:
+            self.on_shutdown()
+        self.preview.detach()
+        self.destroy()
+
        
\ No newline at end of file
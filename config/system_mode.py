@@ -1,2 +1,2 @@
-SYSTEM_MODE = "simulation"
+SYSTEM_MODE = "simulation"
 #  SYSTEM_MODE = "hardware"
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Pseudo-terminal stand-in for the Arduino running firmware/hx711_reader.
+
+Opens a pty pair and writes firmware-style lines to it, so the serial
+WeightProvider can be exercised without hardware (Linux / macOS only):
+
+    arduino = FakeArduino()
+    provider = WeightProvider(port=arduino.port, reset_delay=0)
+    arduino.send_add(125)
+    ...
+    arduino.close()
+
+Interactive:
+    python -m inputs.hardware.fake_arduino
+prints the port to use, then sends every weight typed (125, -120).
+"""
+import os
+import tty
+
+
+class FakeArduino:
+
+    def __init__(self, banner=True):
+        self._master, self._slave = os.openpty()
+
+        # Raw mode: no echo, no newline translation
+        tty.setraw(self._slave)
+
+        self.port = os.ttyname(self._slave)
+
+        if banner:
+            self.send("Smart Cart Weight Sensor Ready")
+
+    def send(self, line):
+        os.write(self._master, f"{line}\r\n".encode())
+
+    def send_add(self, grams):
+        self.send(f"ADD:{round(grams)}")
+
+    def send_remove(self, grams):
+        self.send(f"REMOVE:{round(abs(grams))}")
+
+    def send_weight(self, delta):
+        if delta >= 0:
+            self.send_add(delta)
+        else:
+            self.send_remove(delta)
+
+    def close(self):
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    arduino = FakeArduino()
+    print(f"Fake Arduino on {arduino.port}")
+
+    try:
+        while True:
+            val = input("Weight change (e.g. 125, -120) or 'q': ").strip()
+            if val.lower() == "q":
+                break
+            try:
+                arduino.send_weight(float(val))
+            except ValueError:
+                arduino.send(val)
+    finally:
+        arduino.close()
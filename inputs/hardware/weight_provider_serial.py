@@ -1,48 +1,171 @@
-import serial
-import time
-
-
-class WeightProvider:
-
-    def __init__(self, port="COM7", baudrate=9600):
-
-        print(f"🔌 Connecting to weight sensor on {port}...")
-
-        self.ser = serial.Serial(port, baudrate, timeout=1)
-
-        # Allow Arduino to reset after serial connection
-        time.sleep(2)
-
-        print("✅ Hardware weight provider active")
-
-    def get_next_weight(self):
-
-        while True:
-
-            try:
-                line = self.ser.readline().decode(errors="ignore").strip()
-
-                if not line:
-                    return None
-
-                if not line:
-                    continue
-
-                # Ignore startup messages
-                if "Ready" in line:
-                    continue
-
-                # Debug print
-                print(f"📡 Serial received: {line}")
-
-                if line.startswith("ADD:"):
-                    weight = float(line.split(":")[1])
-                    return weight
-
-                if line.startswith("REMOVE:"):
-                    weight = float(line.split(":")[1])
-                    return -weight
-
-            except Exception as e:
-                print(f"⚠️ Serial read error: {e}")
-                continue
\ No newline at end of file
+import queue
+import threading
+import time
+
+import serial
+
+
+READ_TIMEOUT = 0.2      # s, serial readline timeout on the reader thread
+QUEUE_SIZE = 32         # parsed events kept before the oldest is dropped
+RESET_DELAY = 2.0       # s, Arduino resets when the port opens
+
+
+def parse_line(line):
+    """
+    Parses one firmware line.
+
+    Returns:
+    weight delta (float, negative for REMOVE), or None for lines that
+    carry no event (startup banner, blank lines).
+
+    Raises ValueError for ADD:/REMOVE: lines with a bad number, and
+    for any other unrecognised line.
+    """
+
+    if not line or "Ready" in line:
+        return None
+
+    if line.startswith("ADD:"):
+        return float(line.split(":", 1)[1])
+
+    if line.startswith("REMOVE:"):
+        return -float(line.split(":", 1)[1])
+
+    raise ValueError(f"Unrecognised line: {line!r}")
+
+
+class WeightProvider:
+    """
+    Hardware weight provider.
+
+    A background thread owns the serial port, parses ADD:/REMOVE: lines
+    from firmware/hx711_reader and puts (timestamp, weight_delta) pairs
+    on a bounded queue. get_next_weight() and poll() never block.
+
+    Counters:
+    lines_read, events_parsed, parse_errors, dropped_events
+    """
+
+    def __init__(
+        self, port="COM7", baudrate=9600,
+        reset_delay=RESET_DELAY, queue_size=QUEUE_SIZE
+    ):
+
+        print(f"🔌 Connecting to weight sensor on {port}...")
+
+        self.ser = serial.Serial(port, baudrate, timeout=READ_TIMEOUT)
+
+        # Allow Arduino to reset after serial connection
+        time.sleep(reset_delay)
+
+        self._events = queue.Queue(queue_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self.lines_read = 0
+        self.events_parsed = 0
+        self.parse_errors = 0
+        self.dropped_events = 0
+
+        self._thread = threading.Thread(
+            target=self._reader_loop, name="serial-reader", daemon=True
+        )
+        self._thread.start()
+
+        print("✅ Hardware weight provider active")
+
+    # ---------------- READER THREAD ----------------
+    def _reader_loop(self):
+
+        while not self._stop.is_set():
+
+            try:
+                raw = self.ser.readline()
+            except (serial.SerialException, OSError, TypeError) as e:
+                if self._stop.is_set():
+                    break
+                print(f"⚠️ Serial read error: {e}")
+                self._stop.wait(0.5)
+                continue
+
+            if not raw:
+                continue
+
+            ts = time.monotonic()
+            line = raw.decode(errors="ignore").strip()
+
+            with self._lock:
+                self.lines_read += 1
+
+            try:
+                weight = parse_line(line)
+            except ValueError:
+                print(f"⚠️ Could not parse serial line: {line!r}")
+                with self._lock:
+                    self.parse_errors += 1
+                continue
+
+            if weight is None:
+                continue
+
+            # Debug print
+            print(f"📡 Serial received: {line}")
+
+            self._push((ts, weight))
+
+    def _push(self, item):
+        while True:
+            try:
+                self._events.put_nowait(item)
+                break
+            except queue.Full:
+                # Consumer fell behind: drop the oldest event
+                try:
+                    self._events.get_nowait()
+                    with self._lock:
+                        self.dropped_events += 1
+                except queue.Empty:
+                    pass
+
+        with self._lock:
+            self.events_parsed += 1
+
+    # ---------------- CONSUMER API ----------------
+    def get_next_weight(self):
+        """
+        Next weight delta, or None when nothing arrived (non-blocking).
+        """
+        try:
+            _, weight = self._events.get_nowait()
+            return weight
+        except queue.Empty:
+            return None
+
+    def poll(self):
+        """
+        Drains every pending event as a list of (timestamp, weight_delta),
+        timestamps from time.monotonic() when the line was read.
+        """
+
+        events = []
+
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def stats(self):
+        with self._lock:
+            return {
+                "lines_read": self.lines_read,
+                "events_parsed": self.events_parsed,
+                "parse_errors": self.parse_errors,
+                "dropped_events": self.dropped_events,
+                "pending": self._events.qsize()
+            }
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(READ_TIMEOUT * 5)
+        self.ser.close()
@@ -1,56 +1,168 @@
-class WeightProvider:
-    """
-    Simulation weight provider.
-
-    Supports:
-    - Live keyboard input (default)
-    - Optional scripted demo weights
-    """
-
-    def __init__(self, demo_weights=None):
-        self.demo_weights = demo_weights
-        self.index = 0
-
-    def get_next_weight(self):
-        """
-        Returns next weight delta.
-        Positive -> ADD
-        Negative -> REMOVE
-        """
-
-        # -------- KEYBOARD MODE (default) --------
-        if self.demo_weights is None:
-            return self._get_weight_from_keyboard()
-
-        # -------- SCRIPTED DEMO MODE --------
-        if self.index >= len(self.demo_weights):
-            raise StopIteration("No more simulated weight inputs")
-
-        weight = self.demo_weights[self.index]
-        self.index += 1
-        return weight
-
-    def _get_weight_from_keyboard(self):
-        """
-        Manual weight entry for simulation.
-        """
-
-        while True:
-            try:
-                val = input(
-                    "Enter weight change (e.g. 125, -120) or 'q' to quit: "
-                ).strip()
-
-                if val.lower() == "q":
-                    raise StopIteration("User ended input")
-
-                weight = float(val)
-
-                if weight == 0:
-                    print("⚠️ Weight cannot be zero")
-                    continue
-
-                return weight
-
-            except ValueError:
+import math
+import random
+import time
+
+
+SAMPLE_RATE = 40        # Hz, raw load-cell readings
+SETTLE_TAU = 0.12       # s, decay of the drop transient
+SETTLE_FREQ = 4.0       # Hz, platform wobble
+NOISE_STD = 0.4         # g
+
+
+def synthetic_settle_trace(
+    start_load, weight_delta, duration=2.0, rate=SAMPLE_RATE,
+    tau=SETTLE_TAU, freq=SETTLE_FREQ, noise=NOISE_STD, seed=None
+):
+    """
+    Raw load-cell readings for one item drop / pickup.
+
+    A damped oscillation from start_load to start_load + weight_delta
+    plus Gaussian noise. Returns [(t, load_grams), ...] with t in
+    seconds from the start of the event.
+    """
+
+    rng = random.Random(seed)
+    samples = []
+
+    for i in range(int(duration * rate)):
+        t = i / rate
+        settle = 1 - math.exp(-t / tau) * math.cos(2 * math.pi * freq * t)
+        load = start_load + weight_delta * settle + rng.gauss(0, noise)
+        samples.append((t, load))
+
+    return samples
+
+
+class SampleTrace:
+    """
+    One event's raw readings, replayed on the time.monotonic() clock
+    from the moment the event was read.
+    """
+
+    def __init__(self, samples, settled_load, realtime=True):
+        self.samples = samples
+        self.settled_load = settled_load
+        self.realtime = realtime
+        self.start = time.monotonic()
+        self.pos = 0
+
+    def read_sample(self):
+        """
+        Next reading as (t, grams). In realtime mode samples are only
+        released once their timestamp has passed; returns None when no
+        sample is ready. After the trace ends, keeps reporting the
+        settled load.
+        """
+
+        if self.pos >= len(self.samples):
+            t = time.monotonic()
+            if self.pos > 0:
+                t = max(t, self.start + self.samples[-1][0])
+            return t, self.settled_load
+
+        offset, load = self.samples[self.pos]
+        t = self.start + offset
+
+        if self.realtime and t > time.monotonic():
+            return None
+
+        self.pos += 1
+        return t, load
+
+
+class WeightProvider:
+    """
+    Simulation weight provider.
+
+    Supports:
+    - Live keyboard input (default)
+    - Optional scripted demo weights
+    - Raw sample stream for the stabilization detector, generated from
+      synthetic_settle_trace() or given per event in `demo_traces`.
+      sample_source() returns the stream of the event just read, so a
+      caller that reads events ahead still stabilizes each one on its
+      own samples.
+    """
+
+    def __init__(self, demo_weights=None, demo_traces=None, realtime=True):
+        self.demo_weights = demo_weights
+        self.demo_traces = demo_traces
+        self.realtime = realtime
+        self.index = 0
+
+        self.load = 0.0
+        self._trace = None
+
+    def get_next_weight(self):
+        """
+        Returns next weight delta.
+        Positive -> ADD
+        Negative -> REMOVE
+        """
+
+        # -------- KEYBOARD MODE (default) --------
+        if self.demo_weights is None:
+            weight = self._get_weight_from_keyboard()
+            self._start_trace(weight)
+            return weight
+
+        # -------- SCRIPTED DEMO MODE --------
+        if self.index >= len(self.demo_weights):
+            raise StopIteration("No more simulated weight inputs")
+
+        weight = self.demo_weights[self.index]
+        self._start_trace(weight, self.index)
+        self.index += 1
+        return weight
+
+    # ---------------- RAW SAMPLES ----------------
+    def _start_trace(self, weight, index=None):
+        if self.demo_traces is not None and index is not None:
+            trace = self.demo_traces[index]
+        else:
+            trace = synthetic_settle_trace(self.load, weight)
+
+        self.load += weight
+        self._trace = SampleTrace(trace, self.load, self.realtime)
+
+    def sample_source(self):
+        """
+        SampleTrace of the event get_next_weight() returned last (None
+        before the first event).
+        """
+        return self._trace
+
+    def read_sample(self):
+        """
+        Next raw reading of the latest event (see SampleTrace), or None.
+        """
+
+        if self._trace is None:
+            return None
+
+        return self._trace.read_sample()
+
+    def _get_weight_from_keyboard(self):
+        """
+        Manual weight entry for simulation.
+        """
+
+        while True:
+            try:
+                val = input(
+                    "Enter weight change (e.g. 125, -120) or 'q' to quit: "
+                ).strip()
+
+                if val.lower() == "q":
+                    raise StopIteration("User ended input")
+
+                weight = float(val)
+
+                if weight == 0:
+                    print("⚠️ Weight cannot be zero")
+                    continue
+
+                return weight
+
+            except ValueError:
                 print("❌ Invalid input. Enter a number like 125 or -125.")
\ No newline at end of file
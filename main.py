@@ -1,285 +1,437 @@
-import time
-from ml.utils import extract_ml_features
-from ml.model import ProductMLModel
-from config.system_mode import SYSTEM_MODE
-
-from common.models.cart import Cart
-from inputs.simulation.simulator import simulate_event
-
-from common.services.event_handler import handle_event
-from common.services.product_loader import load_products
-from common.services.camera_real import capture_and_detect
-from common.services.product_resolver import resolve_product_by_weight
-from common.services.vision_mapper import map_color_to_categories
-
-from common.ui.smart_cart_ui import SmartCartUI
-
-
-# ---------------- WEIGHT PROVIDER SELECTION ----------------
-if SYSTEM_MODE == "simulation":
-    from inputs.simulation.weight_provider_sim import WeightProvider
-else:
-    from inputs.hardware.weight_provider_serial import WeightProvider
-
-
-ml_model = ProductMLModel()
-ml_model.load()
-# ---------------- DEBUG PRINTER ----------------
-def print_debug_info(
-    weight_delta,
-    detected_colors,
-    vision_conf,
-    aspect_ratio,
-    area_ratio,
-    candidate_categories,
-    product=None
-):
-
-    print("\n==============================")
-    print(" SMART CART EVENT PIPELINE")
-    print("==============================")
-
-    print(f"Weight delta: {weight_delta} g")
-    print(f"Detected colors: {detected_colors}")
-
-    if aspect_ratio:
-        print(f"Aspect ratio: {aspect_ratio:.2f}")
-
-    if area_ratio:
-        print(f"Area ratio: {area_ratio:.3f}")
-
-    print(f"Candidate categories: {candidate_categories}")
-
-    if product:
-        diff = abs(product.unit_weight - abs(weight_delta))
-
-        print("\nResolver result:")
-        print(f"Matched product: {product.name}")
-        print(f"Expected weight: {product.unit_weight} g")
-        print(f"Weight difference: {diff} g")
-
-    else:
-        print("\nResolver result: ❌ NO MATCH")
-
-    print("==============================\n")
-
-
-# ---------------- STABILIZATION ----------------
-def wait_for_weight_stabilization():
-    """
-    Simulates load cell stabilization time.
-    In real system: checks variance of readings.
-    """
-    print("⏳ Waiting for weight to stabilize...")
-    time.sleep(1.5)
-
-
-# ---------------- LOAD SYSTEM ----------------
-products = load_products()
-cart = Cart()
-
-# Initialize weight provider depending on mode
-if SYSTEM_MODE == "hardware":
-    weight_provider = WeightProvider(port="COM7")
-else:
-    weight_provider = WeightProvider()
-
-
-running = True
-print(f"Weight provider initialized for {SYSTEM_MODE} mode")
-
-def shutdown_backend():
-    """
-    Called by UI (End Demo / Exit Gate success).
-    """
-    global running
-    running = False
-    print("🛑 Shutdown signal received from UI")
-
-
-ui = SmartCartUI(cart, on_shutdown=shutdown_backend)
-
-
-# ---------------- PIPELINE STEP ----------------
-def pipeline_step():
-    global running
-
-    if not running:
-        print("🔚 Backend shutdown complete")
-        return
-
-    print("\n🔔 Waiting for next cart event...")
-
-    try:
-
-        if not running:
-            return
-
-        # 1️⃣ Weight trigger
-        weight_delta = weight_provider.get_next_weight()
-
-        if weight_delta is None:
-            ui.after(200, pipeline_step)
-            return
-
-    except StopIteration:
-        print("🔚 Weight input ended")
-        return
-
-    # 2️⃣ Noise filter
-    if abs(weight_delta) < 5:
-        print("⚠️ Noise ignored")
-        ui.after(150, pipeline_step)
-        return
-
-    # 3️⃣ Stabilization
-    wait_for_weight_stabilization()
-
-    # 4️⃣ Event type
-    event_type = "ADD" if weight_delta > 0 else "REMOVE"
-
-    # 5️⃣ Camera capture
-    detected_colors, vision_conf, aspect_ratio, area_ratio, frame = capture_and_detect()
-    ui.update_frame(frame)
-
-    # 6️⃣ Vision reject
-    if not detected_colors:
-        print("❌ Vision failed to detect color")
-        ui.update_event("REJECT_VISION", vision_conf)
-        ui.refresh()
-        ui.after(200, pipeline_step)
-        return
-
-    if vision_conf < 0.15:
-        print(f"⚠️ Low vision confidence ({vision_conf:.2f}) — continuing for demo")
-
-    # 7️⃣ Color → category mapping
-    candidate_categories = []
-
-    for color in detected_colors:
-        candidate_categories.extend(map_color_to_categories(color))
-
-    candidate_categories = list(set(candidate_categories))
-
-    print(f"Colors {detected_colors} mapped to categories: {candidate_categories}")
-
-    if not candidate_categories:
-        print("❌ No matching category")
-        ui.update_event("REJECT_MATCH", vision_conf)
-        ui.refresh()
-        ui.after(200, pipeline_step)
-        return
-
-    # ---------------- ADD FLOW ----------------
-    if event_type == "ADD":
-
-        candidates = resolve_product_by_weight(
-            products,
-            candidate_categories,
-            weight_delta,
-            detected_colors,
-            aspect_ratio,
-            area_ratio
-        )
-
-        # -------- DECISION LAYER --------
-
-        if not candidates:
-            product = None
-
-        elif len(candidates) == 1:
-            product = candidates[0]
-
-        else:
-            features = extract_ml_features(
-                weight=abs(weight_delta),
-                aspect_ratio=aspect_ratio,
-                area_ratio=area_ratio,
-                dominant_color=detected_colors[0] if detected_colors else None
-            )
-
-            pred_id, confidence = ml_model.predict(features)
-
-            if confidence > 0.7:
-                for c in candidates:
-                    if c.id == pred_id:
-                        product = c
-                        break
-                else:
-                    product = candidates[0]
-            else:
-                product = candidates[0]
-        print("Candidates:", [c.id for c in candidates])
-        print_debug_info(
-            weight_delta,
-            detected_colors,
-            vision_conf,
-            aspect_ratio,
-            area_ratio,
-            candidate_categories,
-            product
-        )
-
-        if not product:
-            print("⚠️ No product matched for detected category + weight")
-            ui.update_event("REJECT_MATCH", vision_conf)
-            ui.refresh()
-            ui.after(200, pipeline_step)
-            return
-
-        if ui.view_mode != "CART":
-            ui.after(200, pipeline_step)
-            return
-
-        event = simulate_event(
-            event_type="ADD",
-            product_id=product.id,
-            weight_delta=weight_delta,
-            confidence=vision_conf
-        )
-
-        handle_event(cart, product, event)
-
-        ui.update_event("ADD", vision_conf, product.name)
-        ui.refresh()
-
-    # ---------------- REMOVE FLOW ----------------
-    else:
-
-        print_debug_info(
-            weight_delta,
-            detected_colors,
-            vision_conf,
-            aspect_ratio,
-            area_ratio,
-            candidate_categories,
-            None
-        )
-
-        if ui.view_mode != "CART":
-            ui.after(200, pipeline_step)
-            return
-
-        event = simulate_event(
-            event_type="REMOVE",
-            product_id=None,
-            weight_delta=weight_delta,
-            confidence=vision_conf
-        )
-
-        handle_event(cart, None, event)
-
-        ui.update_event("REMOVE", vision_conf, "item")
-        ui.refresh()
-
-    # Schedule next cycle
-    ui.after(200, pipeline_step)
-
-
-# ---------------- START SYSTEM ----------------
-print(f"\n=== SMART CART PIPELINE MODE START ({SYSTEM_MODE.upper()}) ===\n")
-
-ui.after(500, pipeline_step)
-ui.mainloop()
-
-print("\n=== DEMO END ===")
\ No newline at end of file
+import argparse
+import logging
+import socket
+import sys
+
+from config.system_mode import SYSTEM_MODE
+
+from common.models.cart import Cart
+
+# Everything heavy (NumPy, OpenCV, sklearn, PIL) is imported inside the
+# functions below, so the window can be drawn before it loads.
+# python -m benchmarks.startup shows the breakdown.
+
+
+# ---------------- WEIGHT PROVIDER SELECTION ----------------
+def create_weight_provider(mode=SYSTEM_MODE):
+    """
+    Initialize weight provider depending on mode.
+    """
+    if mode == "simulation":
+        from inputs.simulation.weight_provider_sim import WeightProvider
+        return WeightProvider()
+
+    from inputs.hardware.weight_provider_serial import WeightProvider
+    return WeightProvider(port="COM7")
+
+
+# ---------------- WARM-UP ----------------
+CAMERA_WARMUP_TIMEOUT = 3.0   # s to wait for the first frame
+WARMUP_POLL_MS = 200
+PUBLISH_POLL_S = 1.0          # s between checks for a changed catalog / model
+
+PRODUCTS_PATH = "data/products.json"
+MODEL_PATH = "ml/knn_model.pkl"
+
+
+def load_model(shared=False):
+    """
+    shared=True maps the model published by --publish-catalog instead
+    of unpickling a private copy, and falls back to the private copy
+    when none was published.
+    """
+    from ml.model import ProductMLModel
+
+    if shared:
+        from common.services.shared_catalog import SharedCatalog, SharedMLModel
+
+        try:
+            return SharedMLModel(SharedCatalog())
+        except ValueError as e:
+            # The publisher had no model it could share
+            print(f"⚠️ {e} — loading the private model")
+
+    ml_model = ProductMLModel(MODEL_PATH)
+    ml_model.load()
+    return ml_model
+
+
+def load_catalog(shared=False):
+    if shared:
+        from common.services.shared_catalog import SharedCatalog, SharedProductIndex
+        return SharedProductIndex(SharedCatalog())
+
+    from common.services.product_loader import load_products
+    from common.services.product_index import ProductIndex
+
+    return ProductIndex(load_products(PRODUCTS_PATH))
+
+
+def open_camera_stream(on_frame=None):
+    """
+    Camera stays open for the whole session (no per-event warm-up).
+    Ready once the first frame arrived; the stream keeps retrying on
+    its own if the device is not there yet.
+    """
+    from common.services.camera_stream import CameraStream
+
+    stream = CameraStream(on_frame=on_frame).start()
+    stream.latest(timeout=CAMERA_WARMUP_TIMEOUT)
+    return stream
+
+
+def open_journal(directory=None):
+    """
+    Reads the cart journal a crash may have left behind. The cart is
+    rebuilt from it before the first event is committed.
+    """
+    from common.services.cart_journal import JOURNAL_DIR, CartJournal
+
+    return CartJournal(directory or JOURNAL_DIR)
+
+
+def open_capture_archive(options):
+    from common.services.capture_archive import CaptureArchive
+
+    return CaptureArchive(**options).start()
+
+
+def start_vision_pool(workers):
+    from common.services.vision_pool import VisionPool
+
+    return VisionPool(workers).start()
+
+
+def connect_server(address, cart_id):
+    from common.services.cart_client import CartClient
+
+    return CartClient(address, cart_id).connect()
+
+
+def start_warmup(
+    mode=SYSTEM_MODE, on_frame=None, server=None, cart_id=None, shared=False,
+    vision_workers=0, archive=None, journal_dir=None
+):
+    """
+    Loads model, catalog, weight provider, camera and cart journal in
+    parallel. Names match the Pipeline attributes they feed. on_frame
+    receives every camera frame (live preview).
+
+    With a cart server address the model and journal stay on the
+    server; the cart connects to it instead. shared=True attaches to
+    the catalog and model published by --publish-catalog.
+    vision_workers > 0 analyzes frames in that many worker processes.
+    archive: CaptureArchive options (format, quality, captures kept).
+    journal_dir: cart journal directory (default data/journal).
+    """
+    from common.services.warmup import WarmupManager
+
+    warmup = WarmupManager()
+
+    if server is None:
+        warmup.add("ml_model", lambda: load_model(shared))
+        warmup.add("journal", lambda: open_journal(journal_dir))
+    else:
+        warmup.add("remote", lambda: connect_server(server, cart_id))
+
+    warmup.add("product_index", lambda: load_catalog(shared))
+    warmup.add("weight_provider", lambda: create_weight_provider(mode))
+    warmup.add("camera", lambda: open_camera_stream(on_frame))
+
+    if vision_workers:
+        warmup.add("vision", lambda: start_vision_pool(vision_workers))
+
+    warmup.add("archive", lambda: open_capture_archive(archive or {}))
+
+    return warmup.start()
+
+
+def shutdown_backend(warmup, pipeline=None, end_session=True):
+    """
+    end_session=False (interrupted, not a deliberate Quit / End Demo)
+    keeps the cart journal for the next start to replay.
+    """
+    if pipeline is not None:
+        pipeline.stop()
+
+    journal = warmup.get("journal") if "journal" in warmup else None
+    if journal is not None:
+        journal.close(discard=end_session)
+
+    remote = warmup.get("remote") if "remote" in warmup else None
+    if remote is not None:
+        remote.close()
+
+    vision = warmup.get("vision") if "vision" in warmup else None
+    if vision is not None:
+        vision.close()
+
+    archive = warmup.get("archive") if "archive" in warmup else None
+    if archive is not None:
+        archive.close()
+        stats = archive.stats()
+        print(f"📷 Captures archived: {stats['written']} written, {stats['dropped']} dropped")
+
+    camera = warmup.get("camera")
+    if camera is not None:
+        camera.stop()
+
+    weight_provider = warmup.get("weight_provider")
+    if hasattr(weight_provider, "close"):
+        weight_provider.close()
+
+
+def run_ui(server=None, cart_id=None, shared=False, vision_workers=0, archive=None):
+    from common.ui.live_preview import PreviewChannel
+    from common.ui.smart_cart_ui import SmartCartUI
+    from common.services.motion_gate import MotionGate
+    from common.services.pipeline import Pipeline
+
+    # With a cart server this cart mirrors the server's cart
+    cart = Cart()
+
+    # Camera frames go straight from the capture thread to the preview
+    preview = PreviewChannel()
+    warmup = start_warmup(
+        on_frame=preview.submit, server=server, cart_id=cart_id, shared=shared,
+        vision_workers=vision_workers, archive=archive
+    )
+    pipeline = None
+
+    def on_shutdown():
+        """
+        Called by UI (End Demo / Exit Gate success).
+        """
+        shutdown_backend(warmup, pipeline)
+        print("🛑 Shutdown signal received from UI")
+
+    def on_new_cart():
+        if warmup.ready("archive"):
+            warmup.get("archive").new_session()
+
+        if "remote" in warmup:
+            remote = warmup.get("remote")
+            if remote is not None:
+                remote.reset()
+            return
+
+        journal = warmup.get("journal")
+        if journal is not None:
+            journal.record(cart, "NEW_CART")
+
+    # The window is up while everything loads behind it
+    ui = SmartCartUI(
+        cart, on_shutdown=on_shutdown, preview=preview, on_new_cart=on_new_cart
+    )
+    ui.update_warmup(warmup.status())
+
+    def poll_warmup():
+        ui.update_warmup(warmup.status())
+
+        # Show a cart recovered from the journal as soon as possible
+        if "journal" in warmup and warmup.ready("journal") and warmup.ready("product_index"):
+            pipeline.restore_cart()
+
+        if warmup.all_done:
+            print(f"Warm-up finished in {warmup.timings()['wall']:.2f} s")
+        else:
+            ui.after(WARMUP_POLL_MS, poll_warmup)
+
+    ui.after(WARMUP_POLL_MS, poll_warmup)
+
+    # Stages run on worker threads; the UI thread only commits results.
+    # Each stage waits for its own dependency to finish warming up.
+    pipeline = Pipeline(
+        weight_provider=None, camera=None, ml_model=None, catalog=None,   # from warm-up
+        cart=cart, ui=ui, warmup=warmup, motion_gate=MotionGate()
+    )
+
+    # ---------------- START SYSTEM ----------------
+    print(f"\n=== SMART CART PIPELINE MODE START ({SYSTEM_MODE.upper()}) ===\n")
+
+    pipeline.start()
+    ui.mainloop()
+
+    print("\n=== DEMO END ===")
+
+
+def run_headless(server=None, cart_id=None, shared=False, vision_workers=0, archive=None):
+    """
+    Same pipeline without Tk: events are processed as fast as the
+    weight provider delivers them, then the receipt is printed.
+    """
+    from common.services.motion_gate import MotionGate
+    from common.services.pipeline import Pipeline
+
+    cart = Cart()
+    warmup = start_warmup(
+        server=server, cart_id=cart_id, shared=shared, vision_workers=vision_workers,
+        archive=archive
+    )
+
+    print(f"\n=== SMART CART HEADLESS MODE START ({SYSTEM_MODE.upper()}) ===\n")
+
+    pipeline = Pipeline(
+        weight_provider=None, camera=None, ml_model=None, catalog=None,   # from warm-up
+        cart=cart, warmup=warmup, motion_gate=MotionGate()
+    )
+
+    stats = None
+
+    try:
+        stats = pipeline.run_headless()
+    except KeyboardInterrupt:
+        print("\n🛑 Interrupted — cart journal kept for recovery")
+    finally:
+        shutdown_backend(warmup, end_session=stats is not None)
+
+    cart.print_receipt()
+
+    if stats:
+        print(
+            f"{stats['events']} events in {stats['elapsed']:.2f} s "
+            f"({stats['events_per_sec']:.1f} events/s)"
+        )
+
+
+def run_server(address, shared=False):
+    """
+    One backend for many carts: catalog and model are loaded once and
+    shared by every cart session.
+    """
+    from common.services.cart_server import serve
+    from common.services.warmup import WarmupManager
+
+    warmup = WarmupManager()
+    warmup.add("ml_model", lambda: load_model(shared))
+    warmup.add("product_index", lambda: load_catalog(shared))
+    warmup.start().wait_all()
+
+    product_index = warmup.get("product_index")
+
+    if product_index is None:
+        print(f"❌ Product catalog failed to load: {warmup.error('product_index')}")
+        return
+
+    serve(product_index, warmup.get("ml_model"), address)
+
+
+def run_publisher():
+    """
+    Loader for the cart processes on this host (--shared-catalog):
+    publishes catalog + model once, and again whenever
+    data/products.json or ml/knn_model.pkl changes. Carts pick up the
+    new generation on their next lookup.
+    """
+    import json
+    import os
+    import time
+
+    from common.services.shared_catalog import SHARED_DIR, SharedCatalogPublisher
+
+    def mtimes():
+        return [
+            os.path.getmtime(p) if os.path.exists(p) else None
+            for p in (PRODUCTS_PATH, MODEL_PATH)
+        ]
+
+    def publish():
+        with open(PRODUCTS_PATH, "r", encoding="utf-8") as f:
+            records = json.load(f)
+
+        ml_model = load_model() if os.path.exists(MODEL_PATH) else None
+        generation = publisher.publish(records, ml_model)
+        print(f"📦 Published catalog generation {generation} ({len(records)} products) to {SHARED_DIR}")
+
+    publisher = SharedCatalogPublisher()
+    seen = mtimes()
+
+    try:
+        publish()
+
+        while True:
+            time.sleep(PUBLISH_POLL_S)
+            current = mtimes()
+
+            if current != seen:
+                seen = current
+                try:
+                    publish()
+                except (OSError, ValueError) as e:
+                    # Keep serving the last good generation
+                    print(f"⚠️ Catalog reload failed: {e}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        publisher.close(remove=True)
+        print("🛑 Shared catalog withdrawn")
+
+
+def main(argv=None):
+    from common.services.cart_protocol import DEFAULT_ADDRESS
+
+    parser = argparse.ArgumentParser(description="Smart Cart pipeline")
+    parser.add_argument(
+        "--headless", action="store_true",
+        help="run the pipeline without the Tk display"
+    )
+    parser.add_argument(
+        "--serve", nargs="?", const=DEFAULT_ADDRESS, metavar="ADDRESS",
+        help=f"run the multi-cart backend server (default {DEFAULT_ADDRESS}, "
+             "or a Unix socket path)"
+    )
+    parser.add_argument(
+        "--connect", metavar="ADDRESS",
+        help="resolve events on a cart server instead of locally"
+    )
+    parser.add_argument(
+        "--cart-id", default=socket.gethostname(),
+        help="this cart's session name on the server (default: host name)"
+    )
+    parser.add_argument(
+        "--publish-catalog", action="store_true",
+        help="load catalog and model once into shared memory for the carts on this host"
+    )
+    parser.add_argument(
+        "--shared-catalog", action="store_true",
+        help="attach to the catalog and model published by --publish-catalog"
+    )
+    parser.add_argument(
+        "--vision-workers", type=int, default=0, metavar="N",
+        help="analyze camera frames in N worker processes (default: in a thread)"
+    )
+    parser.add_argument(
+        "--keep-captures", type=int, default=0, metavar="N",
+        help="also archive the last N captures of each cart session in data/captures/"
+    )
+    parser.add_argument(
+        "--capture-format", default="jpg", choices=["jpg", "png", "webp"],
+        help="image format of archived captures"
+    )
+    parser.add_argument(
+        "--capture-quality", type=int, default=90, metavar="Q",
+        help="JPEG / WebP quality 0-100 (PNG is lossless)"
+    )
+    args = parser.parse_args(argv)
+
+    # Pipeline / resolver / cart progress (the cart server quiets it)
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+
+    archive = {
+        "keep": args.keep_captures,
+        "fmt": args.capture_format,
+        "quality": args.capture_quality
+    }
+
+    if args.publish_catalog:
+        run_publisher()
+    elif args.serve:
+        run_server(args.serve, args.shared_catalog)
+    elif args.headless:
+        run_headless(args.connect, args.cart_id, args.shared_catalog, args.vision_workers, archive)
+    else:
+        run_ui(args.connect, args.cart_id, args.shared_catalog, args.vision_workers, archive)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,138 @@
-import numpy as np
-from sklearn.neighbors import KNeighborsClassifier
-import joblib
-import pandas as pd
-
-class ProductMLModel:
-    def __init__(self, model_path="ml/knn_model.pkl"):
-        self.model_path = model_path
-        self.model = None
-
-    def load(self):
-        self.model = joblib.load(self.model_path)
-
-    def predict(self, features):
-        """
-        features: dict with keys:
-        weight, aspect_ratio, area_ratio, color_code
-        """
-
-        x = pd.DataFrame([{
-            "weight": features["weight"],
-            "aspect_ratio": features["aspect_ratio"],
-            "area_ratio": features["area_ratio"],
-            "color_code": features["color_code"]
-        }])
-
-        pred = self.model.predict(x)[0]
-        probs = self.model.predict_proba(x)[0]
-
-        confidence = max(probs)
-
-        return pred, confidence
\ No newline at end of file
+import warnings
+
+
+# NumPy / joblib (and sklearn, pulled in by unpickling) are imported on
+# first use to keep them off the boot path.
+# Column order used by ml/train.py and the dicts from extract_ml_features()
+FEATURE_NAMES = ["weight", "aspect_ratio", "area_ratio", "color_code"]
+
+# Inference passes plain arrays built in feature_names order, so
+# sklearn's "fitted with feature names" check does not apply. Installed
+# once here: catch_warnings() per call is not thread-safe.
+warnings.filterwarnings(
+    "ignore",
+    message="X does not have valid feature names",
+    category=UserWarning,
+    module="sklearn"
+)
+
+
+class ProductMLModel:
+    def __init__(self, model_path="ml/knn_model.pkl"):
+        self.model_path = model_path
+        self.model = None
+        self.feature_names = list(FEATURE_NAMES)
+        self._column_order = None
+
+    def load(self):
+        import joblib
+
+        self.model = joblib.load(self.model_path)
+
+        trained = getattr(self.model, "feature_names_in_", None)
+
+        if trained is not None:
+            trained = [str(name) for name in trained]
+
+            if sorted(trained) != sorted(FEATURE_NAMES):
+                raise ValueError(
+                    f"Model features {trained} do not match {FEATURE_NAMES}"
+                )
+
+            self.feature_names = trained
+
+        # Columns of a FEATURE_NAMES-ordered batch, in the model's order
+        order = [FEATURE_NAMES.index(name) for name in self.feature_names]
+        self._column_order = None if order == list(range(len(order))) else order
+
+    def predict(self, features):
+        """
+        features: dict with keys:
+        weight, aspect_ratio, area_ratio, color_code
+
+        Returns (product_id, confidence)
+        """
+        import numpy as np
+
+        x = np.array(
+            [[features[name] for name in self.feature_names]],
+            dtype=np.float64
+        )
+
+        labels, confidences = self._predict_array(x)
+
+        return labels[0], confidences[0]
+
+    def predict_batch(self, X):
+        """
+        X: (N, 4) array-like, columns in FEATURE_NAMES order
+        (weight, aspect_ratio, area_ratio, color_code).
+
+        Returns (labels, confidences) arrays of length N.
+        """
+        import numpy as np
+
+        X = np.asarray(X, dtype=np.float64)
+
+        if X.ndim != 2 or X.shape[1] != len(FEATURE_NAMES):
+            raise ValueError(
+                f"Expected an (N, {len(FEATURE_NAMES)}) array, got {X.shape}"
+            )
+
+        if self._column_order is not None:
+            X = X[:, self._column_order]
+
+        return self._predict_array(X)
+
+    def _predict_array(self, X, model=None):
+        """
+        Label + confidence from a single neighbour query.
+
+        Mirrors KNeighborsClassifier.predict / predict_proba: the label
+        is the class with the highest (weighted) vote, ties going to the
+        first class, and the confidence is that class's vote share.
+
+        model: anything with the fitted classifier's kneighbors(),
+        classes_ and weights (default: the loaded model). The fast path
+        also needs the encoded training labels (_y); without them, or
+        for rare configurations, sklearn's predict_proba() is used.
+        """
+        import numpy as np
+
+        model = self.model if model is None else model
+        weights = getattr(model, "weights", "uniform")
+        train_y = getattr(model, "_y", None)
+
+        if train_y is None or callable(weights) or getattr(model, "outputs_2d_", False):
+            probs = model.predict_proba(X)
+            best = probs.argmax(axis=1)
+            return model.classes_[best], probs.max(axis=1)
+
+        dist, ind = model.kneighbors(X)
+
+        neigh_y = train_y[ind]
+
+        n_classes = len(model.classes_)
+        votes = np.zeros((X.shape[0], n_classes))
+        rows = np.arange(X.shape[0])[:, None]
+
+        if weights == "distance":
+            with np.errstate(divide="ignore"):
+                w = 1.0 / dist
+
+            # Exact matches take all the weight (same as sklearn)
+            inf_mask = np.isinf(w)
+            inf_row = np.any(inf_mask, axis=1)
+            w[inf_row] = inf_mask[inf_row]
+
+            np.add.at(votes, (rows, neigh_y), w)
+        else:
+            np.add.at(votes, (rows, neigh_y), 1.0)
+
+        totals = votes.sum(axis=1)
+        totals[totals == 0.0] = 1.0
+
+        best = votes.argmax(axis=1)
+        confidences = votes[rows[:, 0], best] / totals
+
+        return model.classes_[best], confidences
@@ -0,0 +1,70 @@
+# test_cart.py
+
+import pytest
+
+from common.models.cart import Cart
+from common.models.product import Product
+
+
+CHIPS = Product("P1", "Chips", "snacks", unit_weight=50, price_per_unit=20)
+JUICE = Product("P2", "Juice", "drinks", unit_weight=250, price_per_unit=60)
+RICE = Product("P4", "Rice", "grains", price_per_gram=0.1)
+
+
+def test_add_updates_line_and_totals():
+    cart = Cart()
+    cart.add(CHIPS, 50)
+    cart.add(CHIPS, 50)
+    cart.add(JUICE, 250)
+
+    assert cart.items["P1"].quantity == 2
+    assert cart.items["P1"].subtotal == 40
+    assert cart.total() == 100
+    assert cart.item_count == 3
+    assert cart.weight_total == 350
+
+
+def test_loose_line_counts_once_and_bills_by_weight():
+    cart = Cart()
+    cart.add(RICE, 300)
+    cart.add(RICE, 200)
+
+    assert cart.items["P4"].weight == 500
+    assert cart.total() == pytest.approx(50.0)
+    assert cart.item_count == 1
+    assert cart.weight_total == 500
+
+
+def test_partial_loose_removal():
+    cart = Cart()
+    cart.add(RICE, 500)
+
+    cart.remove("P4", -200)
+    assert cart.items["P4"].weight == 300
+    assert cart.total() == pytest.approx(30.0)
+
+    # What is left is within the tolerance: the line goes
+    cart.remove("P4", -297)
+    assert not cart.items
+    assert cart.total() == 0.0
+    assert cart.item_count == 0
+    assert cart.weight_total == 0.0
+
+
+def test_changes_since_and_reset():
+    cart = Cart()
+    start = cart.version
+
+    cart.add(CHIPS, 50)
+    seen = cart.version
+    cart.add(JUICE, 250)
+
+    assert cart.changes_since(start) == {"P1", "P2"}
+    assert cart.changes_since(seen) == {"P2"}
+    assert cart.changes_since(cart.version) == set()
+
+    cart.reset()
+
+    assert cart.changes_since(seen) is None
+    assert cart.total() == 0.0
+    assert cart.removal_candidates(-250) == []
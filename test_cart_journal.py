@@ -0,0 +1,132 @@
+# test_cart_journal.py
+
+import os
+
+import pytest
+
+from common.models.cart import Cart
+from common.models.product import Product
+from common.services.cart_journal import CartJournal
+
+
+CHIPS = Product("P1", "Chips", "snacks", unit_weight=50, price_per_unit=20)
+JUICE = Product("P2", "Juice", "drinks", unit_weight=250, price_per_unit=60)
+RICE = Product("P4", "Rice", "grains", price_per_gram=0.1)
+
+CATALOG = {p.id: p for p in (CHIPS, JUICE, RICE)}
+
+
+def shop(journal, cart):
+    journal.restore(cart, CATALOG)
+
+    cart.add(CHIPS, 50)
+    journal.record(cart, "ADD")
+    cart.add(JUICE, 250)
+    journal.record(cart, "ADD")
+    cart.add(CHIPS, 50)
+    journal.record(cart, "ADD")
+    cart.add(RICE, 300)
+    journal.record(cart, "ADD")
+    cart.remove("P2", -250)
+    journal.record(cart, "REMOVE")
+
+
+def lines(cart):
+    return {pid: (item.quantity, item.weight) for pid, item in cart.items.items()}
+
+
+def recovered(directory):
+    journal = CartJournal(str(directory))
+    cart = Cart()
+    journal.restore(cart, CATALOG)
+    return journal, cart
+
+
+@pytest.mark.parametrize("snapshot_every", [500, 2])
+def test_replay_restores_the_cart(tmp_path, snapshot_every):
+    cart = Cart()
+    journal = CartJournal(str(tmp_path), snapshot_every=snapshot_every)
+    shop(journal, cart)
+    journal.close()        # crash: the journal is kept
+
+    journal, restored = recovered(tmp_path)
+    journal.close()
+
+    assert lines(restored) == {"P1": (2, 0), "P4": (0, 300)}
+    assert restored.total() == pytest.approx(cart.total())
+
+
+def test_torn_tail_is_dropped(tmp_path):
+    journal = CartJournal(str(tmp_path))
+    shop(journal, Cart())
+    journal.close()
+
+    log = os.path.join(str(tmp_path), "journal.log")
+    size = os.path.getsize(log)
+
+    # Crash halfway through writing the next record
+    with open(log, "ab") as f:
+        f.write(b'{"outcome":"ADD","lines":{"P2":[1,')
+
+    journal, cart = recovered(tmp_path)
+
+    assert lines(cart) == {"P1": (2, 0), "P4": (0, 300)}
+    assert os.path.getsize(log) == size
+
+    # New records start on a clean line and replay too
+    cart.add(JUICE, 250)
+    journal.record(cart, "ADD")
+    journal.close()
+
+    journal, cart = recovered(tmp_path)
+    journal.close()
+
+    assert lines(cart) == {"P1": (2, 0), "P2": (1, 0), "P4": (0, 300)}
+
+
+def test_reset_and_discard(tmp_path):
+    cart = Cart()
+    journal = CartJournal(str(tmp_path))
+    shop(journal, cart)
+
+    cart.reset()
+    journal.record(cart, "RESET")
+    journal.close()
+
+    journal, restored = recovered(tmp_path)
+    assert not restored.items
+
+    journal.close(discard=True)
+    assert not os.path.exists(os.path.join(str(tmp_path), "journal.log"))
+
+
+def test_product_gone_from_catalog_is_dropped(tmp_path):
+    journal = CartJournal(str(tmp_path))
+    shop(journal, Cart())
+    journal.close()
+
+    journal = CartJournal(str(tmp_path))
+    cart = Cart()
+    journal.restore(cart, {"P1": CHIPS})
+    journal.close(discard=True)
+
+    assert lines(cart) == {"P1": (2, 0)}
+
+
+def test_set_line_matches_adds():
+    added = Cart()
+    for _ in range(3):
+        added.add(JUICE, 250)
+    added.add(RICE, 120)
+
+    replayed = Cart()
+    replayed.set_line(JUICE, 3, 0)
+    replayed.set_line(RICE, 0, 120)
+
+    assert replayed.total() == pytest.approx(added.total())
+    assert replayed.item_count == added.item_count
+    assert replayed.weight_total == added.weight_total
+
+    replayed.set_line(JUICE, 0, 0)
+    assert "P2" not in replayed.items
+    assert replayed.removal_candidates(-250) == []
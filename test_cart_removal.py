@@ -0,0 +1,42 @@
+# test_cart_removal.py
+
+from common.models.cart import Cart
+from common.models.product import Product
+
+
+CHIPS = Product("P1", "Chips", "snacks", unit_weight=50, price_per_unit=20)
+JUICE = Product("P2", "Juice", "drinks", unit_weight=250, price_per_unit=60)
+SODA = Product("P3", "Soda", "drinks", unit_weight=252, price_per_unit=40)
+
+
+def test_removal_candidates_nearest_first():
+    cart = Cart()
+    cart.add(SODA, 252)
+    cart.add(JUICE, 250)
+    cart.add(CHIPS, 50)
+
+    names = [item.product.name for item in cart.removal_candidates(-251)]
+    assert names == ["Juice", "Soda"]
+
+    names = [item.product.name for item in cart.removal_candidates(-249)]
+    assert names == ["Juice", "Soda"]
+
+    assert cart.removal_candidates(-100) == []
+
+
+def test_remove_by_weight_keeps_index_and_totals():
+    cart = Cart()
+    cart.add(JUICE, 250)
+    cart.add(JUICE, 250)
+    cart.add(CHIPS, 50)
+
+    assert cart.remove_by_weight(-248) == "Juice"
+    assert cart.items["P2"].quantity == 1
+    assert cart.total() == 80
+    assert cart.item_count == 2
+    assert cart.weight_total == 300
+
+    assert cart.remove_by_weight(-250) == "Juice"
+    assert "P2" not in cart.items
+    assert cart.removal_candidates(-250) == []
+    assert [w for w, _, _ in cart.unit_lines()] == [50]
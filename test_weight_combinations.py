@@ -0,0 +1,91 @@
+# test_weight_combinations.py
+
+from common.models.cart import Cart
+from common.models.product import Product
+from common.services.product_index import ProductIndex
+from common.services.product_resolver import (
+    resolve_products_by_weight_multi,
+    resolve_removal_multi
+)
+from common.services.weight_combinations import find_combinations
+
+
+def product(pid, weight, colors, category="snacks"):
+    return Product(
+        pid, pid, category, unit_weight=weight, price_per_unit=10,
+        vision_profile={"dominant_colors": colors}
+    )
+
+
+def test_pair_within_tolerance():
+    combos, complete = find_combinations([50, 100, 125, 200], 227, 5)
+
+    assert complete
+    assert combos == [(1, 2)]
+
+
+def test_single_item_is_not_a_combination():
+    combos, _ = find_combinations([100, 200], 200, 5)
+
+    assert (1,) not in combos
+    assert combos == [(0, 0)]
+
+
+def test_fewest_items_first():
+    # 100 + 200 explains it; 3 x 100 is never tried
+    combos, _ = find_combinations([100, 200], 300, 5)
+
+    assert combos == [(0, 1)]
+
+
+def test_counts_limit_repeats():
+    assert find_combinations([100], 200, 5, counts=[1])[0] == []
+    assert find_combinations([100], 200, 5, counts=[2])[0] == [(0, 0)]
+
+
+def test_closest_total_first():
+    combos, _ = find_combinations([98, 100, 102], 200, 5)
+
+    totals = [sum([98, 100, 102][i] for i in c) for c in combos]
+    assert abs(totals[0] - 200) == 0
+    assert totals == sorted(totals, key=lambda t: abs(t - 200))
+
+
+def test_time_budget_stops_search():
+    weights = [float(w) for w in range(10, 3000)]
+
+    combos, complete = find_combinations(weights, 5000.5, 0.1, time_budget=0)
+
+    assert not complete
+    assert combos == []
+
+
+def test_multi_add_prefers_matching_colors():
+    products = {
+        p.id: p for p in (
+            product("red-100", 100, ["red"]),
+            product("blue-100", 100, ["blue"]),
+            product("red-150", 150, ["red"]),
+        )
+    }
+
+    combos = resolve_products_by_weight_multi(
+        ProductIndex(products), ["snacks"], 250, ["red"]
+    )
+
+    assert [[p.id for p in combo] for combo in combos] == [["red-100", "red-150"]]
+
+
+def test_multi_removal_only_takes_what_is_in_the_cart():
+    chips = product("chips", 50, ["yellow"])
+    soda = product("soda", 200, ["red"])
+
+    cart = Cart()
+    cart.add(chips, 50)
+    cart.add(soda, 200)
+
+    combos = resolve_removal_multi(cart, -250)
+    assert [[p.id for p in combo] for combo in combos] == [["chips", "soda"]]
+
+    # Only one bag of chips: 2 x 50 cannot be taken out
+    assert resolve_removal_multi(cart, -100) == []
@@ -0,0 +1,91 @@
+# test_weight_provider_serial.py
+
+import os
+import time
+
+import pytest
+
+pytest.importorskip("serial")
+
+if not hasattr(os, "openpty"):
+    pytest.skip("needs a pseudo-terminal", allow_module_level=True)
+
+from inputs.hardware.fake_arduino import FakeArduino
+from inputs.hardware.weight_provider_serial import WeightProvider, parse_line
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+
+    return False
+
+
+@pytest.fixture
+def arduino():
+    # Opening the port flushes anything sent before, so tests send the
+    # banner themselves
+    arduino = FakeArduino(banner=False)
+    yield arduino
+    arduino.close()
+
+
+def test_parse_line():
+    assert parse_line("ADD:125") == 125.0
+    assert parse_line("REMOVE:120") == -120.0
+    assert parse_line("Smart Cart Weight Sensor Ready") is None
+    assert parse_line("") is None
+
+    with pytest.raises(ValueError):
+        parse_line("ADD:abc")
+
+    with pytest.raises(ValueError):
+        parse_line("hello")
+
+
+def test_lines_become_weight_deltas(arduino):
+    provider = WeightProvider(port=arduino.port, reset_delay=0)
+
+    try:
+        arduino.send("Smart Cart Weight Sensor Ready")
+        arduino.send_add(125)
+        arduino.send_remove(120)
+        arduino.send("garbage")
+        arduino.send_add(55)
+
+        assert wait_for(lambda: provider.stats()["events_parsed"] == 3)
+
+        deltas = [weight for _, weight in provider.poll()]
+        stats = provider.stats()
+    finally:
+        provider.close()
+
+    assert deltas == [125.0, -120.0, 55.0]
+    assert stats["lines_read"] == 5        # banner + 4 lines
+    assert stats["parse_errors"] == 1
+    assert stats["dropped_events"] == 0
+    assert stats["pending"] == 0
+
+
+def test_oldest_event_dropped_when_consumer_falls_behind(arduino):
+    provider = WeightProvider(port=arduino.port, reset_delay=0, queue_size=2)
+
+    try:
+        for grams in (10, 20, 30, 40):
+            arduino.send_add(grams)
+
+        assert wait_for(lambda: provider.stats()["events_parsed"] == 4)
+
+        assert provider.get_next_weight() == 30.0
+        assert provider.get_next_weight() == 40.0
+        assert provider.get_next_weight() is None
+
+        stats = provider.stats()
+    finally:
+        provider.close()
+
+    assert stats["dropped_events"] == 2
@@ -0,0 +1,61 @@
+# test_weight_stabilizer.py
+
+from common.services.weight_stabilizer import TIMEOUT, StabilizationDetector
+from inputs.simulation.weight_provider_sim import WeightProvider, synthetic_settle_trace
+
+
+def test_settling_trace_becomes_stable():
+    for seed in range(5):
+        trace = synthetic_settle_trace(0, 125, seed=seed)
+        t_stable = StabilizationDetector().run(trace)
+
+        assert t_stable is not None
+        assert 0.2 <= t_stable < TIMEOUT
+
+
+def test_stable_mean_is_the_settled_weight():
+    detector = StabilizationDetector()
+    detector.run(synthetic_settle_trace(300, -125, seed=1))
+
+    assert abs(detector.mean - 175) < 1.0
+
+
+def test_noisy_trace_never_becomes_stable():
+    trace = synthetic_settle_trace(0, 125, noise=5.0, seed=1)
+
+    assert StabilizationDetector().run(trace) is None
+
+
+def test_trace_still_moving_at_timeout():
+    # Slow settle: still drifting when the timeout is reached
+    trace = synthetic_settle_trace(0, 125, tau=2.0, seed=1)
+
+    assert StabilizationDetector().run(trace) is None
+
+
+def test_wait_gives_up_after_timeout():
+    now = [0.0]
+
+    def clock():
+        return now[0]
+
+    def read_sample():
+        now[0] += 0.025
+        return now[0], 100.0 if int(now[0] * 40) % 2 else 0.0
+
+    stable, _, elapsed = StabilizationDetector().wait(read_sample, timeout=1.0, clock=clock)
+
+    assert not stable
+    assert elapsed >= 1.0
+
+
+def test_read_ahead_keeps_each_events_trace():
+    traces = [synthetic_settle_trace(0, 125, seed=1), synthetic_settle_trace(125, 55, seed=2)]
+    provider = WeightProvider([125, 55], demo_traces=traces, realtime=False)
+
+    provider.get_next_weight()
+    first = provider.sample_source()
+    provider.get_next_weight()          # next event read before the first settled
+
+    assert [first.read_sample()[1] for _ in range(3)] == [load for _, load in traces[0][:3]]
+    assert StabilizationDetector().run(iter(first.read_sample, None)) is not None